@@ -0,0 +1,154 @@
+"""Shared helpers for the PyloidRPC benchmarks."""
+
+import asyncio
+import itertools
+import statistics
+import time
+from typing import (
+	Any,
+	Dict,
+	List,
+)
+
+import aiohttp
+
+WINDOW_ID = 'bench-window'
+
+
+class BenchWindow:
+	"""Minimal stand-in for `BrowserWindow`."""
+
+	def __init__(
+		self,
+		window_id: str,
+	):
+		self.id = window_id
+
+	def get_id(
+		self,
+	) -> str:
+		return self.id
+
+
+class BenchPyloid:
+	"""Minimal stand-in for `Pyloid` that resolves a single window."""
+
+	def __init__(
+		self,
+	):
+		self.window = BenchWindow(WINDOW_ID)
+
+	def get_window_by_id(
+		self,
+		window_id,
+	):
+		return self.window if window_id == self.window.id else None
+
+
+def summarize(
+	latencies: List[float],
+	elapsed: float,
+) -> Dict[
+	str,
+	Any,
+]:
+	"""Summarize per-call latencies (seconds) into throughput and percentiles (ms)."""
+	ordered = sorted(latencies)
+
+	def _percentile(
+		q: float,
+	) -> float:
+		return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+	return {
+		'calls': len(ordered),
+		'elapsed_s': round(elapsed, 4),
+		'calls_per_s': round(len(ordered) / elapsed, 1) if elapsed else None,
+		'mean_ms': round(statistics.fmean(ordered) * 1000, 4),
+		'p50_ms': round(_percentile(0.50), 4),
+		'p90_ms': round(_percentile(0.90), 4),
+		'p99_ms': round(_percentile(0.99), 4),
+		'max_ms': round(ordered[-1] * 1000, 4),
+	}
+
+
+async def run_load(
+	call,
+	calls: int,
+	concurrency: int,
+):
+	"""Run `calls` calls through `concurrency` workers and summarize them."""
+	latencies = []
+	remaining = iter(range(calls))
+
+	async def _worker():
+		for _ in remaining:
+			start = time.perf_counter()
+			await call()
+			latencies.append(time.perf_counter() - start)
+
+	start = time.perf_counter()
+	await asyncio.gather(*(_worker() for _ in range(concurrency)))
+	return summarize(
+		latencies,
+		time.perf_counter() - start,
+	)
+
+
+class WebSocketClient:
+	"""JSON-RPC client multiplexing calls over one WebSocket, matched by id."""
+
+	def __init__(
+		self,
+		session: aiohttp.ClientSession,
+		ws_url: str,
+		window_id: str = WINDOW_ID,
+	):
+		self._session = session
+		self._url = f'{ws_url}?window_id={window_id}'
+		self._ids = itertools.count(1)
+		self._pending: Dict[int, asyncio.Future] = {}
+		self._ws = None
+		self._reader = None
+
+	async def connect(
+		self,
+	):
+		self._ws = await self._session.ws_connect(self._url)
+		self._reader = asyncio.ensure_future(self._read())
+
+	async def _read(
+		self,
+	):
+		async for msg in self._ws:
+			data = msg.json()
+			future = self._pending.pop(data.get('id'), None)
+			if future is not None and not future.done():
+				future.set_result(data)
+
+	async def call(
+		self,
+		method: str,
+		params: Any = None,
+	) -> Dict[
+		str,
+		Any,
+	]:
+		request_id = next(self._ids)
+		future = asyncio.get_running_loop().create_future()
+		self._pending[request_id] = future
+		await self._ws.send_json(
+			{
+				'jsonrpc': '2.0',
+				'method': method,
+				'params': params if params is not None else {},
+				'id': request_id,
+			}
+		)
+		return await future
+
+	async def close(
+		self,
+	):
+		await self._ws.close()
+		self._reader.cancel()
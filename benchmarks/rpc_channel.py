@@ -0,0 +1,313 @@
+"""
+Latency benchmark of the QWebChannel RPC transport against HTTP POST.
+
+Calls a tiny method sequentially through both transports and reports the
+round-trip latency of each as JSON.
+
+- `--mode webview` (default) loads a page in a QWebEngineView and times
+  the calls in JavaScript, from `window.pyloid.rpc`-style QWebChannel calls
+  and from `fetch` to the RPC URL. It needs PySide6 and a display.
+- `--mode python` times the Python side of both paths from the main thread:
+  `PyloidRPC.post_message` as called by the channel object, and HTTP POST
+  over a keep-alive loopback connection. It leaves out the Qt and JavaScript
+  marshalling, and runs anywhere.
+
+Usage
+-----
+```
+python benchmarks/rpc_channel.py --calls 2000
+python benchmarks/rpc_channel.py --mode python --calls 5000
+```
+"""
+
+import argparse
+import http.client
+import json
+import platform
+import queue
+import sys
+import time
+from urllib.parse import (
+	urlsplit,
+)
+
+from pyloid.rpc import (
+	PyloidRPC,
+)
+
+from _common import (
+	WINDOW_ID,
+	BenchPyloid,
+	summarize,
+)
+
+BENCH_SCRIPT = """
+new QWebChannel(qt.webChannelTransport, async function (channel) {
+    const rpcChannel = channel.objects.__PYLOID_RPC__;
+    const pending = {};
+    let nextId = 1;
+    rpcChannel.response.connect(function (text) {
+        const response = JSON.parse(text);
+        pending[response.id](response);
+        delete pending[response.id];
+    });
+    const request = function (id) {
+        return JSON.stringify({ jsonrpc: '2.0', method: 'add', params: { a: 1, b: 2 }, id: id });
+    };
+    const viaChannel = function () {
+        return new Promise(function (resolve) {
+            const id = nextId++;
+            pending[id] = resolve;
+            rpcChannel.send(request(id));
+        });
+    };
+    const viaHttp = function () {
+        return fetch(RPC_URL, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json', 'X-Pyloid-Window-Id': WINDOW_ID },
+            body: request(nextId++),
+        }).then(function (resp) { return resp.json(); });
+    };
+    const measure = async function (call) {
+        for (let i = 0; i < WARMUP; i++) {
+            await call();
+        }
+        const latencies = [];
+        const start = performance.now();
+        for (let i = 0; i < CALLS; i++) {
+            const t = performance.now();
+            await call();
+            latencies.push(performance.now() - t);
+        }
+        return { latencies: latencies, elapsed: performance.now() - start };
+    };
+    channel.objects.reporter.report(JSON.stringify({
+        qwebchannel: await measure(viaChannel),
+        http: await measure(viaHttp),
+    }));
+});
+"""
+
+
+def build_rpc() -> PyloidRPC:
+	rpc = PyloidRPC()
+	rpc.pyloid = BenchPyloid()
+
+	@rpc.method()
+	async def add(
+		a: int,
+		b: int,
+	):
+		return a + b
+
+	return rpc
+
+
+def wait_until_started(
+	rpc: PyloidRPC,
+):
+	while rpc._loop is None:
+		time.sleep(0.01)
+
+
+def run_python(
+	rpc: PyloidRPC,
+	calls: int,
+	warmup: int,
+):
+	"""Time `post_message` and HTTP POST round trips from the main thread."""
+	replies = queue.SimpleQueue()
+	message = json.dumps(
+		{
+			'jsonrpc': '2.0',
+			'method': 'add',
+			'params': {
+				'a': 1,
+				'b': 2,
+			},
+			'id': 1,
+		}
+	)
+	url = urlsplit(rpc.url)
+	connection = http.client.HTTPConnection(
+		url.hostname,
+		url.port,
+	)
+	headers = {
+		'Content-Type': 'application/json',
+		'X-Pyloid-Window-Id': WINDOW_ID,
+	}
+
+	def _channel():
+		rpc.post_message(
+			message,
+			WINDOW_ID,
+			replies.put,
+		)
+		replies.get()
+
+	def _http():
+		connection.request(
+			'POST',
+			url.path,
+			message,
+			headers,
+		)
+		connection.getresponse().read()
+
+	results = {}
+	for name, call in (
+		(
+			'qwebchannel',
+			_channel,
+		),
+		(
+			'http',
+			_http,
+		),
+	):
+		for _ in range(warmup):
+			call()
+		latencies = []
+		start = time.perf_counter()
+		for _ in range(calls):
+			call_start = time.perf_counter()
+			call()
+			latencies.append(time.perf_counter() - call_start)
+		results[name] = summarize(
+			latencies,
+			time.perf_counter() - start,
+		)
+	connection.close()
+	return results
+
+
+def run_webview(
+	rpc: PyloidRPC,
+	calls: int,
+	warmup: int,
+):
+	"""Time both transports from JavaScript in a QWebEngineView."""
+	from PySide6.QtCore import (
+		QFile,
+		QObject,
+		QUrl,
+		Slot,
+	)
+	from PySide6.QtWebChannel import (
+		QWebChannel,
+	)
+	from PySide6.QtWebEngineWidgets import (
+		QWebEngineView,
+	)
+	from PySide6.QtWidgets import (
+		QApplication,
+	)
+
+	from pyloid.base_ipc.rpc_channel import (
+		RPCChannel,
+	)
+
+	class Reporter(QObject):
+		def __init__(
+			self,
+		):
+			super().__init__()
+			self.raw = None
+
+		@Slot(str)
+		def report(
+			self,
+			raw: str,
+		):
+			self.raw = json.loads(raw)
+			QApplication.quit()
+
+	app = QApplication.instance() or QApplication(sys.argv)
+	view = QWebEngineView()
+	reporter = Reporter()
+	rpc_channel = RPCChannel(
+		WINDOW_ID,
+		rpc,
+	)
+	channel = QWebChannel()
+	channel.registerObject(
+		'__PYLOID_RPC__',
+		rpc_channel,
+	)
+	channel.registerObject(
+		'reporter',
+		reporter,
+	)
+	view.page().setWebChannel(channel)
+
+	def _on_load_finished(
+		ok: bool,
+	):
+		qwebchannel_js = QFile('://qtwebchannel/qwebchannel.js')
+		qwebchannel_js.open(QFile.ReadOnly)
+		view.page().runJavaScript(bytes(qwebchannel_js.readAll()).decode('utf-8'))
+		qwebchannel_js.close()
+		constants = (
+			f'const RPC_URL = {json.dumps(rpc.url)};'
+			f'const WINDOW_ID = {json.dumps(WINDOW_ID)};'
+			f'const CALLS = {calls}; const WARMUP = {warmup};'
+		)
+		view.page().runJavaScript(constants + BENCH_SCRIPT)
+
+	view.loadFinished.connect(_on_load_finished)
+	# Same origin as the RPC server, so fetch needs no CORS preflight
+	view.setHtml(
+		'<!DOCTYPE html><title>rpc_channel</title>',
+		QUrl(rpc.url),
+	)
+	app.exec()
+	return {
+		name: summarize(
+			[latency / 1000 for latency in measurement['latencies']],
+			measurement['elapsed'] / 1000,
+		)
+		for name, measurement in reporter.raw.items()
+	}
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+	parser.add_argument(
+		'--mode',
+		choices=(
+			'webview',
+			'python',
+		),
+		default='webview',
+		help='time the calls from JavaScript in a webview, or from Python',
+	)
+	parser.add_argument('--calls', type=int, default=2000, help='calls per transport')
+	parser.add_argument('--warmup', type=int, default=100, help='warm-up calls per transport')
+	parser.add_argument('--output', help='write the JSON results to this file')
+	args = parser.parse_args()
+
+	rpc = build_rpc()
+	rpc.run()
+	wait_until_started(rpc)
+	run = run_webview if args.mode == 'webview' else run_python
+	results = {
+		'meta': {
+			'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+			'python': platform.python_version(),
+			'platform': platform.platform(),
+			'mode': args.mode,
+			'event_loop': rpc.event_loop,
+			'calls': args.calls,
+		},
+		'transports': run(
+			rpc,
+			args.calls,
+			args.warmup,
+		),
+	}
+	output = json.dumps(results, indent=2)
+	if args.output:
+		with open(args.output, 'w', encoding='utf-8') as file:
+			file.write(output + '\n')
+	print(output)
@@ -0,0 +1,273 @@
+"""
+Benchmark of the binary result encoders against JSON for tables and arrays.
+
+Starts an RPC server on the local loop with a method returning a list of
+records (with and without a binary encoder) and one returning a NumPy array.
+Every scenario calls a method over HTTP and decodes the body
+the way a client would: `json.loads` for JSON, and the header plus zero-copy
+`numpy.frombuffer` views (or `pyarrow.ipc`) for the binary formats. It
+reports latency percentiles and the body size as JSON.
+
+Needs numpy; the 'arrow' scenario also needs pyarrow.
+
+Usage
+-----
+```
+python benchmarks/rpc_columnar.py --rows 100000 --calls 50
+```
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import time
+
+import aiohttp
+import numpy
+
+from pyloid.columnar import (
+	unpack_buffers,
+)
+from pyloid.rpc import (
+	PyloidRPC,
+)
+
+from _common import (
+	WINDOW_ID,
+	BenchPyloid,
+	run_load,
+)
+
+try:
+	import pyarrow
+	import pyarrow.ipc
+except ImportError:
+	pyarrow = None
+
+NUMPY_DTYPES = {
+	'bool': '|u1',
+	'int32': '<i4',
+	'int64': '<i8',
+	'float32': '<f4',
+	'float64': '<f8',
+}
+
+
+def build_rpc(
+	rows: int,
+	size: int,
+) -> PyloidRPC:
+	"""Create the server with JSON and binary variants of a table and an array method."""
+	rpc = PyloidRPC()
+	rpc.pyloid = BenchPyloid()
+	logging.getLogger('pyloid.rpc').setLevel(logging.ERROR)
+	records = [
+		{
+			'id': index,
+			'price': index * 0.25,
+			'volume': index * 7,
+			'symbol': f'SYM{index % 500}',
+		}
+		for index in range(rows)
+	]
+	matrix = numpy.random.default_rng(0).random(
+		(
+			size,
+			size,
+		)
+	)
+
+	async def table():
+		return records
+
+	async def grid():
+		return matrix
+
+	rpc.method('table_json')(table)
+	rpc.method(
+		'table_columns',
+		encoder='columns',
+	)(table)
+	if pyarrow is not None:
+		rpc.method(
+			'table_arrow',
+			encoder='arrow',
+		)(table)
+	# JSON clients of an encoder method get the array as nested lists
+	rpc.method(
+		'grid',
+		encoder='ndarray',
+	)(grid)
+	return rpc
+
+
+def decode_pyloid(
+	body: bytes,
+):
+	"""View the buffers of an 'ndarray' or 'columns' body without copying them."""
+	(
+		header,
+		view,
+	) = unpack_buffers(body)
+	columns = header.get('columns') or [header]
+	for column in columns:
+		(
+			offset,
+			length,
+		) = column['data']
+		if column['dtype'] in NUMPY_DTYPES:
+			numpy.frombuffer(
+				view[offset : offset + length],
+				dtype=NUMPY_DTYPES[column['dtype']],
+			)
+
+
+def decode_arrow(
+	body: bytes,
+):
+	pyarrow.ipc.open_stream(body).read_all()
+
+
+SCENARIOS = {
+	'table_json': (
+		'table_json',
+		'application/json',
+		json.loads,
+	),
+	'table_columns': (
+		'table_columns',
+		'application/x-pyloid-columns',
+		decode_pyloid,
+	),
+	'table_arrow': (
+		'table_arrow',
+		'application/vnd.apache.arrow.stream',
+		decode_arrow,
+	),
+	'ndarray_json': (
+		'grid',
+		'application/json',
+		json.loads,
+	),
+	'ndarray_binary': (
+		'grid',
+		'application/x-pyloid-ndarray',
+		decode_pyloid,
+	),
+}
+
+
+async def main(
+	scenarios,
+	rows: int,
+	size: int,
+	calls: int,
+	warmup: int,
+):
+	rpc = build_rpc(
+		rows,
+		size,
+	)
+	await rpc.start_async()
+	results = {
+		'meta': {
+			'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+			'python': platform.python_version(),
+			'platform': platform.platform(),
+			'codec': rpc._codec.name,
+			'numpy': numpy.__version__,
+			'pyarrow': pyarrow.__version__ if pyarrow is not None else None,
+			'rows': rows,
+			'array_shape': [
+				size,
+				size,
+			],
+			'calls': calls,
+		},
+		'scenarios': {},
+	}
+	try:
+		async with aiohttp.ClientSession(
+			headers={
+				'X-Pyloid-Window-Id': WINDOW_ID,
+				'Accept-Encoding': 'identity',
+			}
+		) as session:
+			for scenario in scenarios:
+				(
+					method,
+					accept,
+					decode,
+				) = SCENARIOS[scenario]
+				sizes = []
+
+				async def _call(
+					method=method,
+					accept=accept,
+					decode=decode,
+					sizes=sizes,
+				):
+					async with session.post(
+						rpc.url,
+						json={
+							'jsonrpc': '2.0',
+							'method': method,
+							'params': [],
+							'id': 1,
+						},
+						headers={'Accept': accept},
+					) as resp:
+						body = await resp.read()
+						if resp.status != 200 or resp.content_type != accept:
+							raise RuntimeError(
+								f'Unexpected response {resp.status} {resp.content_type}: {body[:200]!r}'
+							)
+					decode(body)
+					sizes.append(len(body))
+
+				await run_load(_call, warmup, 1)
+				summary = await run_load(_call, calls, 1)
+				summary['body_bytes'] = sizes[-1]
+				results['scenarios'][scenario] = summary
+	finally:
+		await rpc.stop_async()
+	return results
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+	parser.add_argument(
+		'--scenarios',
+		default=','.join(name for name in SCENARIOS if pyarrow is not None or 'arrow' not in name),
+		help=f'comma-separated scenarios to run ({", ".join(SCENARIOS)})',
+	)
+	parser.add_argument('--rows', type=int, default=100000, help='records in the table')
+	parser.add_argument('--size', type=int, default=1000, help='side of the square float64 array')
+	parser.add_argument('--calls', type=int, default=50, help='calls per scenario')
+	parser.add_argument('--warmup', type=int, default=3, help='warm-up calls per scenario')
+	parser.add_argument('--output', help='write the JSON results to this file')
+	args = parser.parse_args()
+
+	selected = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+	unknown = [name for name in selected if name not in SCENARIOS]
+	if unknown:
+		parser.error(f'unknown scenarios: {", ".join(unknown)}')
+	if pyarrow is None and 'table_arrow' in selected:
+		parser.error('the table_arrow scenario needs pyarrow')
+
+	results = asyncio.run(
+		main(
+			selected,
+			args.rows,
+			args.size,
+			args.calls,
+			args.warmup,
+		)
+	)
+	output = json.dumps(results, indent=2)
+	if args.output:
+		with open(args.output, 'w', encoding='utf-8') as file:
+			file.write(output + '\n')
+	print(output)
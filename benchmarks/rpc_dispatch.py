@@ -0,0 +1,161 @@
+"""
+Micro-benchmark for the per-call dispatch overhead of PyloidRPC.
+
+Compares the argument preparation that used to run on every request
+(`inspect.signature` twice, a fresh allowed-parameter set and an `RPCContext`)
+with the precompiled `_MethodPlan.bind`, and measures the full `_dispatch`
+path for a no-op method.
+
+Usage
+-----
+```
+python benchmarks/rpc_dispatch.py --calls 200000
+```
+"""
+
+import argparse
+import asyncio
+import inspect
+import time
+
+from pyloid.rpc import (
+	PyloidRPC,
+	RPCContext,
+	_MethodPlan,
+)
+
+from _common import (
+	BenchPyloid,
+)
+
+
+async def echo(
+	ctx: RPCContext,
+	a: int,
+	b: int = 0,
+):
+	return a + b
+
+
+def legacy_bind(
+	func,
+	params,
+	pyloid,
+	window,
+):
+	"""Argument preparation as `_handle_rpc` performed it before dispatch plans."""
+	sig = inspect.signature(func)
+	has_ctx_param = 'ctx' in sig.parameters
+	if has_ctx_param and 'ctx' not in params:
+		params = params.copy()
+		params['ctx'] = RPCContext(
+			pyloid=pyloid,
+			window=window,
+		)
+	params = params.copy()
+	params['_pyloid_window_id'] = window.id
+	sig = inspect.signature(func)
+	allowed_params = set(sig.parameters.keys())
+	return {k: v for k, v in params.items() if k in allowed_params}
+
+
+def plan_bind(
+	plan,
+	params,
+	pyloid,
+	window,
+):
+	"""Argument preparation with a precompiled dispatch plan."""
+	return plan.bind(
+		params,
+		RPCContext(
+			pyloid=pyloid,
+			window=window,
+		),
+	)
+
+
+def bench_sync(
+	fn,
+	calls,
+):
+	start = time.perf_counter()
+	for _ in range(calls):
+		fn()
+	return (time.perf_counter() - start) / calls
+
+
+async def bench_dispatch(
+	rpc,
+	request,
+	calls,
+):
+	start = time.perf_counter()
+	for _ in range(calls):
+		await rpc._dispatch(request)
+	return (time.perf_counter() - start) / calls
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+	parser.add_argument(
+		'--calls',
+		type=int,
+		default=100000,
+		help='number of calls per measurement',
+	)
+	args = parser.parse_args()
+
+	pyloid = BenchPyloid()
+	rpc = PyloidRPC()
+	rpc.pyloid = pyloid
+	rpc.method()(echo)
+	plan = _MethodPlan(
+		'echo',
+		echo,
+	)
+	params = {
+		'a': 1,
+		'b': 2,
+	}
+
+	legacy = bench_sync(
+		lambda: legacy_bind(
+			echo,
+			params,
+			pyloid,
+			pyloid.window,
+		),
+		args.calls,
+	)
+	planned = bench_sync(
+		lambda: plan_bind(
+			plan,
+			params,
+			pyloid,
+			pyloid.window,
+		),
+		args.calls,
+	)
+	dispatch = asyncio.run(
+		bench_dispatch(
+			rpc,
+			{
+				'jsonrpc': '2.0',
+				'method': 'echo',
+				'params': params,
+				'id': pyloid.window.id,
+			},
+			args.calls,
+		)
+	)
+
+	print(f'legacy argument binding : {legacy * 1e6:8.3f} us/call')
+	print(
+		f'plan argument binding   : {planned * 1e6:8.3f} us/call ({legacy / planned:.1f}x faster)'
+	)
+	print(f'full _dispatch          : {dispatch * 1e6:8.3f} us/call')
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,306 @@
+"""
+GUI frame responsiveness benchmark of the in-process and worker RPC modes.
+
+The main thread runs a 60 fps frame loop standing in for the Qt event loop:
+each frame does a little Python work and sleeps until the next frame is due.
+A separate load process keeps calling a CPU-heavy RPC method meanwhile. With
+the server in-process, the handlers compete with the frame loop for the GIL
+and frames arrive late; with `workers`, they run in their own processes.
+
+Each mode reports the frame interval percentiles, the number of dropped
+frames and the RPC throughput reached by the load process, as JSON.
+
+Usage
+-----
+```
+python benchmarks/rpc_gui_responsiveness.py --duration 5 --workers 2
+python benchmarks/rpc_gui_responsiveness.py --modes idle,inprocess --output before.json
+```
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import platform
+import time
+
+import aiohttp
+
+from pyloid.rpc import (
+	PyloidRPC,
+)
+
+from _common import (
+	WINDOW_ID,
+	BenchPyloid,
+	summarize,
+)
+
+MODES = {
+	'idle': 'frame loop without RPC load',
+	'inprocess': 'RPC server on a thread of the GUI process',
+	'workers': 'RPC server in --workers worker processes',
+}
+
+
+def build_rpc() -> PyloidRPC:
+	"""Create a server with the CPU-heavy method called by the load process."""
+	rpc = PyloidRPC()
+
+	@rpc.method()
+	def crunch(
+		n: int,
+	):
+		return sum(index * index for index in range(n))
+
+	return rpc
+
+
+# Worker processes import the server from this module, so both live at module level
+inprocess_rpc = build_rpc()
+worker_rpc = build_rpc()
+
+
+def generate_load(
+	url: str,
+	concurrency: int,
+	work: int,
+	ready,
+	stop,
+	conn,
+):
+	"""Call `crunch` from `concurrency` clients until `stop` is set (load process)."""
+
+	async def _run():
+		latencies = []
+		async with aiohttp.ClientSession(headers={'X-Pyloid-Window-Id': WINDOW_ID}) as session:
+
+			async def _client():
+				body = {
+					'jsonrpc': '2.0',
+					'method': 'crunch',
+					'params': {'n': work},
+					'id': 1,
+				}
+				while not stop.is_set():
+					start = time.perf_counter()
+					async with session.post(
+						url,
+						json=body,
+					) as resp:
+						await resp.read()
+						if resp.status != 200:
+							raise RuntimeError(f'Expected HTTP 200, got {resp.status}')
+					latencies.append(time.perf_counter() - start)
+					ready.set()
+
+			start = time.perf_counter()
+			await asyncio.gather(*(_client() for _ in range(concurrency)))
+			return summarize(
+				latencies,
+				time.perf_counter() - start,
+			)
+
+	conn.send(asyncio.run(_run()))
+
+
+def measure_frames(
+	duration: float,
+	fps: int,
+	frame_work: int,
+):
+	"""Run the frame loop for `duration` seconds and summarize the frame intervals."""
+	period = 1.0 / fps
+	intervals = []
+	next_frame = time.perf_counter()
+	last = None
+	end = next_frame + duration
+	while next_frame < end:
+		now = time.perf_counter()
+		if last is not None:
+			intervals.append(now - last)
+		last = now
+		# Layout and paint work done in Python by the application
+		sum(index * index for index in range(frame_work))
+		next_frame += period
+		delay = next_frame - time.perf_counter()
+		if delay > 0:
+			time.sleep(delay)
+		else:
+			# Skip the frames that are already late, like a vsync'ed renderer
+			next_frame = time.perf_counter()
+
+	ordered = sorted(intervals)
+
+	def _percentile(
+		q: float,
+	) -> float:
+		return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 3)
+
+	return {
+		'frames': len(ordered) + 1,
+		'expected_frames': int(duration * fps),
+		'dropped_frames': sum(
+			int(interval / period) - 1 for interval in ordered if interval >= 2 * period
+		),
+		'interval_p50_ms': _percentile(0.50),
+		'interval_p99_ms': _percentile(0.99),
+		'interval_max_ms': round(ordered[-1] * 1000, 3),
+	}
+
+
+def run_mode(
+	rpc,
+	duration: float,
+	fps: int,
+	frame_work: int,
+	concurrency: int,
+	work: int,
+):
+	"""Measure the frame loop while a load process calls `rpc` (or no load if None)."""
+	if rpc is None:
+		return {
+			'frames': measure_frames(
+				duration,
+				fps,
+				frame_work,
+			)
+		}
+	context = multiprocessing.get_context('spawn')
+	ready = context.Event()
+	stop = context.Event()
+	(
+		parent_conn,
+		child_conn,
+	) = context.Pipe()
+	process = context.Process(
+		target=generate_load,
+		args=(
+			rpc.url,
+			concurrency,
+			work,
+			ready,
+			stop,
+			child_conn,
+		),
+		daemon=True,
+	)
+	process.start()
+	try:
+		if not ready.wait(30):
+			raise RuntimeError('The load process did not get a response in 30 seconds.')
+		frames = measure_frames(
+			duration,
+			fps,
+			frame_work,
+		)
+		stop.set()
+		load = parent_conn.recv()
+	finally:
+		stop.set()
+		process.join(10)
+	return {
+		'frames': frames,
+		'load': load,
+	}
+
+
+def main(
+	modes,
+	workers: int,
+	duration: float,
+	fps: int,
+	frame_work: int,
+	concurrency: int,
+	work: int,
+):
+	pyloid = BenchPyloid()
+	results = {
+		'meta': {
+			'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+			'python': platform.python_version(),
+			'platform': platform.platform(),
+			'cpus': multiprocessing.cpu_count(),
+			'workers': workers,
+			'duration_s': duration,
+			'fps': fps,
+			'frame_work': frame_work,
+			'concurrency': concurrency,
+			'work': work,
+		},
+		'modes': {},
+	}
+	for mode in modes:
+		rpc = None
+		if mode == 'inprocess':
+			rpc = inprocess_rpc
+			rpc.pyloid = pyloid
+			rpc.run()
+		elif mode == 'workers':
+			rpc = worker_rpc
+			rpc.pyloid = pyloid
+			rpc.workers = workers
+			rpc.run()
+		try:
+			results['modes'][mode] = run_mode(
+				rpc,
+				duration,
+				fps,
+				frame_work,
+				concurrency,
+				work,
+			)
+		finally:
+			if mode == 'workers':
+				rpc.stop_workers()
+	return results
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+	parser.add_argument(
+		'--modes',
+		default=','.join(MODES),
+		help=f'comma-separated modes to run ({", ".join(MODES)})',
+	)
+	parser.add_argument('--workers', type=int, default=2, help='RPC worker processes')
+	parser.add_argument('--duration', type=float, default=5.0, help='seconds measured per mode')
+	parser.add_argument('--fps', type=int, default=60, help='target frame rate')
+	parser.add_argument(
+		'--frame-work',
+		type=int,
+		default=5000,
+		help='loop iterations of Python work per frame',
+	)
+	parser.add_argument('--concurrency', type=int, default=8, help='concurrent RPC clients')
+	parser.add_argument(
+		'--work',
+		type=int,
+		default=200000,
+		help='loop iterations per crunch call',
+	)
+	parser.add_argument('--output', help='write the JSON results to this file')
+	args = parser.parse_args()
+
+	selected = [name.strip() for name in args.modes.split(',') if name.strip()]
+	unknown = [name for name in selected if name not in MODES]
+	if unknown:
+		parser.error(f'unknown modes: {", ".join(unknown)}')
+
+	output = json.dumps(
+		main(
+			selected,
+			args.workers,
+			args.duration,
+			args.fps,
+			args.frame_work,
+			args.concurrency,
+			args.work,
+		),
+		indent=2,
+	)
+	if args.output:
+		with open(args.output, 'w', encoding='utf-8') as file:
+			file.write(output + '\n')
+	print(output)
@@ -0,0 +1,362 @@
+"""
+Load-testing benchmark suite for the PyloidRPC server.
+
+Starts an RPC server on the local loop and drives it with concurrent aiohttp
+clients through a set of scenarios: small calls, large request and response
+payloads, error responses, notifications, batches and the WebSocket
+transport. Every scenario runs at each requested concurrency level and
+reports throughput and latency percentiles as JSON, so runs can be saved and
+compared.
+
+Usage
+-----
+```
+python benchmarks/rpc_load.py --calls 2000 --concurrency 1,8,64 --output before.json
+python benchmarks/rpc_load.py --scenarios small,batch --compare before.json
+```
+
+To compare event loop implementations, save an asyncio run and compare a
+uvloop run against it:
+
+```
+python benchmarks/rpc_load.py --loop asyncio --output asyncio.json
+python benchmarks/rpc_load.py --loop uvloop --compare asyncio.json
+```
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import sys
+import time
+
+import aiohttp
+
+from pyloid.rpc import (
+	PyloidRPC,
+	RPCError,
+)
+
+from pyloid.utils import (
+	event_loop_name,
+	new_event_loop,
+)
+
+from _common import (
+	WINDOW_ID,
+	BenchPyloid,
+	WebSocketClient,
+	run_load,
+)
+
+SCENARIOS = {
+	'small': 'HTTP call with scalar params and result',
+	'large_request': 'HTTP call with a large string param',
+	'large_response': 'HTTP call returning a large list of records',
+	'error': 'HTTP call of a method raising RPCError',
+	'not_found': 'HTTP call of an unknown method',
+	'notification': 'HTTP notification (no id, 204 response)',
+	'batch': 'HTTP batch of --batch-size small calls',
+	'ws_small': 'WebSocket call with scalar params and result',
+	'ws_large_response': 'WebSocket call returning a large list of records',
+}
+
+
+def build_rpc(
+	payload_size: int,
+) -> PyloidRPC:
+	"""Create the server and the methods the scenarios call."""
+	rpc = PyloidRPC()
+	rpc.pyloid = BenchPyloid()
+	# the error scenarios would otherwise log a warning per call
+	logging.getLogger('pyloid.rpc').setLevel(logging.ERROR)
+	records = [
+		{
+			'id': index,
+			'name': f'record-{index}',
+			'score': index * 0.5,
+		}
+		for index in range(max(1, payload_size // 48))
+	]
+
+	@rpc.method()
+	async def add(
+		a: int,
+		b: int,
+	):
+		return a + b
+
+	@rpc.method()
+	async def measure(
+		text: str,
+	):
+		return len(text)
+
+	@rpc.method()
+	async def records_list():
+		return records
+
+	@rpc.method()
+	async def fail():
+		raise RPCError(
+			'Expected failure',
+			code=-32000,
+		)
+
+	@rpc.method()
+	async def ping():
+		return None
+
+	return rpc
+
+
+def build_scenarios(
+	rpc: PyloidRPC,
+	session: aiohttp.ClientSession,
+	ws: WebSocketClient,
+	payload_size: int,
+	batch_size: int,
+):
+	"""Return one coroutine function per scenario, each checking its response."""
+	large_text = 'x' * payload_size
+
+	def _request(
+		method: str,
+		params,
+		request_id=WINDOW_ID,
+	):
+		return {
+			'jsonrpc': '2.0',
+			'method': method,
+			'params': params,
+			'id': request_id,
+		}
+
+	async def _post(
+		body,
+		status: int,
+	):
+		async with session.post(
+			rpc.url,
+			json=body,
+		) as resp:
+			data = await resp.read()
+			if resp.status != status:
+				raise RuntimeError(f'Expected HTTP {status}, got {resp.status}: {data[:200]!r}')
+			return data
+
+	small = _request(
+		'add',
+		{
+			'a': 1,
+			'b': 2,
+		},
+	)
+	large_request = _request(
+		'measure',
+		{'text': large_text},
+	)
+	large_response = _request(
+		'records_list',
+		{},
+	)
+	error = _request(
+		'fail',
+		{},
+	)
+	not_found = _request(
+		'missing',
+		{},
+	)
+	notification = {
+		'jsonrpc': '2.0',
+		'method': 'ping',
+		'params': {},
+	}
+	batch = [
+		_request(
+			'add',
+			{
+				'a': index,
+				'b': 1,
+			},
+			index,
+		)
+		for index in range(batch_size)
+	]
+
+	async def _ws_small():
+		response = await ws.call(
+			'add',
+			{
+				'a': 1,
+				'b': 2,
+			},
+		)
+		if response.get('result') != 3:
+			raise RuntimeError(f'Unexpected response: {response}')
+
+	async def _ws_large_response():
+		response = await ws.call(
+			'records_list',
+			{},
+		)
+		if 'result' not in response:
+			raise RuntimeError(f'Unexpected response: {response}')
+
+	return {
+		'small': lambda: _post(small, 200),
+		'large_request': lambda: _post(large_request, 200),
+		'large_response': lambda: _post(large_response, 200),
+		'error': lambda: _post(error, 500),
+		'not_found': lambda: _post(not_found, 404),
+		'notification': lambda: _post(notification, 204),
+		'batch': lambda: _post(batch, 200),
+		'ws_small': _ws_small,
+		'ws_large_response': _ws_large_response,
+	}
+
+
+def compare(
+	results,
+	baseline,
+):
+	"""Print the relative change of each measurement against a previous run."""
+	for scenario, levels in results['scenarios'].items():
+		for level, summary in levels.items():
+			previous = baseline.get('scenarios', {}).get(scenario, {}).get(level)
+			if previous is None:
+				continue
+			changes = []
+			for key in (
+				'calls_per_s',
+				'p50_ms',
+				'p99_ms',
+			):
+				if previous.get(key):
+					changes.append(f'{key} {(summary[key] / previous[key] - 1) * 100:+.1f}%')
+			print(
+				f'{scenario:<18} c={level:<4} ' + '  '.join(changes),
+				file=sys.stderr,
+			)
+
+
+async def main(
+	scenarios,
+	calls: int,
+	concurrency_levels,
+	payload_size: int,
+	batch_size: int,
+	warmup: int,
+):
+	rpc = build_rpc(payload_size)
+	await rpc.start_async()
+	results = {
+		'meta': {
+			'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+			'python': platform.python_version(),
+			'platform': platform.platform(),
+			'aiohttp': aiohttp.__version__,
+			'event_loop': event_loop_name(),
+			'codec': rpc._codec.name,
+			'calls': calls,
+			'payload_size': payload_size,
+			'batch_size': batch_size,
+		},
+		'scenarios': {},
+	}
+	try:
+		connector = aiohttp.TCPConnector(limit=max(concurrency_levels))
+		async with aiohttp.ClientSession(
+			connector=connector,
+			headers={'X-Pyloid-Window-Id': WINDOW_ID},
+		) as session:
+			ws = WebSocketClient(
+				session,
+				rpc.ws_url,
+			)
+			await ws.connect()
+			calls_by_scenario = build_scenarios(
+				rpc,
+				session,
+				ws,
+				payload_size,
+				batch_size,
+			)
+			for scenario in scenarios:
+				call = calls_by_scenario[scenario]
+				await run_load(call, warmup, 1)
+				results['scenarios'][scenario] = {
+					str(concurrency): await run_load(call, calls, concurrency)
+					for concurrency in concurrency_levels
+				}
+			await ws.close()
+	finally:
+		await rpc.stop_async()
+	return results
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+	parser.add_argument(
+		'--scenarios',
+		default=','.join(SCENARIOS),
+		help=f'comma-separated scenarios to run ({", ".join(SCENARIOS)})',
+	)
+	parser.add_argument('--calls', type=int, default=2000, help='calls per measurement')
+	parser.add_argument(
+		'--concurrency',
+		default='1,16,64',
+		help='comma-separated numbers of concurrent callers',
+	)
+	parser.add_argument(
+		'--payload-size',
+		type=int,
+		default=256 * 1024,
+		help='approximate size in bytes of the large payloads',
+	)
+	parser.add_argument('--batch-size', type=int, default=20, help='calls per batch request')
+	parser.add_argument('--warmup', type=int, default=100, help='warm-up calls per scenario')
+	parser.add_argument(
+		'--loop',
+		choices=(
+			'asyncio',
+			'uvloop',
+		),
+		default='asyncio',
+		help='event loop implementation (uvloop falls back to asyncio if not installed)',
+	)
+	parser.add_argument('--output', help='write the JSON results to this file')
+	parser.add_argument('--compare', help='print the change against a previous JSON result file')
+	args = parser.parse_args()
+
+	selected = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+	unknown = [name for name in selected if name not in SCENARIOS]
+	if unknown:
+		parser.error(f'unknown scenarios: {", ".join(unknown)}')
+
+	loop = new_event_loop(args.loop == 'uvloop')
+	asyncio.set_event_loop(loop)
+	try:
+		results = loop.run_until_complete(
+			main(
+				selected,
+				args.calls,
+				[int(level) for level in args.concurrency.split(',')],
+				args.payload_size,
+				args.batch_size,
+				args.warmup,
+			)
+		)
+	finally:
+		loop.close()
+	output = json.dumps(results, indent=2)
+	if args.output:
+		with open(args.output, 'w', encoding='utf-8') as file:
+			file.write(output + '\n')
+	print(output)
+	if args.compare:
+		with open(args.compare, encoding='utf-8') as file:
+			compare(results, json.load(file))
@@ -0,0 +1,143 @@
+"""
+Round-trip benchmark of the PyloidRPC HTTP POST and WebSocket transports.
+
+Starts an RPC server on the local loop and measures, for each transport,
+sequential round-trip latency and the throughput of many concurrent calls.
+On platforms with Unix domain sockets, HTTP POST over the socket is measured
+as well.
+
+Usage
+-----
+```
+python benchmarks/rpc_transport.py --calls 5000 --concurrency 32
+```
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import tempfile
+
+import aiohttp
+
+from pyloid.rpc import (
+	PyloidRPC,
+)
+
+from _common import (
+	WINDOW_ID,
+	BenchPyloid,
+	WebSocketClient,
+	run_load,
+)
+
+
+async def main(
+	calls: int,
+	concurrency: int,
+):
+	unix_socket = (
+		os.path.join(
+			tempfile.mkdtemp(),
+			'rpc.sock',
+		)
+		if hasattr(
+			socket,
+			'AF_UNIX',
+		)
+		else None
+	)
+	rpc = PyloidRPC(unix_socket=unix_socket)
+	rpc.pyloid = BenchPyloid()
+
+	@rpc.method()
+	async def echo(
+		value: int,
+	):
+		return value
+
+	await rpc.start_async()
+	results = {}
+	try:
+		async with aiohttp.ClientSession() as session:
+			payload = {
+				'jsonrpc': '2.0',
+				'method': 'echo',
+				'params': {'value': 1},
+				'id': WINDOW_ID,
+			}
+
+			async def _post():
+				async with session.post(
+					rpc.url,
+					json=payload,
+				) as resp:
+					await resp.read()
+
+			transports = [
+				(
+					'http_post',
+					_post,
+				),
+			]
+			if unix_socket is not None:
+				unix_session = aiohttp.ClientSession(
+					connector=aiohttp.UnixConnector(path=unix_socket),
+				)
+
+				async def _unix_post():
+					async with unix_session.post(
+						'http://localhost/rpc',
+						json=payload,
+					) as resp:
+						await resp.read()
+
+				transports.append(
+					(
+						'unix_post',
+						_unix_post,
+					)
+				)
+
+			ws = WebSocketClient(
+				session,
+				rpc.ws_url,
+			)
+			await ws.connect()
+
+			async def _ws_call():
+				await ws.call(
+					'echo',
+					{'value': 1},
+				)
+
+			transports.append(
+				(
+					'websocket',
+					_ws_call,
+				)
+			)
+
+			for name, call in transports:
+				await run_load(call, 100, 1)  # warm up
+				results[name] = {
+					'sequential': await run_load(call, calls, 1),
+					'concurrent': await run_load(call, calls, concurrency),
+				}
+			await ws.close()
+			if unix_socket is not None:
+				await unix_session.close()
+	finally:
+		await rpc.stop_async()
+
+	print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+	parser.add_argument('--calls', type=int, default=2000, help='calls per measurement')
+	parser.add_argument('--concurrency', type=int, default=32, help='concurrent callers')
+	args = parser.parse_args()
+	asyncio.run(main(args.calls, args.concurrency))
@@ -0,0 +1,66 @@
+from typing import (
+	TYPE_CHECKING,
+)
+
+from PySide6.QtCore import (
+	Signal,
+)
+
+from ..ipc import (
+	PyloidIPC,
+	Bridge,
+)
+
+if TYPE_CHECKING:
+	from ..rpc import (
+		PyloidRPC,
+	)
+
+
+class RPCChannel(PyloidIPC):
+	"""
+	JSON-RPC transport over the window's QWebChannel.
+
+	Registered on every window as `__PYLOID_RPC__` when the application has an
+	in-process `PyloidRPC` server, next to the `__PYLOID__` BaseIPC object.
+	Messages skip the loopback TCP connection and the HTTP layer: `send`
+	hands them to the server's event loop, and responses come back through
+	the `response` signal, so the Qt main thread never waits for a method.
+	The same `@rpc.method` functions and `RPCContext` serve both transports.
+
+	JavaScript calls it through `window.pyloid.rpc`:
+
+	```javascript
+	const sum = await window.pyloid.rpc.call('add', { a: 1, b: 2 });
+	window.pyloid.rpc.notify('log', ['page ready']);
+	```
+
+	Attributes
+	----------
+	response : Signal
+	    Emitted with each encoded JSON-RPC response.
+	"""
+
+	response = Signal(str)
+
+	def __init__(
+		self,
+		window_id: str,
+		server: 'PyloidRPC',
+	):
+		super().__init__()
+		self.window_id: str = window_id
+		self.server: 'PyloidRPC' = server
+
+	@Bridge(str)
+	def send(
+		self,
+		message: str,
+	):
+		"""Dispatches a JSON-RPC request object or batch array to the server."""
+		# The signal is emitted on the RPC thread; Qt queues it to the main thread
+		self.server.post_message(
+			message,
+			self.window_id,
+			self.response.emit,
+		)
@@ -47,6 +47,12 @@ from .custom.titlebar import (
 from .base_ipc.base import (
 	BaseIPC,
 )
+from .base_ipc.rpc_channel import (
+	RPCChannel,
+)
+from .rpc import (
+	PyloidRPC,
+)
 from PySide6.QtGui import (
 	QPixmap,
 	QMovie,
@@ -444,6 +450,15 @@ class _BrowserWindow:
 			)
 		]
 
+		# JSON-RPC over the QWebChannel, when the RPC server runs in this process
+		if isinstance(self.app.server, PyloidRPC) and not self.app.server.workers:
+			self.IPCs.append(
+				RPCChannel(
+					self.id,
+					self.app.server,
+				)
+			)
+
 		for ipc in IPCs:
 			ipc.window_id: str = self.id
 			ipc.window: 'BrowserWindow' = self
@@ -582,6 +597,11 @@ class _BrowserWindow:
 						'__PYLOID__',
 						ipc,
 					)
+				elif ipc.__class__.__name__ == 'RPCChannel':
+					self.channel.registerObject(
+						'__PYLOID_RPC__',
+						ipc,
+					)
 				else:
 					self.channel.registerObject(
 						ipc.__class__.__name__,
@@ -663,6 +683,8 @@ class _BrowserWindow:
 
                     %s
 
+                    %s
+
                     document.addEventListener('mousedown', function (e) {
                         if (e.target.hasAttribute('data-pyloid-drag-region')) {
                             window.__PYLOID__.startSystemDrag();
@@ -684,12 +706,63 @@ class _BrowserWindow:
 					f"window['ipc']['{ipc.__class__.__name__}'] = channel.objects['{ipc.__class__.__name__}'];\n"
 					f"console.log('{ipc.__class__.__name__} object initialized:', window['ipc']['{ipc.__class__.__name__}']);"
 					for ipc in self.IPCs
-					if ipc.__class__.__name__ != 'BaseIPC'
+					if ipc.__class__.__name__ not in ('BaseIPC', 'RPCChannel')
 				]
 			)
 
 			base_ipc_init = "window['__PYLOID__'] = channel.objects['__PYLOID__'];\n"
 
+			# Promise-based client of the QWebChannel RPC transport, matching responses by id
+			rpc_init = """
+                    if (channel.objects['__PYLOID_RPC__']) {
+                        const rpcChannel = channel.objects['__PYLOID_RPC__'];
+                        const pending = {};
+                        let nextId = 1;
+                        const message = function (method, params, id) {
+                            const request = {
+                                jsonrpc: '2.0',
+                                method: method,
+                                params: params === undefined ? {} : params
+                            };
+                            if (id !== undefined) {
+                                request.id = id;
+                            }
+                            return JSON.stringify(request);
+                        };
+                        rpcChannel.response.connect(function (text) {
+                            const data = JSON.parse(text);
+                            (Array.isArray(data) ? data : [data]).forEach(function (response) {
+                                const settle = pending[response.id];
+                                if (settle) {
+                                    delete pending[response.id];
+                                    settle(response);
+                                }
+                            });
+                        });
+                        window.pyloid.rpc = {
+                            call: function (method, params) {
+                                return new Promise(function (resolve, reject) {
+                                    const id = nextId++;
+                                    pending[id] = function (response) {
+                                        if (response.error) {
+                                            const error = new Error(response.error.message);
+                                            error.code = response.error.code;
+                                            error.data = response.error.data;
+                                            reject(error);
+                                        } else {
+                                            resolve(response.result);
+                                        }
+                                    };
+                                    rpcChannel.send(message(method, params, id));
+                                });
+                            },
+                            notify: function (method, params) {
+                                rpcChannel.send(message(method, params));
+                            }
+                        };
+                    }
+                """
+
 			# Add zoom blocking code if zoomable is False
 			zoom_code = ""
 			if not self.zoomable:
@@ -701,7 +774,7 @@ class _BrowserWindow:
                     }, { passive: false });
                 """
 
-			self.web_view.page().runJavaScript(js_code % (base_ipc_init, ipcs_init_code, zoom_code))
+			self.web_view.page().runJavaScript(js_code % (base_ipc_init, ipcs_init_code, rpc_init, zoom_code))
 
 			# if splash screen is set, close it when the page is loaded
 			if self.close_on_load and self.splash_screen:
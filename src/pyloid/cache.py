@@ -0,0 +1,301 @@
+import time
+from collections import (
+	OrderedDict,
+)
+from typing import (
+	Any,
+	Callable,
+	Dict,
+	Hashable,
+	Iterable,
+	Optional,
+	Set,
+)
+
+from .codec import (
+	Codec,
+)
+
+
+class CacheEntry:
+	"""
+	A cached RPC result.
+
+	The result is encoded at most once per codec, so cache hits reuse the
+	serialized bytes instead of encoding the value again.
+
+	Attributes
+	----------
+	value : Any
+	    The value returned by the method.
+	expires_at : Optional[float]
+	    The `time.monotonic()` deadline of the entry, or None if it never expires.
+	tags : FrozenSet[str]
+	    Tags the entry can be invalidated by.
+	"""
+
+	__slots__ = (
+		'_encoded',
+		'expires_at',
+		'tags',
+		'value',
+	)
+
+	def __init__(
+		self,
+		value: Any,
+		expires_at: Optional[float] = None,
+		tags: Iterable[str] = (),
+	):
+		self.value = value
+		self.expires_at = expires_at
+		self.tags = frozenset(tags)
+		self._encoded: Dict[
+			str,
+			bytes,
+		] = {}
+
+	def encode(
+		self,
+		codec: Codec,
+	) -> bytes:
+		"""
+		Return the value encoded with a codec, encoding it on first use.
+
+		Parameters
+		----------
+		codec : Codec
+		    The codec of the response.
+
+		Returns
+		-------
+		bytes
+		    The encoded value.
+		"""
+		encoded = self._encoded.get(codec.name)
+		if encoded is None:
+			encoded = self._encoded[codec.name] = codec.encode(self.value)
+		return encoded
+
+
+class ResultCache:
+	"""
+	Size-bounded LRU cache with per-entry TTL and tag-based invalidation.
+
+	Used by `PyloidRPC` for methods registered with `cache=True`. It is not
+	thread-safe and must only be used from the RPC event loop.
+
+	Attributes
+	----------
+	maxsize : int
+	    The maximum number of entries; the least recently used entry is evicted
+	    when it is exceeded.
+	ttl : Optional[float]
+	    Seconds an entry stays valid, or None if entries only leave the cache
+	    through eviction or invalidation.
+	generation : int
+	    Incremented on every invalidation. Results computed while it changed
+	    are not stored, so a call that was running during an invalidation
+	    cannot put stale data back into the cache.
+	"""
+
+	def __init__(
+		self,
+		maxsize: int = 128,
+		ttl: Optional[float] = None,
+	):
+		if maxsize < 1:
+			raise ValueError('maxsize must be at least 1.')
+		self.maxsize = maxsize
+		self.ttl = ttl
+		self.generation = 0
+		self._entries: OrderedDict[
+			Hashable,
+			CacheEntry,
+		] = OrderedDict()
+		self._tags: Dict[
+			str,
+			Set[Hashable],
+		] = {}
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+		self.expirations = 0
+		self.invalidations = 0
+
+	def __len__(
+		self,
+	) -> int:
+		return len(self._entries)
+
+	def get(
+		self,
+		key: Hashable,
+	) -> Optional[CacheEntry]:
+		"""
+		Look up an entry and mark it as recently used.
+
+		Parameters
+		----------
+		key : Hashable
+		    The cache key.
+
+		Returns
+		-------
+		Optional[CacheEntry]
+		    The entry, or None if it is missing or expired.
+		"""
+		entry = self._entries.get(key)
+		if entry is None:
+			self.misses += 1
+			return None
+		if entry.expires_at is not None and entry.expires_at <= time.monotonic():
+			self._remove(key)
+			self.expirations += 1
+			self.misses += 1
+			return None
+		self._entries.move_to_end(key)
+		self.hits += 1
+		return entry
+
+	def put(
+		self,
+		key: Hashable,
+		value: Any,
+		tags: Iterable[str] = (),
+		generation: Optional[int] = None,
+	) -> CacheEntry:
+		"""
+		Store a value.
+
+		Parameters
+		----------
+		key : Hashable
+		    The cache key.
+		value : Any
+		    The value to store.
+		tags : Iterable[str], optional
+		    Tags the entry can be invalidated by.
+		generation : Optional[int], optional
+		    The `generation` read before the value was computed. If the cache was
+		    invalidated since, the value is not stored. Default is None.
+
+		Returns
+		-------
+		CacheEntry
+		    The entry holding the value, whether it was stored or not.
+		"""
+		entry = CacheEntry(
+			value,
+			time.monotonic() + self.ttl if self.ttl is not None else None,
+			tags,
+		)
+		if generation is not None and generation != self.generation:
+			return entry
+		if key in self._entries:
+			self._remove(key)
+		self._entries[key] = entry
+		for tag in entry.tags:
+			self._tags.setdefault(
+				tag,
+				set(),
+			).add(key)
+		while len(self._entries) > self.maxsize:
+			self._remove(next(iter(self._entries)))
+			self.evictions += 1
+		return entry
+
+	def _remove(
+		self,
+		key: Hashable,
+	):
+		entry = self._entries.pop(key)
+		for tag in entry.tags:
+			keys = self._tags.get(tag)
+			if keys is not None:
+				keys.discard(key)
+				if not keys:
+					del self._tags[tag]
+
+	def invalidate(
+		self,
+		match: Optional[
+			Callable[
+				[Hashable],
+				bool,
+			]
+		] = None,
+	) -> int:
+		"""
+		Remove entries.
+
+		Parameters
+		----------
+		match : Optional[Callable[[Hashable], bool]], optional
+		    Selects the keys to remove. If None, all entries are removed.
+
+		Returns
+		-------
+		int
+		    The number of removed entries.
+		"""
+		self.generation += 1
+		keys = [key for key in self._entries if match is None or match(key)]
+		for key in keys:
+			self._remove(key)
+		self.invalidations += len(keys)
+		return len(keys)
+
+	def invalidate_tags(
+		self,
+		tags: Iterable[str],
+	) -> int:
+		"""
+		Remove the entries carrying any of the tags.
+
+		Parameters
+		----------
+		tags : Iterable[str]
+		    The tags to invalidate.
+
+		Returns
+		-------
+		int
+		    The number of removed entries.
+		"""
+		self.generation += 1
+		keys = set()
+		for tag in tags:
+			keys.update(self._tags.get(tag, ()))
+		for key in keys:
+			self._remove(key)
+		self.invalidations += len(keys)
+		return len(keys)
+
+	def stats(
+		self,
+	) -> Dict[
+		str,
+		Any,
+	]:
+		"""
+		Report the cache state.
+
+		Returns
+		-------
+		Dict[str, Any]
+		    `size`, `maxsize`, `ttl`, `hits`, `misses`, `hit_rate`, `evictions`,
+		    `expirations` and `invalidations`.
+		"""
+		total = self.hits + self.misses
+		return {
+			'size': len(self._entries),
+			'maxsize': self.maxsize,
+			'ttl': self.ttl,
+			'hits': self.hits,
+			'misses': self.misses,
+			'hit_rate': self.hits / total if total else 0.0,
+			'evictions': self.evictions,
+			'expirations': self.expirations,
+			'invalidations': self.invalidations,
+		}
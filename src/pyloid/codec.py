@@ -0,0 +1,611 @@
+import base64
+import dataclasses
+import datetime
+import enum
+import json
+import math
+from typing import (
+	Any,
+	Dict,
+	List,
+	Optional,
+	Type,
+	Union,
+)
+
+try:
+	import orjson
+except ImportError:  # pragma: no cover - optional dependency
+	orjson = None
+
+try:
+	import msgspec
+except ImportError:  # pragma: no cover - optional dependency
+	msgspec = None
+
+try:
+	import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+	msgpack = None
+
+try:
+	import cbor2
+except ImportError:  # pragma: no cover - optional dependency
+	cbor2 = None
+
+
+class CodecError(ValueError):
+	"""
+	Raised when a request body cannot be decoded.
+
+	Every codec raises this exception regardless of the backend library, so
+	callers only need to handle a single exception type.
+	"""
+
+
+def default_encoder(
+	obj: Any,
+) -> Any:
+	"""
+	Convert values the JSON backends do not support natively.
+
+	Handles `datetime`/`date`/`time` (ISO 8601 strings), dataclass instances
+	(dicts), `Enum` members (their value), `bytes` (base64 strings) and sets
+	(lists).
+
+	Parameters
+	----------
+	obj : Any
+	    The value that could not be serialized.
+
+	Returns
+	-------
+	Any
+	    A JSON-serializable representation of `obj`.
+
+	Raises
+	------
+	TypeError
+	    If the value type is not supported.
+	"""
+	if isinstance(
+		obj,
+		(
+			datetime.datetime,
+			datetime.date,
+			datetime.time,
+		),
+	):
+		return obj.isoformat()
+	if dataclasses.is_dataclass(obj) and not isinstance(
+		obj,
+		type,
+	):
+		return dataclasses.asdict(obj)
+	if isinstance(
+		obj,
+		enum.Enum,
+	):
+		return obj.value
+	if isinstance(
+		obj,
+		(
+			bytes,
+			bytearray,
+			memoryview,
+		),
+	):
+		return base64.b64encode(obj).decode('ascii')
+	if isinstance(
+		obj,
+		(
+			set,
+			frozenset,
+		),
+	):
+		return list(obj)
+	raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def _replace_non_finite(
+	obj: Any,
+) -> Any:
+	"""Return a copy of a value with NaN and infinite floats replaced by None."""
+	if isinstance(
+		obj,
+		float,
+	):
+		return obj if math.isfinite(obj) else None
+	if isinstance(
+		obj,
+		dict,
+	):
+		return {key: _replace_non_finite(value) for key, value in obj.items()}
+	if isinstance(
+		obj,
+		(
+			list,
+			tuple,
+		),
+	):
+		return [_replace_non_finite(item) for item in obj]
+	return obj
+
+
+_MSGPACK_OVERFLOW = (
+	'MessagePack cannot encode integers outside the 64-bit range; use JSON or CBOR for this result.'
+)
+
+
+def _msgpack_default(
+	obj: Any,
+) -> Any:
+	"""`default_encoder` for msgpack, which also hands it the integers it cannot pack."""
+	if isinstance(
+		obj,
+		int,
+	):
+		raise OverflowError(_MSGPACK_OVERFLOW)
+	return default_encoder(obj)
+
+
+class Codec:
+	"""
+	Base class for RPC body codecs.
+
+	A codec turns request bodies into Python objects and response objects
+	into bytes.
+
+	Attributes
+	----------
+	name : str
+	    Name of the backend, used for selection and logging.
+	content_type : str
+	    The media type produced and accepted by the codec.
+	binary : bool
+	    Whether the encoded body is binary rather than UTF-8 text.
+	"""
+
+	name: str = ''
+	content_type: str = 'application/json'
+	binary: bool = False
+
+	def encode(
+		self,
+		obj: Any,
+	) -> bytes:
+		"""
+		Serialize an object to bytes.
+
+		Parameters
+		----------
+		obj : Any
+		    The object to serialize.
+
+		Returns
+		-------
+		bytes
+		    The encoded body.
+		"""
+		raise NotImplementedError
+
+	def decode(
+		self,
+		data: bytes,
+	) -> Any:
+		"""
+		Deserialize bytes to an object.
+
+		Parameters
+		----------
+		data : bytes
+		    The raw body.
+
+		Returns
+		-------
+		Any
+		    The decoded object.
+
+		Raises
+		------
+		CodecError
+		    If the body is malformed.
+		"""
+		raise NotImplementedError
+
+	def encode_success(
+		self,
+		result: bytes,
+		request_id: Any,
+	) -> bytes:
+		"""
+		Build a JSON-RPC success response around an already encoded result.
+
+		Lets cached results be sent without encoding the value again.
+
+		Parameters
+		----------
+		result : bytes
+		    The `result` member, encoded with this codec.
+		request_id : Any
+		    The `id` member.
+
+		Returns
+		-------
+		bytes
+		    The encoded response object.
+		"""
+		return self.encode(
+			{
+				'jsonrpc': '2.0',
+				'result': self.decode(result),
+				'id': request_id,
+			}
+		)
+
+	def __repr__(
+		self,
+	) -> str:
+		return f'<{type(self).__name__} {self.name} {self.content_type}>'
+
+
+class _JSONCodec(Codec):
+	"""
+	Base class of the JSON codecs, which splice cached results as text.
+
+	JSON has no NaN or infinity, so all JSON codecs encode non-finite floats
+	as `null`, whichever backend is installed. The binary codecs keep them.
+	"""
+
+	def encode_success(
+		self,
+		result: bytes,
+		request_id: Any,
+	) -> bytes:
+		return b''.join(
+			(
+				b'{"jsonrpc":"2.0","result":',
+				result,
+				b',"id":',
+				self.encode(request_id),
+				b'}',
+			)
+		)
+
+
+class _MapCodec(Codec):
+	"""
+	Base class of the binary codecs, which splice cached results after a map header.
+
+	Attributes
+	----------
+	map_header : bytes
+	    The encoded header of a map with three entries.
+	"""
+
+	map_header: bytes = b''
+
+	def encode_success(
+		self,
+		result: bytes,
+		request_id: Any,
+	) -> bytes:
+		return b''.join(
+			(
+				self.map_header,
+				self.encode('jsonrpc'),
+				self.encode('2.0'),
+				self.encode('result'),
+				result,
+				self.encode('id'),
+				self.encode(request_id),
+			)
+		)
+
+
+class StdlibJSONCodec(_JSONCodec):
+	"""JSON codec based on the standard library `json` module."""
+
+	name = 'json'
+
+	def encode(
+		self,
+		obj: Any,
+	) -> bytes:
+		try:
+			return json.dumps(
+				obj,
+				default=default_encoder,
+				ensure_ascii=False,
+				separators=(
+					',',
+					':',
+				),
+				allow_nan=False,
+			).encode('utf-8')
+		except ValueError:
+			# NaN or infinity: send null like orjson and msgspec do
+			return json.dumps(
+				_replace_non_finite(obj),
+				default=lambda value: _replace_non_finite(default_encoder(value)),
+				ensure_ascii=False,
+				separators=(
+					',',
+					':',
+				),
+			).encode('utf-8')
+
+	def decode(
+		self,
+		data: bytes,
+	) -> Any:
+		try:
+			return json.loads(data)
+		except (
+			ValueError,
+			TypeError,
+		) as e:
+			raise CodecError(str(e)) from e
+
+
+class OrjsonCodec(_JSONCodec):
+	"""
+	JSON codec based on `orjson`.
+
+	orjson only handles integers that fit in 64 bits. Objects holding wider
+	integers are encoded with the standard library `json` module instead,
+	so they are sent exactly as without orjson. When decoding, orjson reads
+	such integers as floats.
+	"""
+
+	name = 'orjson'
+
+	def __init__(
+		self,
+	):
+		if orjson is None:
+			raise ImportError('orjson is not installed.')
+		self._fallback = StdlibJSONCodec()
+
+	def encode(
+		self,
+		obj: Any,
+	) -> bytes:
+		try:
+			return orjson.dumps(
+				obj,
+				default=default_encoder,
+				option=orjson.OPT_NON_STR_KEYS,
+			)
+		except orjson.JSONEncodeError as e:
+			if 'Integer exceeds 64-bit range' not in str(e):
+				raise
+			return self._fallback.encode(obj)
+
+	def decode(
+		self,
+		data: bytes,
+	) -> Any:
+		try:
+			return orjson.loads(data)
+		except orjson.JSONDecodeError as e:
+			raise CodecError(str(e)) from e
+
+
+class MsgspecJSONCodec(_JSONCodec):
+	"""JSON codec based on `msgspec.json`."""
+
+	name = 'msgspec'
+
+	def __init__(
+		self,
+	):
+		if msgspec is None:
+			raise ImportError('msgspec is not installed.')
+		self._encoder = msgspec.json.Encoder(enc_hook=default_encoder)
+		self._decoder = msgspec.json.Decoder()
+
+	def encode(
+		self,
+		obj: Any,
+	) -> bytes:
+		return self._encoder.encode(obj)
+
+	def decode(
+		self,
+		data: bytes,
+	) -> Any:
+		try:
+			return self._decoder.decode(data)
+		except msgspec.DecodeError as e:
+			raise CodecError(str(e)) from e
+
+
+class MsgpackCodec(_MapCodec):
+	"""
+	MessagePack codec.
+
+	Uses `msgpack` when installed, otherwise `msgspec.msgpack`. `bytes` values
+	are carried natively instead of as base64 strings. Integers must fit in 64
+	bits; wider ones raise `OverflowError`.
+	"""
+
+	name = 'msgpack'
+	content_type = 'application/msgpack'
+	binary = True
+	map_header = b'\x83'
+
+	def __init__(
+		self,
+	):
+		self._encoder = None
+		self._decoder = None
+		if msgpack is None:
+			if msgspec is None:
+				raise ImportError('msgpack is not installed.')
+			self._encoder = msgspec.msgpack.Encoder(enc_hook=default_encoder)
+			self._decoder = msgspec.msgpack.Decoder()
+
+	def encode(
+		self,
+		obj: Any,
+	) -> bytes:
+		if self._encoder is not None:
+			try:
+				return self._encoder.encode(obj)
+			except OverflowError as e:
+				raise OverflowError(_MSGPACK_OVERFLOW) from e
+		return msgpack.packb(
+			obj,
+			default=_msgpack_default,
+			use_bin_type=True,
+		)
+
+	def decode(
+		self,
+		data: bytes,
+	) -> Any:
+		try:
+			if self._decoder is not None:
+				return self._decoder.decode(data)
+			return msgpack.unpackb(
+				data,
+				raw=False,
+			)
+		except Exception as e:
+			raise CodecError(str(e)) from e
+
+
+class CBORCodec(_MapCodec):
+	"""
+	CBOR codec based on `cbor2`.
+
+	`bytes` values are carried natively. Naive datetimes are treated as UTC.
+	"""
+
+	name = 'cbor'
+	content_type = 'application/cbor'
+	binary = True
+	map_header = b'\xa3'
+
+	def __init__(
+		self,
+	):
+		if cbor2 is None:
+			raise ImportError('cbor2 is not installed.')
+
+	@staticmethod
+	def _default(
+		encoder: Any,
+		obj: Any,
+	):
+		encoder.encode(default_encoder(obj))
+
+	def encode(
+		self,
+		obj: Any,
+	) -> bytes:
+		return cbor2.dumps(
+			obj,
+			default=self._default,
+			timezone=datetime.timezone.utc,
+		)
+
+	def decode(
+		self,
+		data: bytes,
+	) -> Any:
+		try:
+			return cbor2.loads(data)
+		except Exception as e:
+			raise CodecError(str(e)) from e
+
+
+JSON_CODECS: Dict[
+	str,
+	Type[Codec],
+] = {
+	'orjson': OrjsonCodec,
+	'msgspec': MsgspecJSONCodec,
+	'json': StdlibJSONCodec,
+}
+
+
+def get_json_codec(
+	codec: Optional[
+		Union[
+			str,
+			Codec,
+		]
+	] = None,
+) -> Codec:
+	"""
+	Return a JSON codec instance.
+
+	When no codec is requested, the fastest installed backend is picked in the
+	order orjson, msgspec, stdlib `json`.
+
+	Parameters
+	----------
+	codec : Optional[Union[str, Codec]], optional
+	    A codec instance, or the name of a backend ('orjson', 'msgspec' or 'json').
+	    Defaults to None (automatic selection).
+
+	Returns
+	-------
+	Codec
+	    The selected codec.
+
+	Raises
+	------
+	ValueError
+	    If the backend name is unknown.
+	ImportError
+	    If the requested backend is not installed.
+
+	Examples
+	--------
+	```python
+	from pyloid.codec import (
+	    get_json_codec,
+	)
+
+	codec = get_json_codec()
+	body = codec.encode({'ok': True})
+	```
+	"""
+	if isinstance(
+		codec,
+		Codec,
+	):
+		return codec
+	if codec is not None:
+		if codec not in JSON_CODECS:
+			raise ValueError(f"Unknown codec '{codec}'. Choose from {', '.join(JSON_CODECS)}.")
+		return JSON_CODECS[codec]()
+	if orjson is not None:
+		return OrjsonCodec()
+	if msgspec is not None:
+		return MsgspecJSONCodec()
+	return StdlibJSONCodec()
+
+
+def get_binary_codecs() -> List[Codec]:
+	"""
+	Return instances of the binary codecs whose backends are installed.
+
+	Returns
+	-------
+	List[Codec]
+	    Available binary codecs, MessagePack first.
+	"""
+	codecs: List[Codec] = []
+	for codec_class in (
+		MsgpackCodec,
+		CBORCodec,
+	):
+		try:
+			codecs.append(codec_class())
+		except ImportError:
+			continue
+	return codecs
@@ -0,0 +1,860 @@
+import array
+import json
+import math
+import struct
+import sys
+from typing import (
+	Any,
+	Dict,
+	List,
+	Optional,
+	Tuple,
+	Type,
+	Union,
+)
+
+try:
+	import numpy
+except ImportError:  # pragma: no cover - optional dependency
+	numpy = None
+
+MAGIC = b'PYLD'
+"""First bytes of the 'ndarray' and 'columns' formats."""
+
+ALIGNMENT = 8
+"""Byte alignment of the buffers, so JavaScript typed arrays can view them in place."""
+
+DTYPES: Dict[
+	str,
+	Tuple[
+		str,
+		str,
+	],
+] = {
+	'bool': (
+		'B',
+		'|b1',
+	),
+	'int8': (
+		'b',
+		'|i1',
+	),
+	'uint8': (
+		'B',
+		'|u1',
+	),
+	'int16': (
+		'h',
+		'<i2',
+	),
+	'uint16': (
+		'H',
+		'<u2',
+	),
+	'int32': (
+		'i',
+		'<i4',
+	),
+	'uint32': (
+		'I',
+		'<u4',
+	),
+	'int64': (
+		'q',
+		'<i8',
+	),
+	'uint64': (
+		'Q',
+		'<u8',
+	),
+	'float32': (
+		'f',
+		'<f4',
+	),
+	'float64': (
+		'd',
+		'<f8',
+	),
+}
+"""
+Numeric dtypes of the binary formats, with their `array` type code and NumPy
+little-endian dtype. Each maps to the JavaScript typed array of the same name
+(`Int32Array`, `Float64Array`, ...; `BigInt64Array` for 64-bit integers and
+`Uint8Array` for bool).
+"""
+
+_INT32_RANGE = (
+	-(2**31),
+	2**31 - 1,
+)
+_SAFE_INTEGER = 2**53
+
+
+class ResultEncoder:
+	"""
+	Base class of the binary result encoders of `PyloidRPC.method`.
+
+	An encoder turns a method result into a binary body that JavaScript can
+	view without parsing it, and into a JSON-compatible value for clients and
+	transports that do not ask for the binary format.
+
+	Attributes
+	----------
+	name : str
+	    Name of the encoder, used for selection.
+	content_type : str
+	    The media type of the binary body.
+	"""
+
+	name: str = ''
+	content_type: str = 'application/octet-stream'
+
+	def encode(
+		self,
+		value: Any,
+	) -> bytes:
+		"""
+		Encode a result to the binary format.
+
+		Parameters
+		----------
+		value : Any
+		    The value returned by the method.
+
+		Returns
+		-------
+		bytes
+		    The binary body.
+
+		Raises
+		------
+		TypeError
+		    If the value cannot be encoded.
+		"""
+		raise NotImplementedError
+
+	def to_json(
+		self,
+		value: Any,
+	) -> Any:
+		"""
+		Convert a result to a value the JSON and binary codecs can encode.
+
+		Parameters
+		----------
+		value : Any
+		    The value returned by the method.
+
+		Returns
+		-------
+		Any
+		    The JSON-compatible value.
+		"""
+		raise NotImplementedError
+
+	def __repr__(
+		self,
+	) -> str:
+		return f'<{type(self).__name__} {self.name} {self.content_type}>'
+
+
+class EncodedResult:
+	"""
+	A result of a method with a binary encoder, until the response format is known.
+
+	Attributes
+	----------
+	encoder : ResultEncoder
+	    The method's encoder.
+	value : Any
+	    The value returned by the method.
+	"""
+
+	__slots__ = (
+		'encoder',
+		'value',
+	)
+
+	def __init__(
+		self,
+		encoder: ResultEncoder,
+		value: Any,
+	):
+		self.encoder = encoder
+		self.value = value
+
+	def encode(
+		self,
+	) -> bytes:
+		return self.encoder.encode(self.value)
+
+	def to_json(
+		self,
+	) -> Any:
+		return self.encoder.to_json(self.value)
+
+
+def accepts(
+	accept: Optional[str],
+	content_type: str,
+) -> bool:
+	"""
+	Tell whether an `Accept` header explicitly lists a media type.
+
+	Wildcards do not count, since browsers send `*/*` by default and would
+	then receive a binary body they did not ask for.
+
+	Parameters
+	----------
+	accept : Optional[str]
+	    The header value.
+	content_type : str
+	    The media type.
+
+	Returns
+	-------
+	bool
+	    True if the media type is listed with a non-zero quality value.
+	"""
+	if not accept:
+		return False
+	for item in accept.split(','):
+		(
+			media_type,
+			_,
+			options,
+		) = item.partition(';')
+		if media_type.strip().lower() != content_type:
+			continue
+		for option in options.split(';'):
+			(
+				key,
+				_,
+				quality,
+			) = option.strip().partition('=')
+			if key == 'q':
+				try:
+					return float(quality) > 0
+				except ValueError:
+					return False
+		return True
+	return False
+
+
+def _pad(
+	size: int,
+) -> int:
+	return -size % ALIGNMENT
+
+
+def pack_buffers(
+	header: Dict[
+		str,
+		Any,
+	],
+	buffers: List[bytes],
+	refs: List[List[int]],
+) -> bytes:
+	"""
+	Lay out a header and buffers in the 'ndarray' and 'columns' formats.
+
+	The body is `MAGIC`, the little-endian uint32 length of the header, the
+	UTF-8 JSON header and the buffers, each starting at a multiple of
+	`ALIGNMENT` bytes. The `[offset, length]` pairs in `refs` belong to the
+	header and are filled in with the byte positions of the buffers.
+
+	Parameters
+	----------
+	header : Dict[str, Any]
+	    The header, holding the lists in `refs`.
+	buffers : List[bytes]
+	    The buffers, in order.
+	refs : List[List[int]]
+	    One `[offset, length]` list per buffer.
+
+	Returns
+	-------
+	bytes
+	    The body.
+	"""
+	# The header length depends on the offsets it holds, so grow it until stable
+	encoded = b''
+	while True:
+		header_end = len(MAGIC) + 4 + len(encoded)
+		offset = header_end + _pad(header_end)
+		for ref, buffer in zip(refs, buffers):
+			ref[0] = offset
+			ref[1] = len(buffer)
+			offset += len(buffer) + _pad(len(buffer))
+		candidate = json.dumps(
+			header,
+			separators=(
+				',',
+				':',
+			),
+		).encode('utf-8')
+		stable = len(candidate) == len(encoded)
+		encoded = candidate
+		if stable:
+			break
+	header_end = len(MAGIC) + 4 + len(encoded)
+	parts = [
+		MAGIC,
+		struct.pack(
+			'<I',
+			len(encoded),
+		),
+		encoded,
+		b' ' * _pad(header_end),
+	]
+	for buffer in buffers:
+		parts.append(buffer)
+		parts.append(b'\0' * _pad(len(buffer)))
+	return b''.join(parts)
+
+
+def unpack_buffers(
+	body: bytes,
+) -> Tuple[
+	Dict[
+		str,
+		Any,
+	],
+	memoryview,
+]:
+	"""
+	Read the header of a body in the 'ndarray' or 'columns' format.
+
+	Meant for Python clients and tests; browsers read the header with a
+	`DataView` and view the buffers with typed arrays.
+
+	Parameters
+	----------
+	body : bytes
+	    The body.
+
+	Returns
+	-------
+	Tuple[Dict[str, Any], memoryview]
+	    The header and a view of the whole body, which the `[offset, length]`
+	    pairs of the header refer to.
+
+	Raises
+	------
+	ValueError
+	    If the body is not in the format.
+	"""
+	if body[: len(MAGIC)] != MAGIC:
+		raise ValueError('Not a Pyloid binary result.')
+	(length,) = struct.unpack_from(
+		'<I',
+		body,
+		len(MAGIC),
+	)
+	start = len(MAGIC) + 4
+	return (
+		json.loads(bytes(body[start : start + length])),
+		memoryview(body),
+	)
+
+
+def _typed_buffer(
+	values: List[Any],
+	dtype: str,
+) -> bytes:
+	"""Pack Python numbers as a little-endian typed array."""
+	data = array.array(
+		DTYPES[dtype][0],
+		values,
+	)
+	if sys.byteorder == 'big':
+		data.byteswap()
+	return data.tobytes()
+
+
+def _ndarray_buffer(
+	values: Any,
+) -> Optional[
+	Tuple[
+		str,
+		bytes,
+	]
+]:
+	"""Return the dtype and little-endian bytes of a numeric NumPy array, or None."""
+	for dtype, (
+		_,
+		numpy_dtype,
+	) in DTYPES.items():
+		if values.dtype.newbyteorder('<') == numpy.dtype(numpy_dtype):
+			return (
+				dtype,
+				numpy.ascontiguousarray(
+					values,
+					dtype=numpy_dtype,
+				).tobytes(),
+			)
+	return None
+
+
+def _is_ndarray(
+	value: Any,
+) -> bool:
+	return numpy is not None and isinstance(
+		value,
+		numpy.ndarray,
+	)
+
+
+class NDArrayEncoder(ResultEncoder):
+	"""
+	Encodes a NumPy array as raw little-endian bytes with a dtype/shape header.
+
+	The header is `{"dtype": ..., "shape": [...], "data": [offset, length]}`,
+	in the layout of `pack_buffers`. `dtype` is one of `DTYPES`, and the data
+	is in C order, so a typed array over it is the flattened array. Falls
+	back to nested lists (`ndarray.tolist()`).
+
+	Examples
+	--------
+	```javascript
+	const response = await fetch(rpc.url, {
+	    method: 'POST',
+	    headers: {
+	        'Content-Type': 'application/json',
+	        'Accept': 'application/x-pyloid-ndarray, application/json',
+	    },
+	    body: JSON.stringify({ jsonrpc: '2.0', method: 'heatmap', params: {}, id: windowId }),
+	});
+	const buffer = await response.arrayBuffer();
+	const headerLength = new DataView(buffer).getUint32(4, true);
+	const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 8, headerLength)));
+	const [offset, length] = header.data;
+	const values = new Float64Array(buffer, offset, length / 8); // header.dtype === 'float64'
+	```
+	"""
+
+	name = 'ndarray'
+	content_type = 'application/x-pyloid-ndarray'
+
+	def __init__(
+		self,
+	):
+		if numpy is None:
+			raise ImportError('numpy is not installed.')
+
+	def encode(
+		self,
+		value: Any,
+	) -> bytes:
+		if not _is_ndarray(value):
+			value = numpy.asarray(value)
+		packed = _ndarray_buffer(value)
+		if packed is None:
+			raise TypeError(f"Arrays of dtype '{value.dtype}' cannot be encoded as a typed array.")
+		(
+			dtype,
+			data,
+		) = packed
+		ref = [
+			0,
+			0,
+		]
+		return pack_buffers(
+			{
+				'dtype': dtype,
+				'shape': list(value.shape),
+				'data': ref,
+			},
+			[data],
+			[ref],
+		)
+
+	def to_json(
+		self,
+		value: Any,
+	) -> Any:
+		return value.tolist() if _is_ndarray(value) else value
+
+
+def _table_columns(
+	value: Any,
+) -> Dict[
+	str,
+	Any,
+]:
+	"""Turn a list of records, a dict of columns or a DataFrame into columns by name."""
+	if isinstance(
+		value,
+		dict,
+	):
+		return {str(name): column for name, column in value.items()}
+	if hasattr(
+		value,
+		'columns',
+	) and hasattr(
+		value,
+		'to_numpy',
+	):
+		# pandas DataFrame
+		return {str(name): value[name].to_numpy() for name in value.columns}
+	if hasattr(
+		value,
+		'to_pydict',
+	):
+		# pyarrow Table or RecordBatch
+		return value.to_pydict()
+	if isinstance(
+		value,
+		(
+			list,
+			tuple,
+		),
+	):
+		names: Dict[
+			str,
+			None,
+		] = {}
+		for row in value:
+			if not isinstance(
+				row,
+				dict,
+			):
+				raise TypeError('Table rows must be dicts.')
+			for name in row:
+				names.setdefault(name)
+		return {str(name): [row.get(name) for row in value] for name in names}
+	raise TypeError(
+		f'Cannot encode a {type(value).__name__} as a table; return a list of dicts, a dict '
+		'of columns or a DataFrame.'
+	)
+
+
+def _json_table(
+	value: Any,
+) -> Any:
+	"""Return records as they are, and other tables as columns of lists."""
+	if isinstance(
+		value,
+		(
+			list,
+			tuple,
+		),
+	):
+		return value
+	return {
+		name: column.tolist() if _is_ndarray(column) else column
+		for name, column in _table_columns(value).items()
+	}
+
+
+def _python_column(
+	name: str,
+	values: List[Any],
+) -> Tuple[
+	str,
+	List[bytes],
+]:
+	"""Infer the dtype of a column of Python values and pack its buffers."""
+	if all(value is None or isinstance(value, str) for value in values):
+		encoded = [(value or '').encode('utf-8') for value in values]
+		offsets = [0]
+		for item in encoded:
+			offsets.append(offsets[-1] + len(item))
+		return (
+			'utf8',
+			[
+				_typed_buffer(
+					offsets,
+					'uint32' if offsets[-1] < 2**32 else 'uint64',
+				),
+				b''.join(encoded),
+			],
+		)
+	if all(isinstance(value, bool) for value in values):
+		return (
+			'bool',
+			[
+				_typed_buffer(
+					values,
+					'bool',
+				)
+			],
+		)
+	if all(isinstance(value, int) and not isinstance(value, bool) for value in values):
+		low = min(values, default=0)
+		high = max(values, default=0)
+		if _INT32_RANGE[0] <= low and high <= _INT32_RANGE[1]:
+			dtype = 'int32'
+		elif -_SAFE_INTEGER <= low and high <= _SAFE_INTEGER:
+			# Exact in a Float64Array, which is easier to use than a BigInt64Array
+			dtype = 'float64'
+		else:
+			dtype = 'int64'
+		return (
+			dtype,
+			[
+				_typed_buffer(
+					values,
+					dtype,
+				)
+			],
+		)
+	if all(value is None or isinstance(value, (int, float)) for value in values):
+		return (
+			'float64',
+			[
+				_typed_buffer(
+					[math.nan if value is None else value for value in values],
+					'float64',
+				)
+			],
+		)
+	raise TypeError(f"Column '{name}' holds values that cannot be encoded as a typed array.")
+
+
+class ColumnsEncoder(ResultEncoder):
+	"""
+	Encodes a table as one typed-array buffer per column.
+
+	Tables are lists of dicts (records), dicts of columns (lists or NumPy
+	arrays) or pandas DataFrames. The header, in the layout of `pack_buffers`,
+	is `{"rows": n, "columns": [...]}`, with per column its `name`, `dtype`
+	and `data` as `[offset, length]`. Numeric columns use the `DTYPES` of their
+	values: Python ints are int32, or float64 while exact, and columns with
+	floats or None are float64 with NaN for None. Strings ('utf8', None as
+	the empty string) have `data` with the UTF-8 bytes of all values and
+	`offsets`, a uint32 (or uint64 beyond 4 GiB) array of the `rows + 1`
+	value boundaries. Falls back to the table with NumPy columns as lists.
+
+	Examples
+	--------
+	```javascript
+	const buffer = await response.arrayBuffer();
+	const headerLength = new DataView(buffer).getUint32(4, true);
+	const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 8, headerLength)));
+	const columns = {};
+	for (const column of header.columns) {
+	    const [offset, length] = column.data;
+	    if (column.dtype === 'float64') {
+	        columns[column.name] = new Float64Array(buffer, offset, length / 8);
+	    } else if (column.dtype === 'int32') {
+	        columns[column.name] = new Int32Array(buffer, offset, length / 4);
+	    } // ... and 'utf8' through column.offsets and a TextDecoder
+	}
+	```
+	"""
+
+	name = 'columns'
+	content_type = 'application/x-pyloid-columns'
+
+	def encode(
+		self,
+		value: Any,
+	) -> bytes:
+		columns = _table_columns(value)
+		rows = None
+		header_columns = []
+		buffers = []
+		refs = []
+		for name, column in columns.items():
+			if _is_ndarray(column) and column.ndim != 1:
+				raise TypeError(f"Column '{name}' must be one-dimensional.")
+			packed = _ndarray_buffer(column) if _is_ndarray(column) else None
+			if packed is not None:
+				(
+					dtype,
+					data,
+				) = packed
+				column_buffers = [data]
+				length = len(column)
+			else:
+				values = column.tolist() if _is_ndarray(column) else list(column)
+				(
+					dtype,
+					column_buffers,
+				) = _python_column(
+					name,
+					values,
+				)
+				length = len(values)
+			if rows is None:
+				rows = length
+			elif length != rows:
+				raise ValueError(f"Column '{name}' has {length} rows instead of {rows}.")
+			entry: Dict[
+				str,
+				Any,
+			] = {
+				'name': name,
+				'dtype': dtype,
+			}
+			if dtype == 'utf8':
+				entry['offsets'] = [
+					0,
+					0,
+				]
+				refs.append(entry['offsets'])
+			entry['data'] = [
+				0,
+				0,
+			]
+			refs.append(entry['data'])
+			buffers.extend(column_buffers)
+			header_columns.append(entry)
+		return pack_buffers(
+			{
+				'rows': rows or 0,
+				'columns': header_columns,
+			},
+			buffers,
+			refs,
+		)
+
+	def to_json(
+		self,
+		value: Any,
+	) -> Any:
+		return _json_table(value)
+
+
+class ArrowEncoder(ResultEncoder):
+	"""
+	Encodes a table in the Arrow IPC streaming format with `pyarrow`.
+
+	Accepts the tables of `ColumnsEncoder` as well as pyarrow Tables and
+	RecordBatches. In JavaScript, `tableFromIPC` of the `apache-arrow` package
+	reads the body without copying the column data. Falls back like
+	`ColumnsEncoder`.
+
+	Examples
+	--------
+	```javascript
+	import { tableFromIPC } from 'apache-arrow';
+
+	const table = tableFromIPC(await response.arrayBuffer());
+	const prices = table.getChild('price').toArray(); // Float64Array
+	```
+	"""
+
+	name = 'arrow'
+	content_type = 'application/vnd.apache.arrow.stream'
+
+	def __init__(
+		self,
+	):
+		# pyarrow takes long to import, so only methods using it pay for it
+		try:
+			import pyarrow
+			import pyarrow.ipc
+		except ImportError as e:
+			raise ImportError('pyarrow is not installed.') from e
+		self._pyarrow = pyarrow
+
+	def _table(
+		self,
+		value: Any,
+	):
+		pyarrow = self._pyarrow
+		if isinstance(
+			value,
+			(
+				pyarrow.Table,
+				pyarrow.RecordBatch,
+			),
+		):
+			return value
+		if hasattr(
+			value,
+			'columns',
+		) and hasattr(
+			value,
+			'to_numpy',
+		):
+			return pyarrow.Table.from_pandas(
+				value,
+				preserve_index=False,
+			)
+		if isinstance(
+			value,
+			(
+				list,
+				tuple,
+			),
+		):
+			return pyarrow.Table.from_pylist(list(value))
+		return pyarrow.table(_table_columns(value))
+
+	def encode(
+		self,
+		value: Any,
+	) -> bytes:
+		table = self._table(value)
+		sink = self._pyarrow.BufferOutputStream()
+		with self._pyarrow.ipc.new_stream(
+			sink,
+			table.schema,
+		) as writer:
+			writer.write(table)
+		return sink.getvalue().to_pybytes()
+
+	def to_json(
+		self,
+		value: Any,
+	) -> Any:
+		if isinstance(
+			value,
+			(
+				self._pyarrow.Table,
+				self._pyarrow.RecordBatch,
+			),
+		):
+			return value.to_pydict()
+		return _json_table(value)
+
+
+RESULT_ENCODERS: Dict[
+	str,
+	Type[ResultEncoder],
+] = {
+	'ndarray': NDArrayEncoder,
+	'columns': ColumnsEncoder,
+	'arrow': ArrowEncoder,
+}
+
+
+def get_result_encoder(
+	encoder: Union[
+		str,
+		ResultEncoder,
+	],
+) -> ResultEncoder:
+	"""
+	Return a result encoder instance.
+
+	Parameters
+	----------
+	encoder : Union[str, ResultEncoder]
+	    An encoder instance, or the name of one ('ndarray', 'columns' or 'arrow').
+
+	Returns
+	-------
+	ResultEncoder
+	    The encoder.
+
+	Raises
+	------
+	ValueError
+	    If the encoder name is unknown.
+	ImportError
+	    If the library the encoder needs (numpy or pyarrow) is not installed.
+	"""
+	if isinstance(
+		encoder,
+		ResultEncoder,
+	):
+		return encoder
+	if encoder not in RESULT_ENCODERS:
+		raise ValueError(
+			f"Unknown result encoder '{encoder}'. Choose from {', '.join(RESULT_ENCODERS)}."
+		)
+	return RESULT_ENCODERS[encoder]()
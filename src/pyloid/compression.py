@@ -0,0 +1,468 @@
+import asyncio
+import time
+import zlib
+from typing import (
+	Any,
+	Callable,
+	Dict,
+	Optional,
+	Sequence,
+	Tuple,
+)
+
+try:
+	import brotli
+except ImportError:  # pragma: no cover - optional dependency
+	try:
+		import brotlicffi as brotli
+	except ImportError:
+		brotli = None
+
+try:
+	import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+	zstandard = None
+
+
+def _gzip(
+	data: bytes,
+	level: int,
+) -> bytes:
+	compressor = zlib.compressobj(
+		level,
+		zlib.DEFLATED,
+		16 + zlib.MAX_WBITS,
+	)
+	return compressor.compress(data) + compressor.flush()
+
+
+def _deflate(
+	data: bytes,
+	level: int,
+) -> bytes:
+	# HTTP 'deflate' is the zlib format (RFC 1950), not raw deflate
+	return zlib.compress(
+		data,
+		level,
+	)
+
+
+def _brotli(
+	data: bytes,
+	level: int,
+) -> bytes:
+	return brotli.compress(
+		data,
+		quality=level,
+	)
+
+
+def _zstd(
+	data: bytes,
+	level: int,
+) -> bytes:
+	return zstandard.ZstdCompressor(level=level).compress(data)
+
+
+ENCODERS: Dict[
+	str,
+	Callable[
+		[
+			bytes,
+			int,
+		],
+		bytes,
+	],
+] = {
+	'gzip': _gzip,
+	'deflate': _deflate,
+}
+"""Compression functions of the available content codings, by coding name."""
+if brotli is not None:
+	ENCODERS['br'] = _brotli
+if zstandard is not None:
+	ENCODERS['zstd'] = _zstd
+
+DEFAULT_LEVELS: Dict[
+	str,
+	int,
+] = {
+	'zstd': 3,
+	'br': 4,
+	'gzip': 6,
+	'deflate': 6,
+}
+"""Default compression level per content coding, favouring speed over size."""
+
+PREFERENCE: Tuple[str, ...] = (
+	'zstd',
+	'br',
+	'gzip',
+	'deflate',
+)
+"""Content codings in order of preference when the client accepts several equally."""
+
+COMPRESSIBLE_TYPES: Tuple[str, ...] = (
+	'text/',
+	'application/json',
+	'application/javascript',
+	'application/x-ndjson',
+	'application/xml',
+	'application/wasm',
+	'application/manifest+json',
+	'image/svg+xml',
+)
+"""Media type prefixes worth compressing; images, audio and video already are."""
+
+
+def parse_accept_encoding(
+	header: Optional[str],
+) -> Dict[
+	str,
+	float,
+]:
+	"""
+	Parse an `Accept-Encoding` header into quality values.
+
+	Parameters
+	----------
+	header : Optional[str]
+	    The header value.
+
+	Returns
+	-------
+	Dict[str, float]
+	    Quality value per content coding (lowercase), including '*' if present.
+	"""
+	accepted: Dict[
+		str,
+		float,
+	] = {}
+	if not header:
+		return accepted
+	for item in header.split(','):
+		(
+			coding,
+			_,
+			params,
+		) = item.partition(';')
+		coding = coding.strip().lower()
+		if not coding:
+			continue
+		quality = 1.0
+		params = params.strip()
+		if params.startswith('q='):
+			try:
+				quality = float(params[2:])
+			except ValueError:
+				quality = 0.0
+		accepted[coding] = quality
+	return accepted
+
+
+class Compressor:
+	"""
+	Negotiated HTTP response compression.
+
+	Picks the best content coding the client accepts among gzip, deflate and,
+	when `brotli`/`brotlicffi` or `zstandard` are installed, br and zstd. Bodies
+	smaller than `min_size` are sent as is, and bodies of at least
+	`executor_size` bytes are compressed on a worker thread so the event loop
+	keeps serving other requests.
+
+	Attributes
+	----------
+	min_size : int
+	    Smallest body size, in bytes, that is compressed.
+	executor_size : int
+	    Smallest body size, in bytes, that is compressed off the event loop.
+	levels : Dict[str, int]
+	    Compression level per content coding.
+	encodings : Tuple[str, ...]
+	    The content codings offered, in order of preference.
+
+	Examples
+	--------
+	```python
+	from pyloid.compression import (
+	    Compressor,
+	)
+	from pyloid.rpc import (
+	    PyloidRPC,
+	)
+
+	rpc = PyloidRPC(
+	    compression=Compressor(
+	        min_size=4096,
+	        levels={'gzip': 5},
+	    )
+	)
+	```
+	"""
+
+	def __init__(
+		self,
+		min_size: int = 1024,
+		levels: Optional[
+			Dict[
+				str,
+				int,
+			]
+		] = None,
+		encodings: Optional[Sequence[str]] = None,
+		executor_size: int = 64 * 1024,
+	):
+		"""
+		Parameters
+		----------
+		min_size : int, optional
+		    Smallest body size, in bytes, that is compressed. Default is 1024.
+		levels : Optional[Dict[str, int]], optional
+		    Compression levels overriding `DEFAULT_LEVELS`, by content coding.
+		    Default is None.
+		encodings : Optional[Sequence[str]], optional
+		    Content codings to offer, in order of preference. Codings whose library
+		    is not installed are skipped. Defaults to `PREFERENCE`.
+		executor_size : int, optional
+		    Smallest body size, in bytes, compressed on a worker thread. Default is
+		    64 KiB.
+
+		Raises
+		------
+		ValueError
+		    If a content coding is unknown.
+		"""
+		for coding in list(levels or ()) + list(encodings or ()):
+			if coding not in DEFAULT_LEVELS:
+				raise ValueError(
+					f"Unknown content coding '{coding}'. Choose from {', '.join(DEFAULT_LEVELS)}."
+				)
+		self.min_size = min_size
+		self.executor_size = executor_size
+		self.levels = {
+			**DEFAULT_LEVELS,
+			**(levels or {}),
+		}
+		self.encodings = tuple(coding for coding in (encodings or PREFERENCE) if coding in ENCODERS)
+		self.responses = 0
+		self.bytes_in = 0
+		self.bytes_out = 0
+		self.cpu_seconds = 0.0
+
+	def negotiate(
+		self,
+		accept_encoding: Optional[str],
+	) -> Optional[str]:
+		"""
+		Choose the content coding for a response.
+
+		Parameters
+		----------
+		accept_encoding : Optional[str]
+		    The `Accept-Encoding` header of the request.
+
+		Returns
+		-------
+		Optional[str]
+		    The content coding with the highest quality value, ties broken by
+		    `encodings` order, or None if the client accepts none of them.
+		"""
+		accepted = parse_accept_encoding(accept_encoding)
+		if not accepted:
+			return None
+		wildcard = accepted.get(
+			'*',
+			0.0,
+		)
+		best = None
+		best_quality = 0.0
+		for coding in self.encodings:
+			quality = accepted.get(
+				coding,
+				wildcard,
+			)
+			if quality > best_quality:
+				best = coding
+				best_quality = quality
+		return best
+
+	def compress(
+		self,
+		data: bytes,
+		encoding: str,
+	) -> Tuple[
+		bytes,
+		float,
+	]:
+		"""
+		Compress a body, blocking the calling thread.
+
+		Parameters
+		----------
+		data : bytes
+		    The body.
+		encoding : str
+		    The content coding.
+
+		Returns
+		-------
+		Tuple[bytes, float]
+		    The compressed body and the CPU time spent, in seconds.
+		"""
+		start = time.thread_time()
+		compressed = ENCODERS[encoding](
+			data,
+			self.levels[encoding],
+		)
+		return (
+			compressed,
+			time.thread_time() - start,
+		)
+
+	async def compress_body(
+		self,
+		data: bytes,
+		accept_encoding: Optional[str],
+		content_type: Optional[str] = None,
+	) -> Optional[
+		Tuple[
+			bytes,
+			str,
+			float,
+		]
+	]:
+		"""
+		Compress a body if it is large enough and the client accepts a coding.
+
+		Parameters
+		----------
+		data : bytes
+		    The body.
+		accept_encoding : Optional[str]
+		    The `Accept-Encoding` header of the request.
+		content_type : Optional[str], optional
+		    The media type of the body. If given, only `COMPRESSIBLE_TYPES` are
+		    compressed. Default is None.
+
+		Returns
+		-------
+		Optional[Tuple[bytes, str, float]]
+		    The compressed body, its content coding and the CPU time spent, or
+		    None if the body is sent as is.
+		"""
+		if len(data) < self.min_size or not is_compressible(content_type):
+			return None
+		encoding = self.negotiate(accept_encoding)
+		if encoding is None:
+			return None
+		(
+			compressed,
+			cpu_time,
+		) = await self.compress_async(
+			data,
+			encoding,
+		)
+		return (
+			compressed,
+			encoding,
+			cpu_time,
+		)
+
+	async def compress_async(
+		self,
+		data: bytes,
+		encoding: str,
+	) -> Tuple[
+		bytes,
+		float,
+	]:
+		"""
+		Compress a body with a given coding, off the event loop if it is large.
+
+		The result is counted in `stats`.
+
+		Parameters
+		----------
+		data : bytes
+		    The body.
+		encoding : str
+		    The content coding.
+
+		Returns
+		-------
+		Tuple[bytes, float]
+		    The compressed body and the CPU time spent, in seconds.
+		"""
+		if len(data) >= self.executor_size:
+			(
+				compressed,
+				cpu_time,
+			) = await asyncio.get_running_loop().run_in_executor(
+				None,
+				self.compress,
+				data,
+				encoding,
+			)
+		else:
+			(
+				compressed,
+				cpu_time,
+			) = self.compress(
+				data,
+				encoding,
+			)
+		self.responses += 1
+		self.bytes_in += len(data)
+		self.bytes_out += len(compressed)
+		self.cpu_seconds += cpu_time
+		return (
+			compressed,
+			cpu_time,
+		)
+
+	def stats(
+		self,
+	) -> Dict[
+		str,
+		Any,
+	]:
+		"""
+		Report the compression done so far.
+
+		Returns
+		-------
+		Dict[str, Any]
+		    `encodings`, `responses` (compressed responses), `bytes_in`,
+		    `bytes_out`, `ratio` (bytes out per byte in) and `cpu_seconds`.
+		"""
+		return {
+			'encodings': list(self.encodings),
+			'responses': self.responses,
+			'bytes_in': self.bytes_in,
+			'bytes_out': self.bytes_out,
+			'ratio': self.bytes_out / self.bytes_in if self.bytes_in else None,
+			'cpu_seconds': self.cpu_seconds,
+		}
+
+
+def is_compressible(
+	content_type: Optional[str],
+) -> bool:
+	"""
+	Tell whether a media type is worth compressing.
+
+	Parameters
+	----------
+	content_type : Optional[str]
+	    The media type, possibly with parameters. None means unknown, which is
+	    treated as compressible.
+
+	Returns
+	-------
+	bool
+	    True for text and other `COMPRESSIBLE_TYPES`.
+	"""
+	if content_type is None:
+		return True
+	content_type = content_type.lower()
+	return content_type.startswith(COMPRESSIBLE_TYPES)
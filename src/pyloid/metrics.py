@@ -0,0 +1,425 @@
+from bisect import (
+	bisect_left,
+)
+from typing import (
+	Any,
+	Dict,
+	List,
+	Optional,
+	Sequence,
+	Tuple,
+)
+
+LATENCY_BUCKETS: Tuple[float, ...] = (
+	0.0001,
+	0.00025,
+	0.0005,
+	0.001,
+	0.0025,
+	0.005,
+	0.01,
+	0.025,
+	0.05,
+	0.1,
+	0.25,
+	0.5,
+	1.0,
+	2.5,
+	5.0,
+	10.0,
+)
+"""Upper bounds (seconds) of the latency histogram buckets."""
+
+SIZE_BUCKETS: Tuple[float, ...] = (
+	256,
+	1024,
+	4096,
+	16384,
+	65536,
+	262144,
+	1048576,
+	4194304,
+	16777216,
+)
+"""Upper bounds (bytes) of the payload size histogram buckets."""
+
+RATIO_BUCKETS: Tuple[float, ...] = (
+	0.05,
+	0.1,
+	0.2,
+	0.3,
+	0.4,
+	0.5,
+	0.6,
+	0.8,
+	1.0,
+)
+"""Upper bounds of the compression ratio (compressed / original size) buckets."""
+
+PHASES: Tuple[str, ...] = (
+	'parse',
+	'dispatch',
+	'execute',
+	'serialize',
+	'compress',
+)
+"""Request phases timed per method. 'compress' is CPU time, the others wall time."""
+
+
+class Histogram:
+	"""
+	Fixed-bucket histogram with cumulative export.
+
+	Observing a value is a binary search and two additions, cheap enough for
+	the request hot path.
+
+	Attributes
+	----------
+	buckets : Tuple[float, ...]
+	    Sorted bucket upper bounds; an implicit `+Inf` bucket follows them.
+	counts : List[int]
+	    Non-cumulative count per bucket, including the `+Inf` bucket.
+	count : int
+	    Number of observed values.
+	sum : float
+	    Sum of the observed values.
+	"""
+
+	__slots__ = (
+		'buckets',
+		'count',
+		'counts',
+		'sum',
+	)
+
+	def __init__(
+		self,
+		buckets: Sequence[float] = LATENCY_BUCKETS,
+	):
+		self.buckets = tuple(buckets)
+		self.counts: List[int] = [0] * (len(self.buckets) + 1)
+		self.count = 0
+		self.sum = 0.0
+
+	def observe(
+		self,
+		value: float,
+	):
+		"""Record a value."""
+		self.counts[bisect_left(self.buckets, value)] += 1
+		self.count += 1
+		self.sum += value
+
+	def percentile(
+		self,
+		q: float,
+	) -> Optional[float]:
+		"""
+		Estimate a percentile as the upper bound of the bucket that contains it.
+
+		Parameters
+		----------
+		q : float
+		    The percentile as a fraction between 0 and 1.
+
+		Returns
+		-------
+		Optional[float]
+		    The bucket upper bound, `inf` for the overflow bucket, or None if
+		    nothing was observed.
+		"""
+		if not self.count:
+			return None
+		rank = q * self.count
+		seen = 0
+		for bound, bucket_count in zip(self.buckets, self.counts):
+			seen += bucket_count
+			if seen >= rank:
+				return bound
+		return float('inf')
+
+	def snapshot(
+		self,
+	) -> Dict[
+		str,
+		Any,
+	]:
+		"""Return count, sum, p50/p99 estimates and cumulative bucket counts."""
+		cumulative = {}
+		seen = 0
+		for bound, bucket_count in zip(self.buckets, self.counts):
+			seen += bucket_count
+			cumulative[bound] = seen
+		return {
+			'count': self.count,
+			'sum': self.sum,
+			'p50': self.percentile(0.5),
+			'p99': self.percentile(0.99),
+			'buckets': cumulative,
+		}
+
+
+class MethodMetrics:
+	"""
+	Metrics of a single RPC method.
+
+	Attributes
+	----------
+	calls : int
+	    Number of calls, successful or not.
+	errors : Dict[int, int]
+	    Number of error responses per JSON-RPC error code.
+	phases : Dict[str, Histogram]
+	    Latency histogram per phase (see `PHASES`).
+	request_bytes : Histogram
+	    Request body sizes.
+	response_bytes : Histogram
+	    Response body sizes, before compression.
+	compression_ratio : Histogram
+	    Compressed size divided by original size of compressed responses.
+	"""
+
+	__slots__ = (
+		'calls',
+		'compression_ratio',
+		'errors',
+		'phases',
+		'request_bytes',
+		'response_bytes',
+	)
+
+	def __init__(
+		self,
+	):
+		self.calls = 0
+		self.errors: Dict[int, int] = {}
+		self.phases: Dict[str, Histogram] = {phase: Histogram() for phase in PHASES}
+		self.request_bytes = Histogram(SIZE_BUCKETS)
+		self.response_bytes = Histogram(SIZE_BUCKETS)
+		self.compression_ratio = Histogram(RATIO_BUCKETS)
+
+	def snapshot(
+		self,
+	) -> Dict[
+		str,
+		Any,
+	]:
+		return {
+			'calls': self.calls,
+			'errors': dict(self.errors),
+			'phases': {phase: histogram.snapshot() for phase, histogram in self.phases.items()},
+			'request_bytes': self.request_bytes.snapshot(),
+			'response_bytes': self.response_bytes.snapshot(),
+			'compression_ratio': self.compression_ratio.snapshot(),
+		}
+
+
+def _escape_label(
+	value: str,
+) -> str:
+	return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_bound(
+	bound: float,
+) -> str:
+	return repr(float(bound))
+
+
+class RPCMetrics:
+	"""
+	Per-method counters and histograms collected by `PyloidRPC`.
+
+	Metrics are recorded on the RPC event loop. Requests for unknown methods
+	are counted under '(unknown)', invalid requests under '(invalid)' and whole
+	batch bodies under '(batch)', so clients cannot create arbitrary labels.
+
+	Examples
+	--------
+	```python
+	rpc = PyloidRPC(metrics_path='/metrics')
+
+	snapshot = rpc.metrics.snapshot()
+	print(snapshot['add']['phases']['execute']['p99'])
+	```
+	"""
+
+	def __init__(
+		self,
+	):
+		self._methods: Dict[str, MethodMetrics] = {}
+
+	def method(
+		self,
+		name: str,
+	) -> MethodMetrics:
+		"""Return the metrics of a method, creating them on first use."""
+		metrics = self._methods.get(name)
+		if metrics is None:
+			metrics = self._methods[name] = MethodMetrics()
+		return metrics
+
+	def observe(
+		self,
+		name: str,
+		phase: str,
+		seconds: float,
+	):
+		"""Record the duration of a phase of a call."""
+		self.method(name).phases[phase].observe(seconds)
+
+	def record_call(
+		self,
+		name: str,
+		error_code: Optional[int] = None,
+	):
+		"""Count a call, and its error code if it failed."""
+		metrics = self.method(name)
+		metrics.calls += 1
+		if error_code is not None:
+			metrics.errors[error_code] = metrics.errors.get(error_code, 0) + 1
+
+	def record_sizes(
+		self,
+		name: str,
+		request_bytes: Optional[int] = None,
+		response_bytes: Optional[int] = None,
+	):
+		"""Record request and/or response body sizes."""
+		metrics = self.method(name)
+		if request_bytes is not None:
+			metrics.request_bytes.observe(request_bytes)
+		if response_bytes is not None:
+			metrics.response_bytes.observe(response_bytes)
+
+	def record_compression(
+		self,
+		name: str,
+		original_bytes: int,
+		compressed_bytes: int,
+		cpu_seconds: float,
+	):
+		"""Record the ratio and CPU time of a compressed response."""
+		metrics = self.method(name)
+		if original_bytes:
+			metrics.compression_ratio.observe(compressed_bytes / original_bytes)
+		metrics.phases['compress'].observe(cpu_seconds)
+
+	def reset(
+		self,
+	):
+		"""Discard all collected metrics."""
+		self._methods = {}
+
+	def snapshot(
+		self,
+	) -> Dict[
+		str,
+		Dict[
+			str,
+			Any,
+		],
+	]:
+		"""
+		Return all metrics as plain data.
+
+		Returns
+		-------
+		Dict[str, Dict[str, Any]]
+		    Per method: `calls`, `errors` (per code), `phases` (latency histogram
+		    snapshot per phase, in seconds), `request_bytes`, `response_bytes` and
+		    `compression_ratio`.
+		"""
+		return {name: metrics.snapshot() for name, metrics in list(self._methods.items())}
+
+	def to_prometheus(
+		self,
+	) -> str:
+		"""
+		Render the metrics in the Prometheus text exposition format.
+
+		Returns
+		-------
+		str
+		    The metrics page.
+		"""
+		lines = [
+			'# HELP pyloid_rpc_calls_total RPC calls per method.',
+			'# TYPE pyloid_rpc_calls_total counter',
+		]
+		methods = list(self._methods.items())
+		for name, metrics in methods:
+			lines.append(
+				f'pyloid_rpc_calls_total{{method="{_escape_label(name)}"}} {metrics.calls}'
+			)
+
+		lines += [
+			'# HELP pyloid_rpc_errors_total RPC error responses per method and error code.',
+			'# TYPE pyloid_rpc_errors_total counter',
+		]
+		for name, metrics in methods:
+			for code, count in metrics.errors.items():
+				lines.append(
+					f'pyloid_rpc_errors_total{{method="{_escape_label(name)}",code="{code}"}} {count}'
+				)
+
+		lines += [
+			'# HELP pyloid_rpc_phase_seconds Time spent per RPC method and phase.',
+			'# TYPE pyloid_rpc_phase_seconds histogram',
+		]
+		for name, metrics in methods:
+			for phase, histogram in metrics.phases.items():
+				self._histogram_lines(
+					lines,
+					'pyloid_rpc_phase_seconds',
+					f'method="{_escape_label(name)}",phase="{phase}"',
+					histogram,
+				)
+
+		for metric, attribute, help_text in (
+			(
+				'pyloid_rpc_request_bytes',
+				'request_bytes',
+				'RPC request body sizes.',
+			),
+			(
+				'pyloid_rpc_response_bytes',
+				'response_bytes',
+				'RPC response body sizes before compression.',
+			),
+			(
+				'pyloid_rpc_compression_ratio',
+				'compression_ratio',
+				'Compressed size divided by original size of compressed RPC responses.',
+			),
+		):
+			lines += [
+				f'# HELP {metric} {help_text}',
+				f'# TYPE {metric} histogram',
+			]
+			for name, metrics in methods:
+				self._histogram_lines(
+					lines,
+					metric,
+					f'method="{_escape_label(name)}"',
+					getattr(metrics, attribute),
+				)
+
+		return '\n'.join(lines) + '\n'
+
+	@staticmethod
+	def _histogram_lines(
+		lines: List[str],
+		metric: str,
+		labels: str,
+		histogram: Histogram,
+	):
+		if not histogram.count:
+			return
+		seen = 0
+		for bound, bucket_count in zip(histogram.buckets, histogram.counts):
+			seen += bucket_count
+			lines.append(f'{metric}_bucket{{{labels},le="{_format_bound(bound)}"}} {seen}')
+		lines.append(f'{metric}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+		lines.append(f'{metric}_sum{{{labels}}} {histogram.sum}')
+		lines.append(f'{metric}_count{{{labels}}} {histogram.count}')
@@ -0,0 +1,423 @@
+import copy
+import hashlib
+from collections import (
+	OrderedDict,
+)
+from typing import (
+	Any,
+	Dict,
+	Hashable,
+	List,
+	Optional,
+	Tuple,
+)
+
+from .codec import (
+	Codec,
+)
+
+
+def _escape(
+	key: Any,
+) -> str:
+	"""Escape an object key as a JSON Pointer reference token (RFC 6901)."""
+	return str(key).replace('~', '~0').replace('/', '~1')
+
+
+def _unescape(
+	token: str,
+) -> str:
+	return token.replace('~1', '/').replace('~0', '~')
+
+
+def make_patch(
+	old: Any,
+	new: Any,
+) -> List[
+	Dict[
+		str,
+		Any,
+	]
+]:
+	"""
+	Compute an RFC 6902 JSON Patch that turns one JSON document into another.
+
+	Objects are diffed by key and arrays by index, so the patch only touches
+	changed values. Arrays that shrink lose their trailing items and arrays
+	that grow gain them at the end; an item inserted at the front shows up as
+	a replacement of every following item.
+
+	Parameters
+	----------
+	old : Any
+	    The document the client has.
+	new : Any
+	    The current document.
+
+	Returns
+	-------
+	List[Dict[str, Any]]
+	    The patch operations ('add', 'remove' and 'replace'), empty if the
+	    documents are equal.
+
+	Examples
+	--------
+	```python
+	from pyloid.patch import (
+	    make_patch,
+	)
+
+	make_patch(
+	    {'count': 1, 'items': ['a']},
+	    {'count': 2, 'items': ['a', 'b']},
+	)
+	# [{'op': 'replace', 'path': '/count', 'value': 2},
+	#  {'op': 'add', 'path': '/items/1', 'value': 'b'}]
+	```
+	"""
+	patch: List[
+		Dict[
+			str,
+			Any,
+		]
+	] = []
+	_diff(
+		old,
+		new,
+		'',
+		patch,
+	)
+	return patch
+
+
+def _diff(
+	old: Any,
+	new: Any,
+	path: str,
+	patch: List[
+		Dict[
+			str,
+			Any,
+		]
+	],
+):
+	# Equal subtrees are skipped by a single comparison in C
+	if type(old) is type(new) and old == new:
+		return
+	if isinstance(
+		old,
+		dict,
+	) and isinstance(
+		new,
+		dict,
+	):
+		for key in old:
+			if key not in new:
+				patch.append(
+					{
+						'op': 'remove',
+						'path': f'{path}/{_escape(key)}',
+					}
+				)
+		for key, value in new.items():
+			if key in old:
+				_diff(
+					old[key],
+					value,
+					f'{path}/{_escape(key)}',
+					patch,
+				)
+			else:
+				patch.append(
+					{
+						'op': 'add',
+						'path': f'{path}/{_escape(key)}',
+						'value': value,
+					}
+				)
+	elif isinstance(
+		old,
+		list,
+	) and isinstance(
+		new,
+		list,
+	):
+		common = min(
+			len(old),
+			len(new),
+		)
+		for index in range(common):
+			_diff(
+				old[index],
+				new[index],
+				f'{path}/{index}',
+				patch,
+			)
+		# Remove from the end so earlier indices stay valid
+		for index in range(len(old) - 1, common - 1, -1):
+			patch.append(
+				{
+					'op': 'remove',
+					'path': f'{path}/{index}',
+				}
+			)
+		for index in range(common, len(new)):
+			patch.append(
+				{
+					'op': 'add',
+					'path': f'{path}/{index}',
+					'value': new[index],
+				}
+			)
+	else:
+		patch.append(
+			{
+				'op': 'replace',
+				'path': path,
+				'value': new,
+			}
+		)
+
+
+def apply_patch(
+	document: Any,
+	patch: List[
+		Dict[
+			str,
+			Any,
+		]
+	],
+) -> Any:
+	"""
+	Apply the 'add', 'remove' and 'replace' operations of a JSON Patch.
+
+	Meant for Python clients and tests; browsers can use any RFC 6902 library.
+
+	Parameters
+	----------
+	document : Any
+	    The document to patch. It is not modified.
+	patch : List[Dict[str, Any]]
+	    The operations, as produced by `make_patch`.
+
+	Returns
+	-------
+	Any
+	    The patched document.
+
+	Raises
+	------
+	ValueError
+	    If an operation is not supported.
+	"""
+	document = copy.deepcopy(document)
+	for operation in patch:
+		op = operation['op']
+		if op not in (
+			'add',
+			'remove',
+			'replace',
+		):
+			raise ValueError(f"Unsupported JSON Patch operation '{op}'.")
+		if operation['path'] == '':
+			if op == 'remove':
+				document = None
+			else:
+				document = copy.deepcopy(operation['value'])
+			continue
+		tokens = [_unescape(token) for token in operation['path'].split('/')[1:]]
+		parent = document
+		for token in tokens[:-1]:
+			parent = parent[int(token) if isinstance(parent, list) else token]
+		last = tokens[-1]
+		if isinstance(
+			parent,
+			list,
+		):
+			index = len(parent) if last == '-' else int(last)
+			if op == 'add':
+				parent.insert(
+					index,
+					copy.deepcopy(operation['value']),
+				)
+			elif op == 'remove':
+				del parent[index]
+			else:
+				parent[index] = copy.deepcopy(operation['value'])
+		elif op == 'remove':
+			del parent[last]
+		else:
+			parent[last] = copy.deepcopy(operation['value'])
+	return document
+
+
+class PatchTracker:
+	"""
+	Remembers the last document sent per window and params, to answer with patches.
+
+	Used by `PyloidRPC` for methods registered with `patch=True`. Documents
+	are normalized through the JSON codec before they are stored and diffed,
+	so a result the method keeps mutating is snapshotted, and versions are
+	hashes of the encoded document. It is not thread-safe and must only be
+	used from the RPC event loop.
+
+	Attributes
+	----------
+	maxsize : int
+	    The maximum number of remembered documents; the least recently used one
+	    is forgotten beyond it, and its client gets the full document next time.
+	patches : int
+	    Number of responses sent as a patch.
+	documents : int
+	    Number of responses sent as the full document.
+	"""
+
+	def __init__(
+		self,
+		codec: Codec,
+		maxsize: int = 256,
+	):
+		if maxsize < 1:
+			raise ValueError('maxsize must be at least 1.')
+		self.maxsize = maxsize
+		self._codec = codec
+		self._sent: OrderedDict[
+			Hashable,
+			Tuple[
+				str,
+				Any,
+			],
+		] = OrderedDict()
+		self.patches = 0
+		self.documents = 0
+
+	def __len__(
+		self,
+	) -> int:
+		return len(self._sent)
+
+	def update(
+		self,
+		key: Hashable,
+		value: Any,
+		base_version: Optional[str] = None,
+	) -> Dict[
+		str,
+		Any,
+	]:
+		"""
+		Record the document sent for a key and build the result to send.
+
+		Parameters
+		----------
+		key : Hashable
+		    Identifies the receiver, e.g. the window and the call params.
+		value : Any
+		    The current document.
+		base_version : Optional[str], optional
+		    The version the client has. Default is None.
+
+		Returns
+		-------
+		Dict[str, Any]
+		    `{'version': ..., 'patch': [...]}` if `base_version` is the version
+		    last sent for the key, otherwise `{'version': ..., 'document': ...}`.
+		"""
+		encoded = self._codec.encode(value)
+		version = hashlib.blake2b(
+			encoded,
+			digest_size=12,
+		).hexdigest()
+		previous = self._sent.get(key)
+		if previous is not None and base_version is not None and previous[0] == base_version:
+			self._sent.move_to_end(key)
+			if previous[0] == version:
+				self.patches += 1
+				return {
+					'version': version,
+					'patch': [],
+				}
+			document = self._codec.decode(encoded)
+			self._sent[key] = (
+				version,
+				document,
+			)
+			self.patches += 1
+			return {
+				'version': version,
+				'patch': make_patch(
+					previous[1],
+					document,
+				),
+			}
+
+		document = self._codec.decode(encoded)
+		self._sent[key] = (
+			version,
+			document,
+		)
+		self._sent.move_to_end(key)
+		while len(self._sent) > self.maxsize:
+			self._sent.popitem(last=False)
+		self.documents += 1
+		return {
+			'version': version,
+			'document': document,
+		}
+
+	def forget(
+		self,
+		window_id: Optional[str] = None,
+	) -> int:
+		"""
+		Forget remembered documents.
+
+		Parameters
+		----------
+		window_id : Optional[str], optional
+		    Only forget the documents sent to this window, for keys whose first
+		    item is the window ID. If None, all documents are forgotten.
+
+		Returns
+		-------
+		int
+		    The number of forgotten documents.
+		"""
+		keys = [
+			key
+			for key in self._sent
+			if window_id is None
+			or (
+				isinstance(
+					key,
+					tuple,
+				)
+				and key[0] == window_id
+			)
+		]
+		for key in keys:
+			del self._sent[key]
+		return len(keys)
+
+	def stats(
+		self,
+	) -> Dict[
+		str,
+		Any,
+	]:
+		"""
+		Report the tracker state.
+
+		Returns
+		-------
+		Dict[str, Any]
+		    `size`, `maxsize`, `patches`, `documents` and `patch_rate`.
+		"""
+		total = self.patches + self.documents
+		return {
+			'size': len(self._sent),
+			'maxsize': self.maxsize,
+			'patches': self.patches,
+			'documents': self.documents,
+			'patch_rate': self.patches / total if total else 0.0,
+		}
@@ -1,27 +1,90 @@
 import asyncio
-import json
+import atexit
+import copy
 import logging
+import multiprocessing
 import inspect
+import hashlib
+import json
+import os
+import shutil
+import socket
+import stat
+import sys
+import tempfile
+from collections import (
+	deque,
+)
+from concurrent.futures import (
+	Executor,
+	ProcessPoolExecutor,
+	ThreadPoolExecutor,
+)
 from functools import (
+	partial,
 	wraps,
 )
 from typing import (
 	Any,
+	AsyncGenerator,
 	Callable,
 	Coroutine,
+	Deque,
 	Dict,
+	Iterable,
 	List,
 	Optional,
+	Sequence,
+	Set,
+	Tuple,
 	Union,
 )
 from .utils import (
+	event_loop_name,
 	get_free_port,
+	new_event_loop,
+)
+from .cache import (
+	CacheEntry,
+	ResultCache,
+)
+from .compression import (
+	Compressor,
+)
+from .rpc_worker import (
+	run_worker,
+	serve_remote_calls,
+)
+from .serve import (
+	ZeroCopyFileShare,
+	ZeroCopyStaticHandler,
+)
+from .patch import (
+	PatchTracker,
+)
+from .columnar import (
+	EncodedResult,
+	ResultEncoder,
+	accepts,
+	get_result_encoder,
+)
+from .metrics import (
+	RPCMetrics,
+)
+from .codec import (
+	Codec,
+	CodecError,
+	get_binary_codecs,
+	get_json_codec,
 )
 from aiohttp import (
+	WSCloseCode,
+	WSMsgType,
 	web,
 )
 import threading
 import time
+import aiofiles
 import aiohttp_cors
 from typing import (
 	TYPE_CHECKING,
@@ -61,6 +124,163 @@ class RPCContext:
 		self.window: 'BrowserWindow' = window
 
 
+class RPCUpload:
+	"""
+	A file uploaded to an upload method, see the `upload` option of `PyloidRPC.method`.
+
+	In 'stream' mode the file is read from the request while the method runs,
+	chunk by chunk; in 'file' mode it has been written to a temporary file that
+	is deleted after the method returns, unless it was moved with `save`. Either
+	way memory use does not grow with the size of the upload.
+
+	Attributes
+	----------
+	filename : Optional[str]
+	    The file name given by the client.
+	content_type : Optional[str]
+	    The media type given by the client.
+	path : Optional[str]
+	    The temporary file in 'file' mode, None in 'stream' mode.
+	size : int
+	    Bytes received so far; the whole size in 'file' mode.
+	"""
+
+	chunk_size = 64 * 1024
+
+	def __init__(
+		self,
+		filename: Optional[str] = None,
+		content_type: Optional[str] = None,
+		read: Optional[
+			Callable[
+				[int],
+				Coroutine[
+					Any,
+					Any,
+					bytes,
+				],
+			]
+		] = None,
+		path: Optional[str] = None,
+		size: int = 0,
+		max_size: Optional[int] = None,
+		spool_path: Optional[str] = None,
+	):
+		self.filename = filename
+		self.content_type = content_type
+		self.path = path
+		self.size = size
+		self._read = read
+		self._max_size = max_size
+		self._spool_path = spool_path
+
+	async def read_chunk(
+		self,
+		size: int = chunk_size,
+	) -> bytes:
+		"""
+		Read the next chunk of the file.
+
+		Parameters
+		----------
+		size : int, optional
+		    The maximum chunk size in bytes. Default is 64 KiB.
+
+		Returns
+		-------
+		bytes
+		    The chunk, or b'' at the end of the file.
+
+		Raises
+		------
+		RPCError
+		    With code -32003 if the upload exceeds the server's `max_upload_size`.
+		"""
+		if self._read is None:
+			raise RuntimeError("The upload was saved to 'path'; read it from there.")
+		chunk = await self._read(size)
+		self.size += len(chunk)
+		if self._max_size is not None and self.size > self._max_size:
+			raise _UploadTooLarge(self._max_size)
+		return chunk
+
+	async def __aiter__(
+		self,
+	) -> AsyncGenerator[
+		bytes,
+		None,
+	]:
+		if self._read is None:
+			async with aiofiles.open(
+				self.path,
+				'rb',
+			) as f:
+				while True:
+					chunk = await f.read(self.chunk_size)
+					if not chunk:
+						return
+					yield chunk
+		while True:
+			chunk = await self.read_chunk()
+			if not chunk:
+				return
+			yield chunk
+
+	async def save(
+		self,
+		destination: str,
+	) -> int:
+		"""
+		Store the file at a path.
+
+		In 'file' mode the temporary file is moved there, which keeps it after
+		the method returns; in 'stream' mode the rest of the upload is written
+		there.
+
+		Parameters
+		----------
+		destination : str
+		    The path to store the file at.
+
+		Returns
+		-------
+		int
+		    The size of the file in bytes.
+		"""
+		if self._read is None:
+			await asyncio.get_running_loop().run_in_executor(
+				None,
+				shutil.move,
+				self.path,
+				destination,
+			)
+			self.path = destination
+			return self.size
+		async with aiofiles.open(
+			destination,
+			'wb',
+		) as f:
+			async for chunk in self:
+				await f.write(chunk)
+		return self.size
+
+	async def _spool(
+		self,
+	):
+		"""Write the upload to its spool file in constant memory, switching to 'file' mode."""
+		async with aiofiles.open(
+			self._spool_path,
+			'wb',
+		) as f:
+			while True:
+				chunk = await self.read_chunk()
+				if not chunk:
+					break
+				await f.write(chunk)
+		self.path = self._spool_path
+		self._read = None
+
+
 class RPCError(Exception):
 	"""
 	Custom exception for RPC-related errors.
@@ -125,140 +345,901 @@ class RPCError(Exception):
 		return error_obj
 
 
-class PyloidRPC:
+class _ServerBusy(RPCError):
+	"""Raised when a concurrency limit is reached and its wait queue is full."""
+
+	def __init__(
+		self,
+		scope: str,
+		name: str,
+	):
+		super().__init__(
+			f"Server busy: too many pending calls for {scope} '{name}'.",
+			code=-32001,
+			data={
+				'scope': scope,
+				'name': name,
+			},
+		)
+
+
+class _RequestTimeout(RPCError):
+	"""Raised when an RPC method runs longer than its timeout."""
+
+	def __init__(
+		self,
+		method_name: str,
+		timeout: float,
+	):
+		super().__init__(
+			f"Request timed out: '{method_name}' did not finish within {timeout:g}s.",
+			code=-32002,
+		)
+
+
+class _UploadTooLarge(RPCError):
+	"""Raised when an upload exceeds the server's `max_upload_size`."""
+
+	def __init__(
+		self,
+		max_size: int,
+	):
+		super().__init__(
+			f'Upload exceeds the limit of {max_size} bytes.',
+			code=-32003,
+			data={'max_size': max_size},
+		)
+
+
+class _RequestCancelled(RPCError):
+	"""Raised when a running call is cancelled by the client."""
+
+	def __init__(
+		self,
+	):
+		super().__init__(
+			'Request cancelled.',
+			code=-32800,
+		)
+
+
+class _FlightAborted(Exception):
+	"""Tells calls waiting on a coalesced execution that its caller gave up."""
+
+
+class _Limiter:
 	"""
-	A simple JSON-RPC server wrapper based on aiohttp.
+	Concurrency limit with a bounded FIFO wait queue.
 
-	Allows registering asynchronous functions as RPC methods using the `@rpc`
-	decorator and handles JSON-RPC 2.0 request parsing, validation,
-	method dispatching, and response formatting.
+	At most `limit` calls hold a slot at a time. Further calls wait in a queue
+	of at most `max_queue` entries, and calls beyond that are rejected at once
+	with `_ServerBusy`. Must be used from a single event loop.
 
 	Attributes
 	----------
-	_host : str
-	    The hostname or IP address to bind the server to.
-	_port : int
-	    The port number to listen on.
-	_rpc_path : str
-	    The URL path for handling RPC requests.
-	_functions : Dict[str, Callable[..., Coroutine[Any, Any, Any]]]
-	    A dictionary mapping registered RPC method names to their
-	    corresponding asynchronous functions.
-	_app : web.Application
-	    The underlying aiohttp web application instance.
+	scope : str
+	    'method' or 'window', used in the busy error.
+	name : str
+	    The method name or window ID the limit applies to.
+	limit : int
+	    The maximum number of calls running at once.
+	max_queue : Optional[int]
+	    The maximum number of waiting calls. None means unbounded.
+	active : int
+	    The number of calls currently holding a slot.
+	admitted : int
+	    The number of calls that obtained a slot.
+	rejected : int
+	    The number of calls rejected because the queue was full.
+	queue_time_total : float
+	    Total time (seconds) admitted calls spent waiting.
+	queue_time_max : float
+	    Longest time (seconds) an admitted call spent waiting.
 	"""
 
 	def __init__(
 		self,
-		client_max_size: int = 1024 * 1024 * 10,
+		scope: str,
+		name: str,
+		limit: int,
+		max_queue: Optional[int] = None,
+	):
+		if limit < 1:
+			raise ValueError('Concurrency limit must be at least 1.')
+		self.scope = scope
+		self.name = name
+		self.limit = limit
+		self.max_queue = max_queue
+		self.active = 0
+		self.admitted = 0
+		self.rejected = 0
+		self.queue_time_total = 0.0
+		self.queue_time_max = 0.0
+		self._waiters: Deque[asyncio.Future] = deque()
+
+	async def acquire(
+		self,
 	):
 		"""
-		Initialize the PyloidRPC server instance.
+		Wait for a free slot.
 
-		Parameters
-		----------
-		client_max_size : int, optional
-		    The maximum size of client requests (bytes). Default is 10MB.
+		Raises
+		------
+		_ServerBusy
+		    If every slot is taken and the wait queue is full.
+		"""
+		if self.active < self.limit and not self._waiters:
+			self.active += 1
+			self.admitted += 1
+			return
+		if self.max_queue is not None and len(self._waiters) >= self.max_queue:
+			self.rejected += 1
+			raise _ServerBusy(
+				self.scope,
+				self.name,
+			)
 
-		Examples
-		--------
-		```python
-		from pyloid.rpc import (
-		    PyloidRPC,
+		waiter = asyncio.get_running_loop().create_future()
+		self._waiters.append(waiter)
+		start = time.perf_counter()
+		try:
+			await waiter
+		except asyncio.CancelledError:
+			if waiter.done() and not waiter.cancelled():
+				# The slot was handed over just before the cancellation
+				self.release()
+			else:
+				self._waiters.remove(waiter)
+			raise
+		waited = time.perf_counter() - start
+		self.admitted += 1
+		self.queue_time_total += waited
+		self.queue_time_max = max(
+			self.queue_time_max,
+			waited,
 		)
 
-		rpc = PyloidRPC()
+	def release(
+		self,
+	):
+		"""Free a slot, handing it over to the oldest waiting call if any."""
+		while self._waiters:
+			waiter = self._waiters.popleft()
+			if not waiter.done():
+				waiter.set_result(None)
+				return
+		self.active -= 1
 
+	def stats(
+		self,
+	) -> Dict[
+		str,
+		Any,
+	]:
+		"""Return the current state and counters of the limiter."""
+		return {
+			'limit': self.limit,
+			'max_queue': self.max_queue,
+			'active': self.active,
+			'queued': len(self._waiters),
+			'admitted': self.admitted,
+			'rejected': self.rejected,
+			'queue_time_avg_ms': self.queue_time_total / self.admitted * 1000
+			if self.admitted
+			else 0.0,
+			'queue_time_max_ms': self.queue_time_max * 1000,
+		}
 
-		@rpc.method()
-		async def add(
-		    a: int,
-		    b: int,
-		) -> int:
-		    return a + b
-		```
-		"""
-		self._host = '127.0.0.1'
-		self._port = get_free_port()
-		self._rpc_path = '/rpc'
 
-		self.url = f'http://{self._host}:{self._port}{self._rpc_path}'
+class _RPCStream:
+	"""
+	Result of a streaming method, consumed by the transport.
+
+	Wraps the async generator returned by the method and runs `on_close` once
+	the stream is exhausted, fails or is closed, even if it was never started.
+	"""
 
-		self._functions: Dict[
-			str,
+	def __init__(
+		self,
+		stream: AsyncGenerator,
+		on_close: Optional[Callable[[], None]] = None,
+	):
+		self._stream = stream
+		self._on_close = on_close
+
+	def _finish(
+		self,
+	):
+		on_close, self._on_close = self._on_close, None
+		if on_close is not None:
+			on_close()
+
+	def __aiter__(
+		self,
+	):
+		return self
+
+	async def __anext__(
+		self,
+	) -> Any:
+		try:
+			return await self._stream.__anext__()
+		except BaseException:
+			self._finish()
+			raise
+
+	async def aclose(
+		self,
+	):
+		try:
+			await self._stream.aclose()
+		finally:
+			self._finish()
+
+
+class _MethodPlan:
+	"""
+	Precompiled dispatch plan for a registered RPC method.
+
+	The plan is built once when the method is registered with `PyloidRPC.method`,
+	so the request hot path only binds arguments and never introspects the
+	function again.
+
+	Attributes
+	----------
+	name : str
+	    The name the method is registered under.
+	func : Callable[..., Any]
+	    The original function.
+	has_ctx : bool
+	    Whether an `RPCContext` is injected through the `ctx` parameter.
+	ctx_first : bool
+	    Whether `ctx` is the first positional parameter.
+	positional : Tuple[str, ...]
+	    Names of the parameters that can be filled from positional params, excluding `ctx`.
+	min_positional : int
+	    Number of positional params required by the function.
+	required : FrozenSet[str]
+	    Names of the parameters without a default value, excluding `ctx`.
+	allowed : FrozenSet[str]
+	    Names accepted as keyword params, excluding `ctx`.
+	defaults : Dict[str, Any]
+	    Default values of the parameters that have one.
+	var_positional : bool
+	    Whether the function accepts `*args`.
+	var_keyword : bool
+	    Whether the function accepts `**kwargs`.
+	is_stream : bool
+	    Whether the function is an async generator whose items are streamed.
+	executor : Optional[Union[str, Executor]]
+	    Where a synchronous function runs: 'thread', 'process' or an executor
+	    instance. None for async functions, which run on the event loop.
+	limiter : Optional[_Limiter]
+	    The per-method concurrency limit, if any.
+	timeout : Optional[float]
+	    The maximum run time of a call in seconds, if any.
+	upload : Optional[str]
+	    The parameter receiving an `RPCUpload`, excluded from `params` binding.
+	upload_mode : Optional[str]
+	    'stream' or 'file', see the `upload` option of `PyloidRPC.method`.
+	coalesce : Optional[str]
+	    How concurrent identical calls share an execution: 'global', 'window'
+	    or None (not coalesced).
+	coalesce_hits : int
+	    Number of calls served by an execution that was already running.
+	coalesce_misses : int
+	    Number of coalesced calls that ran the method.
+	cache : Optional[ResultCache]
+	    The result cache of the method, if any.
+	cache_scope : str
+	    Whether cached results are shared by all windows ('global') or kept per
+	    window ('window').
+	cache_tags : Optional[Callable[[Dict[str, Any]], Iterable[str]]]
+	    Computes the tags of a cached result from the call arguments by name
+	    (see `named_args`).
+	patch : Optional[PatchTracker]
+	    Remembers the documents sent per window and params, for methods whose
+	    results are answered with JSON Patches.
+	idempotent : bool
+	    Whether the method can also be called with HTTP GET.
+	cache_control : Optional[str]
+	    The `Cache-Control` header of GET responses.
+	etag_version : Optional[Callable[[Dict[str, Any]], Any]]
+	    Computes the version a GET response's ETag is derived from, from the
+	    call arguments by name. If None, the ETag is derived from the response body.
+	encoder : Optional[ResultEncoder]
+	    Encodes results to a binary format for clients that accept it.
+	"""
+
+	__slots__ = (
+		'_keyword_only_required',
+		'allowed',
+		'cache',
+		'cache_scope',
+		'cache_tags',
+		'coalesce',
+		'coalesce_hits',
+		'coalesce_misses',
+		'cache_control',
+		'ctx_first',
+		'defaults',
+		'encoder',
+		'etag_version',
+		'executor',
+		'func',
+		'has_ctx',
+		'idempotent',
+		'is_stream',
+		'limiter',
+		'min_positional',
+		'name',
+		'patch',
+		'positional',
+		'required',
+		'timeout',
+		'upload',
+		'upload_mode',
+		'var_keyword',
+		'var_positional',
+	)
+
+	def __init__(
+		self,
+		name: str,
+		func: Callable[
+			...,
+			Any,
+		],
+		executor: Optional[
+			Union[
+				str,
+				Executor,
+			]
+		] = None,
+		upload: Optional[str] = None,
+	):
+		self.name = name
+		self.func = func
+		self.upload = upload
+		self.upload_mode: Optional[str] = None
+		self.is_stream = inspect.isasyncgenfunction(func)
+		self.executor = executor
+		self.limiter: Optional[_Limiter] = None
+		self.timeout: Optional[float] = None
+		self.coalesce: Optional[str] = None
+		self.coalesce_hits = 0
+		self.coalesce_misses = 0
+		self.cache: Optional[ResultCache] = None
+		self.cache_scope = 'global'
+		self.cache_tags: Optional[
 			Callable[
-				...,
-				Coroutine[
-					Any,
-					Any,
-					Any,
+				[
+					Dict[
+						str,
+						Any,
+					]
 				],
-			],
-		] = {}
-		self._app = web.Application(client_max_size=client_max_size)
+				Iterable[str],
+			]
+		] = None
+		self.patch: Optional[PatchTracker] = None
+		self.encoder: Optional[ResultEncoder] = None
+		self.idempotent = False
+		self.cache_control: Optional[str] = None
+		self.etag_version: Optional[
+			Callable[
+				[
+					Dict[
+						str,
+						Any,
+					]
+				],
+				Any,
+			]
+		] = None
 
-		self.pyloid: Optional['Pyloid'] = None
-		# self.window: Optional["BrowserWindow"] = None
+		parameters = list(inspect.signature(func).parameters.values())
+		self.has_ctx = any(p.name == 'ctx' for p in parameters)
+		self.ctx_first = bool(parameters) and parameters[0].name == 'ctx'
 
-		# CORS 설정 추가
-		cors = aiohttp_cors.setup(
-			self._app,
-			defaults={
-				'*': aiohttp_cors.ResourceOptions(
-					allow_credentials=True,
-					expose_headers='*',
-					allow_headers='*',
-					allow_methods=['POST'],
-				)
-			},
+		positional_kinds = (
+			inspect.Parameter.POSITIONAL_ONLY,
+			inspect.Parameter.POSITIONAL_OR_KEYWORD,
 		)
-
-		# CORS 적용된 라우트 추가
-		resource = cors.add(self._app.router.add_resource(self._rpc_path))
-		cors.add(
-			resource.add_route(
-				'POST',
-				self._handle_rpc,
-			)
+		keyword_kinds = (
+			inspect.Parameter.POSITIONAL_OR_KEYWORD,
+			inspect.Parameter.KEYWORD_ONLY,
 		)
+		params = [
+			p
+			for p in parameters
+			if p.name
+			not in (
+				'ctx',
+				upload,
+			)
+		]
 
-		log.info(f'RPC server initialized.')
-		self._runner: Optional[web.AppRunner] = None
-		self._site: Optional[web.TCPSite] = None
+		self.positional = tuple(p.name for p in params if p.kind in positional_kinds)
+		self.min_positional = sum(
+			1 for p in params if p.kind in positional_kinds and p.default is p.empty
+		)
+		self.required = frozenset(
+			p.name for p in params if p.kind in keyword_kinds and p.default is p.empty
+		)
+		self.allowed = frozenset(p.name for p in params if p.kind in keyword_kinds)
+		self.defaults = {p.name: p.default for p in params if p.default is not p.empty}
+		self.var_positional = any(p.kind is inspect.Parameter.VAR_POSITIONAL for p in params)
+		self.var_keyword = any(p.kind is inspect.Parameter.VAR_KEYWORD for p in params)
+		self._keyword_only_required = frozenset(
+			p.name
+			for p in params
+			if p.kind is inspect.Parameter.KEYWORD_ONLY and p.default is p.empty
+		)
 
-	def method(
+	def bind(
 		self,
-		name: Optional[str] = None,
-	) -> Callable:
+		params: Union[
+			List,
+			Dict,
+		],
+		ctx: Optional[RPCContext] = None,
+	) -> Tuple[
+		tuple,
+		Dict[
+			str,
+			Any,
+		],
+	]:
 		"""
-		Use a decorator to register an async function as an RPC method.
-
-		If there is a 'ctx' parameter, an RPCContext object is automatically injected.
-		This object allows access to the pyloid application and current window.
+		Bind JSON-RPC params to call arguments.
 
 		Parameters
 		----------
-		name : Optional[str], optional
-		    Name to register the RPC method. If None, the function name is used. Default is None.
+		params : Union[List, Dict]
+		    The `params` member of the request.
+		ctx : Optional[RPCContext], optional
+		    The context injected when the method takes a `ctx` parameter.
 
 		Returns
 		-------
-		Callable
-		    The decorator function.
+		Tuple[tuple, Dict[str, Any]]
+		    The positional and keyword arguments for the call.
 
 		Raises
 		------
-		TypeError
-		    If the decorated function is not an async function (`coroutinefunction`).
-		ValueError
-		    If an RPC function with the specified name is already registered.
+		RPCError
+		    With code -32602 if the params do not match the method signature.
+		"""
+		if isinstance(
+			params,
+			dict,
+		):
+			missing = self.required.difference(params)
+			if missing:
+				raise RPCError(
+					f'Invalid params: missing {", ".join(sorted(missing))}.',
+					code=-32602,
+				)
+			if self.var_keyword:
+				kwargs = dict(params)
+				kwargs.pop(
+					'ctx',
+					None,
+				)
+				kwargs.pop(
+					self.upload,
+					None,
+				)
+			else:
+				# Unknown params are dropped, the same as before plans existed
+				kwargs = {k: v for k, v in params.items() if k in self.allowed}
+			if self.has_ctx:
+				kwargs['ctx'] = ctx
+			return (
+				(),
+				kwargs,
+			)
 
-		Examples
-		--------
-		```python
-		from pyloid.rpc import (
-		    PyloidRPC,
-		    RPCContext,
+		count = len(params)
+		if (
+			count < self.min_positional
+			or (count > len(self.positional) and not self.var_positional)
+			or self._keyword_only_required
+		):
+			raise RPCError(
+				f'Invalid params: {self.name} does not accept {count} positional params.',
+				code=-32602,
+			)
+		if self.upload is None:
+			if not self.has_ctx:
+				return (
+					tuple(params),
+					{},
+				)
+			if self.ctx_first:
+				return (
+					(
+						ctx,
+						*params,
+					),
+					{},
+				)
+		# The upload is passed by name, so positional params are too
+		if count > len(self.positional):
+			raise RPCError(
+				f'Invalid params: {self.name} requires keyword params.',
+				code=-32602,
+			)
+		kwargs = dict(
+			zip(
+				self.positional,
+				params,
+			)
+		)
+		if self.has_ctx:
+			kwargs['ctx'] = ctx
+		return (
+			(),
+			kwargs,
+		)
+
+	def named_args(
+		self,
+		args: tuple,
+		kwargs: Dict[
+			str,
+			Any,
+		],
+	) -> Dict[
+		str,
+		Any,
+	]:
+		"""
+		Return bound call arguments by parameter name, including defaults.
+
+		The injected `ctx` is left out. Extra positional arguments of a
+		function taking `*args` are listed under '*'.
+
+		Parameters
+		----------
+		args : tuple
+		    Positional arguments returned by `bind`.
+		kwargs : Dict[str, Any]
+		    Keyword arguments returned by `bind`.
+
+		Returns
+		-------
+		Dict[str, Any]
+		    The arguments keyed by parameter name.
+		"""
+		if self.has_ctx and self.ctx_first and args:
+			args = args[1:]
+		named = dict(self.defaults)
+		named.update(
+			zip(
+				self.positional,
+				args,
+			)
+		)
+		if len(args) > len(self.positional):
+			named['*'] = list(args[len(self.positional) :])
+		named.update(kwargs)
+		named.pop(
+			'ctx',
+			None,
+		)
+		return named
+
+	def call_key(
+		self,
+		args: tuple,
+		kwargs: Dict[
+			str,
+			Any,
+		],
+	) -> str:
+		"""
+		Return a canonical form of bound call arguments.
+
+		Calls that bind to the same arguments get the same key, whether the
+		params were sent by position or by name and whether defaults were given
+		explicitly. The injected `ctx` is not part of the key.
+
+		Parameters
+		----------
+		args : tuple
+		    Positional arguments returned by `bind`.
+		kwargs : Dict[str, Any]
+		    Keyword arguments returned by `bind`.
+
+		Returns
+		-------
+		str
+		    The arguments as JSON with sorted keys.
+		"""
+		return json.dumps(
+			self.named_args(
+				args,
+				kwargs,
+			),
+			sort_keys=True,
+			default=repr,
+			ensure_ascii=False,
+			separators=(
+				',',
+				':',
+			),
+		)
+
+
+def _named_arg_caller(
+	func: Callable[
+		...,
+		Any,
+	],
+) -> Callable[
+	[
+		Dict[
+			str,
+			Any,
+		]
+	],
+	Any,
+]:
+	"""
+	Wrap a helper function so it is called with the call arguments it declares.
+
+	Parameters
+	----------
+	func : Callable[..., Any]
+	    A function whose parameters name arguments of the RPC method. If it takes
+	    `**kwargs`, it receives all of them.
+
+	Returns
+	-------
+	Callable[[Dict[str, Any]], Any]
+	    A function taking the call arguments by name (see `_MethodPlan.named_args`).
+	"""
+	parameters = inspect.signature(func).parameters.values()
+	names = (
+		None
+		if any(p.kind is inspect.Parameter.VAR_KEYWORD for p in parameters)
+		else frozenset(p.name for p in parameters)
+	)
+	return lambda named: func(**{k: v for k, v in named.items() if names is None or k in names})
+
+
+def _qualified_name(
+	namespace: Optional[str],
+	name: str,
+) -> str:
+	"""Return a method name as mounted under a namespace."""
+	return name if namespace is None else f'{namespace}.{name}'
+
+
+def _etag_matches(
+	if_none_match: Optional[str],
+	etag: str,
+) -> bool:
+	"""
+	Tell whether an `If-None-Match` header matches an ETag (weak comparison).
+
+	Parameters
+	----------
+	if_none_match : Optional[str]
+	    The header value.
+	etag : str
+	    The current ETag of the resource.
+
+	Returns
+	-------
+	bool
+	    True if the header is `*` or lists the ETag, ignoring `W/` prefixes.
+	"""
+	if not if_none_match:
+		return False
+	if if_none_match.strip() == '*':
+		return True
+	opaque = etag[2:] if etag.startswith('W/') else etag
+	return any(
+		(tag[2:] if tag.startswith('W/') else tag) == opaque
+		for tag in (item.strip() for item in if_none_match.split(','))
+	)
+
+
+class PyloidRPC:
+	"""
+	A simple JSON-RPC server wrapper based on aiohttp.
+
+	Allows registering asynchronous functions as RPC methods using the `@rpc`
+	decorator and handles JSON-RPC 2.0 request parsing, validation,
+	method dispatching, and response formatting.
+
+	Attributes
+	----------
+	_host : str
+	    The hostname or IP address to bind the server to.
+	_port : int
+	    The port number to listen on.
+	_rpc_path : str
+	    The URL path for handling RPC requests.
+	uvloop : bool
+	    Whether `run` and `start` prefer a uvloop event loop.
+	event_loop : Optional[str]
+	    The event loop implementation the server runs on ('uvloop' or
+	    'asyncio'), or None before it has started.
+	workers : int
+	    The number of worker processes `run` starts, or 0 to run in a thread.
+	_functions : Dict[str, Callable[..., Any]]
+	    A dictionary mapping registered RPC method names to their
+	    corresponding functions.
+	_plans : Dict[str, _MethodPlan]
+	    A dictionary mapping registered RPC method names to their
+	    precompiled dispatch plans.
+	_max_batch_size : int
+	    The maximum number of entries accepted in a batch request.
+	_batch_concurrency : int
+	    The maximum number of batch entries executed concurrently.
+	_ws_path : str
+	    The URL path of the persistent WebSocket transport.
+	_upload_path : str
+	    The URL path that upload methods are called through.
+	_get_path : str
+	    The URL path prefix of GET calls of idempotent methods.
+	_files_path : str
+	    The URL path prefix of the files shared with `share_file`.
+	_file_share : ZeroCopyFileShare
+	    The tokens of the shared files.
+	_mounts : List[Tuple[PyloidRPC, Optional[str]]]
+	    The servers this instance is mounted on with `include`, and the namespace
+	    of its methods on each.
+	_routers : List[PyloidRPC]
+	    The instances mounted on this server with `include`.
+	_codec : Codec
+	    The JSON codec used to parse request bodies and encode responses.
+	_codecs : Dict[str, Codec]
+	    All codecs available for content negotiation, keyed by media type.
+	_executors : Dict[str, Executor]
+	    Executors running synchronous methods, keyed by name.
+	_executor_load : Dict[str, Dict[str, int]]
+	    In-flight and completed call counters per executor.
+	_window_limiters : Dict[str, _Limiter]
+	    Per-window concurrency limits, created on a window's first call.
+	_running : Dict[Tuple[Any, Any], List[asyncio.Future]]
+	    Running calls keyed by (window ID, request id), used for cancellation.
+	    Clients that reuse a request id can have several calls under one key.
+	_flights : Dict[Tuple[str, Any, str], asyncio.Future]
+	    Outcomes of running coalesced calls, keyed by method, window and params.
+	metrics : Optional[RPCMetrics]
+	    Per-method counters and latency histograms, or None if disabled.
+	_compressor : Optional[Compressor]
+	    Compresses response bodies, or None if compression is disabled.
+	_app : web.Application
+	    The underlying aiohttp web application instance.
+	"""
+
+	def __init__(
+		self,
+		client_max_size: int = 1024 * 1024 * 10,
+		max_batch_size: int = 100,
+		batch_concurrency: int = 16,
+		codec: Optional[
+			Union[
+				str,
+				Codec,
+			]
+		] = None,
+		thread_workers: Optional[int] = None,
+		process_workers: Optional[int] = None,
+		window_concurrency: Optional[int] = None,
+		window_queue: Optional[int] = None,
+		metrics: bool = True,
+		metrics_path: Optional[str] = None,
+		unix_socket: Optional[str] = None,
+		tcp: bool = True,
+		compression: Union[
+			bool,
+			Compressor,
+		] = False,
+		max_upload_size: Optional[int] = None,
+		uvloop: bool = False,
+		workers: int = 0,
+	):
+		"""
+		Initialize the PyloidRPC server instance.
+
+		Parameters
+		----------
+		client_max_size : int, optional
+		    The maximum size of client requests (bytes). Default is 10MB.
+		max_batch_size : int, optional
+		    The maximum number of entries accepted in a JSON-RPC batch request. Default is 100.
+		batch_concurrency : int, optional
+		    The maximum number of batch entries executed concurrently. Default is 16.
+		codec : Optional[Union[str, Codec]], optional
+		    JSON codec used to parse request bodies and encode responses, or the name of a
+		    backend ('orjson', 'msgspec' or 'json'). If None, orjson or msgspec is used
+		    when installed, falling back to the standard library. MessagePack and CBOR
+		    bodies are accepted in addition when msgpack (or msgspec) and cbor2 are
+		    installed. Default is None.
+		thread_workers : Optional[int], optional
+		    The maximum number of threads running synchronous methods. If None,
+		    the `ThreadPoolExecutor` default is used. Default is None.
+		process_workers : Optional[int], optional
+		    The maximum number of processes running methods registered with
+		    `executor='process'`. If None, the number of CPUs is used. Default is None.
+		window_concurrency : Optional[int], optional
+		    The maximum number of calls from one window running at once. Further calls
+		    wait in a queue. If None, windows are not limited. Default is None.
+		window_queue : Optional[int], optional
+		    The maximum number of calls from one window waiting for a slot. Calls beyond
+		    it are rejected with HTTP 503 and JSON-RPC error -32001 (server busy).
+		    If None, the queue is unbounded. Default is None.
+		metrics : bool, optional
+		    Whether to collect per-method call counts, error counts, phase latency
+		    histograms and payload sizes in `rpc.metrics`. Default is True.
+		metrics_path : Optional[str], optional
+		    If set (for example '/metrics'), the metrics are served at this path in
+		    the Prometheus text format. Requires `metrics`. Default is None.
+		unix_socket : Optional[str], optional
+		    Path of a Unix domain socket to serve on as well, for local clients
+		    such as automation scripts. The socket is only accessible to the
+		    current user. Not available on Windows. Default is None.
+		tcp : bool, optional
+		    Whether to listen on TCP. Browser windows reach the server over TCP, so
+		    disable it only for headless use together with `unix_socket`; then
+		    `url` and `ws_url` are None. Default is True.
+		compression : Union[bool, Compressor], optional
+		    Compress responses with the content coding negotiated from
+		    `Accept-Encoding` (zstd, br, gzip or deflate). True uses a `Compressor`
+		    with default settings; pass a `Compressor` to set the minimum size and
+		    levels. Bodies of 64 KiB or more are compressed on a worker thread, and
+		    the ratio and CPU time are recorded in `metrics`. Streamed results are
+		    not compressed, and WebSocket frames use the transport's own
+		    per-message deflate. Off by default, since for a local webview the CPU
+		    time usually outweighs the saved bytes. Default is False.
+		max_upload_size : Optional[int], optional
+		    The maximum size in bytes of a file sent to an upload method (see the
+		    `upload` option of `method`). Uploads are streamed, so they are not
+		    limited by `client_max_size`. Larger uploads are answered with HTTP 413
+		    and JSON-RPC error -32003. If None, uploads are not limited. Default is
+		    None.
+		uvloop : bool, optional
+		    On Linux, run the event loop created by `run` and `start` with uvloop
+		    when the `uvloop` package is installed, falling back to asyncio
+		    otherwise and on other platforms. The
+		    implementation in use is reported as `event_loop` once the server has
+		    started. Default is False.
+		workers : int, optional
+		    Run the server in this many worker processes instead of a thread of the
+		    application process, so CPU-heavy methods do not compete with the Qt GUI
+		    thread for the GIL. On Linux the workers share the port with
+		    SO_REUSEPORT and the kernel balances connections between them; on other
+		    platforms a single worker is started. In the workers, `ctx.pyloid` and
+		    `ctx.window` are proxies whose calls run in the application process
+		    (arguments and results must be picklable). In async methods their
+		    calls return awaitables, so they never block the worker's event loop
+		    (`await ctx.window.get_title()`); in synchronous methods they block
+		    the executor thread until they return. Each worker imports this
+		    instance again, so it must be defined in a module that can be imported
+		    without side effects, or in the main script with the GUI started under
+		    `if __name__ == '__main__':`. Result caches, coalescing, cancellation,
+		    patch trackers and metrics are per worker, and `share_file` is not
+		    available with several workers. If 0, the server runs in a thread
+		    (see `run`). Default is 0.
+
+		Raises
+		------
+		ValueError
+		    If `unix_socket` is not supported on this platform, or neither
+		    listener is enabled.
+
+		Examples
+		--------
+		```python
+		from pyloid.rpc import (
+		    PyloidRPC,
 		)
 
 		rpc = PyloidRPC()
@@ -266,19 +1247,57 @@ class PyloidRPC:
 
 		@rpc.method()
 		async def add(
-		    ctx: RPCContext,
 		    a: int,
 		    b: int,
 		) -> int:
-		    # Access the application and window through ctx.pyloid and ctx.window
-		    if ctx.window:
-		        print(f'Window title: {ctx.window.title}')
 		    return a + b
 		```
+
+		A local script can call the same methods over a Unix domain socket:
+
+		```python
+		rpc = PyloidRPC(unix_socket='/tmp/my-app-rpc.sock')
+
+		# In the script
+		connector = aiohttp.UnixConnector(path='/tmp/my-app-rpc.sock')
+		async with aiohttp.ClientSession(connector=connector) as session:
+		    async with session.post(
+		        'http://localhost/rpc',
+		        json={'jsonrpc': '2.0', 'method': 'add', 'params': [1, 2], 'id': 1},
+		        headers={'X-Pyloid-Window-Id': window_id},
+		    ) as resp:
+		        print(await resp.json())
+		```
 		"""
+		if unix_socket is not None and not hasattr(
+			socket,
+			'AF_UNIX',
+		):
+			raise ValueError('Unix domain sockets are not supported on this platform.')
+		if not tcp and unix_socket is None:
+			raise ValueError('Enable tcp or pass unix_socket.')
+		self._host = '127.0.0.1'
+		self._rpc_path = '/rpc'
+		self._ws_path = '/rpc/ws'
+		self._upload_path = '/rpc/upload'
+		self._files_path = '/rpc/files'
+		self._get_path = '/rpc/get'
+		self.unix_socket = unix_socket
+		self._max_upload_size = max_upload_size
+		self.uvloop = uvloop
+		self.workers = workers
+		self._reuse_port = False
+		self._worker_processes: List[multiprocessing.process.BaseProcess] = []
+		self.event_loop: Optional[str] = None
+		self._loop: Optional[asyncio.AbstractEventLoop] = None
 
-		def decorator(
-			func: Callable[
+		self.static_url: Optional[str] = None
+		self._file_share = ZeroCopyFileShare()
+		self._set_port(get_free_port() if tcp else None)
+
+		self._functions: Dict[
+			str,
+			Callable[
 				...,
 				Coroutine[
 					Any,
@@ -286,397 +1305,4007 @@ class PyloidRPC:
 					Any,
 				],
 			],
-		):
-			rpc_name = name or func.__name__
-			if not asyncio.iscoroutinefunction(func):
-				raise TypeError(f"RPC function '{rpc_name}' must be an async function.")
-			if rpc_name in self._functions:
-				raise ValueError(f"RPC function name '{rpc_name}' is already registered.")
+		] = {}
+		self._plans: Dict[
+			str,
+			_MethodPlan,
+		] = {}
+		self._max_batch_size = max_batch_size
+		self._batch_concurrency = batch_concurrency
+		self._codec = get_json_codec(codec)
+		self._codecs: Dict[
+			str,
+			Codec,
+		] = {self._codec.content_type: self._codec}
+		for binary_codec in get_binary_codecs():
+			self._codecs[binary_codec.content_type] = binary_codec
+		if 'application/msgpack' in self._codecs:
+			self._codecs['application/x-msgpack'] = self._codecs['application/msgpack']
+		self._client_max_size = client_max_size
+		self._thread_workers = thread_workers
+		self._process_workers = process_workers
+		self._executors: Dict[
+			str,
+			Executor,
+		] = {}
+		self.metrics: Optional[RPCMetrics] = RPCMetrics() if metrics else None
+		self._compressor: Optional[Compressor] = (
+			compression
+			if isinstance(
+				compression,
+				Compressor,
+			)
+			else Compressor()
+			if compression
+			else None
+		)
+		self._window_concurrency = window_concurrency
+		self._window_queue = window_queue
+		self._window_limiters: Dict[
+			str,
+			_Limiter,
+		] = {}
+		self._running: Dict[
+			Tuple[
+				Any,
+				Any,
+			],
+			List[asyncio.Future],
+		] = {}
+		self._cancel_requested: Set[
+			Tuple[
+				Any,
+				Any,
+			]
+		] = set()
+		self._flights: Dict[
+			Tuple[
+				str,
+				Any,
+				str,
+			],
+			asyncio.Future,
+		] = {}
+		self._executor_load: Dict[
+			str,
+			Dict[
+				str,
+				int,
+			],
+		] = {}
+		self._websockets: Set[web.WebSocketResponse] = set()
+		self._app = web.Application(client_max_size=client_max_size)
 
-			# Analyze function signature
-			sig = inspect.signature(func)
-			has_ctx_param = 'ctx' in sig.parameters
+		self._pyloid: Optional['Pyloid'] = None
+		self._mounts: List[
+			Tuple[
+				'PyloidRPC',
+				Optional[str],
+			]
+		] = []
+		self._routers: List['PyloidRPC'] = []
+		# self.window: Optional["BrowserWindow"] = None
 
-			# Store the original function
-			self._functions[rpc_name] = func
-			# log.info(f"RPC function registered: {rpc_name}")
+		# CORS 설정 추가
+		cors = aiohttp_cors.setup(
+			self._app,
+			defaults={
+				'*': aiohttp_cors.ResourceOptions(
+					allow_credentials=True,
+					expose_headers='*',
+					allow_headers='*',
+					allow_methods=['POST'],
+				)
+			},
+		)
 
-			@wraps(func)
-			async def wrapper(
-				*args,
-				_pyloid_window_id=None,
-				**kwargs,
-			):
-				if has_ctx_param and 'ctx' not in kwargs:
-					ctx = RPCContext(
-						pyloid=self.pyloid,
-						window=self.pyloid.get_window_by_id(_pyloid_window_id),
-					)
-					kwargs['ctx'] = ctx
-				return await func(
-					*args,
-					**kwargs,
+		# CORS 적용된 라우트 추가
+		resource = cors.add(self._app.router.add_resource(self._rpc_path))
+		cors.add(
+			resource.add_route(
+				'POST',
+				self._handle_rpc,
+			)
+		)
+		upload_resource = cors.add(self._app.router.add_resource(self._upload_path))
+		cors.add(
+			upload_resource.add_route(
+				'POST',
+				self._handle_upload,
+			)
+		)
+		get_resource = cors.add(self._app.router.add_resource(f'{self._get_path}/{{method}}'))
+		cors.add(
+			get_resource.add_route(
+				'GET',
+				self._handle_get,
+			),
+			{
+				'*': aiohttp_cors.ResourceOptions(
+					allow_credentials=True,
+					expose_headers='*',
+					allow_headers='*',
+					allow_methods=['GET'],
+				)
+			},
+		)
+		files_resource = cors.add(self._app.router.add_resource(f'{self._files_path}/{{token}}'))
+		cors.add(
+			files_resource.add_route(
+				'GET',
+				self._file_share.handle_request,
+			),
+			{
+				'*': aiohttp_cors.ResourceOptions(
+					expose_headers='*',
+					allow_headers='*',
+					allow_methods=['GET'],
 				)
+			},
+		)
 
-			return wrapper
+		# Persistent WebSocket transport (same-origin upgrade, no CORS preflight)
+		self._app.router.add_get(
+			self._ws_path,
+			self._handle_ws,
+		)
+		self._app.on_shutdown.append(self._close_websockets)
+
+		# Prometheus metrics endpoint
+		if metrics_path is not None and self.metrics is not None:
+			self._app.router.add_get(
+				metrics_path,
+				self._handle_metrics,
+			)
+
+		log.info(f'RPC server initialized (codec: {self._codec.name}).')
+		self._runner: Optional[web.AppRunner] = None
+		self._site: Optional[web.TCPSite] = None
+		self._unix_site: Optional[web.SockSite] = None
+
+	def method(
+		self,
+		name: Optional[str] = None,
+		executor: Optional[
+			Union[
+				str,
+				Executor,
+			]
+		] = None,
+		max_concurrency: Optional[int] = None,
+		max_queue: Optional[int] = None,
+		timeout: Optional[float] = None,
+		coalesce: Optional[str] = None,
+		cache: bool = False,
+		cache_size: int = 128,
+		cache_ttl: Optional[float] = None,
+		cache_scope: str = 'global',
+		cache_tags: Optional[
+			Union[
+				Sequence[str],
+				Callable[
+					...,
+					Iterable[str],
+				],
+			]
+		] = None,
+		upload: Optional[str] = None,
+		upload_mode: Optional[str] = None,
+		idempotent: bool = False,
+		cache_control: Optional[str] = None,
+		etag: Optional[
+			Callable[
+				...,
+				Any,
+			]
+		] = None,
+		patch: bool = False,
+		patch_size: int = 256,
+		encoder: Optional[
+			Union[
+				str,
+				ResultEncoder,
+			]
+		] = None,
+	) -> Callable:
+		"""
+		Use a decorator to register a function as an RPC method.
+
+		If there is a 'ctx' parameter, an RPCContext object is automatically injected.
+		This object allows access to the pyloid application and current window.
+
+		A running call can be cancelled by the client with the built-in
+		`$/cancelRequest` notification, whose params hold the `id` of the call
+		(`{"id": 42}`). The call is then answered with JSON-RPC error -32800. Calls
+		are identified by window and request id, so only clients that send the
+		window in the `X-Pyloid-Window-Id` header, or use the WebSocket or
+		QWebChannel transport, can cancel calls. A `$/cancelRequest` without a
+		window ID is rejected with error -32600. Calls are also cancelled when
+		their HTTP client disconnects. With several `workers`, running calls are
+		only known to the worker process that runs them, so a cancellation is
+		only reliable when it is sent on the WebSocket connection that made the
+		call; over HTTP it may reach another worker and return false.
+
+		Async generator functions are registered as streaming methods. Their
+		yielded items are sent to the client as they are produced, as NDJSON lines
+		or Server-Sent Events (see `_stream_response`).
+
+		Synchronous functions run on an executor so that blocking code does not
+		stall the RPC event loop. By default they run on the shared thread pool.
+		CPU-bound functions can use `executor='process'`; they must be defined at
+		module level and cannot take a 'ctx' parameter, because they are pickled
+		and run in another process.
+
+		Parameters
+		----------
+		name : Optional[str], optional
+		    Name to register the RPC method. If None, the function name is used. Default is None.
+		executor : Optional[Union[str, Executor]], optional
+		    Where a synchronous function runs: 'thread' (the shared thread pool),
+		    'process' (the shared process pool) or a `concurrent.futures.Executor`
+		    instance. If None, 'thread' is used. Only valid for synchronous functions.
+		    Default is None.
+		max_concurrency : Optional[int], optional
+		    The maximum number of calls of this method running at once. Further calls
+		    wait in a queue. If None, the method is not limited. Default is None.
+		max_queue : Optional[int], optional
+		    The maximum number of calls waiting for a slot when `max_concurrency` is
+		    set. Calls beyond it are rejected at once with HTTP 503 and JSON-RPC error
+		    -32001 (server busy). If None, the queue is unbounded. Default is None.
+		timeout : Optional[float], optional
+		    The maximum run time of a call in seconds. A call that runs longer is
+		    cancelled and answered with HTTP 504 and JSON-RPC error -32002. Calls on
+		    an executor stop being awaited, but the worker finishes the function.
+		    Does not apply to streaming methods. If None, calls are not limited.
+		    Default is None.
+		coalesce : Optional[str], optional
+		    Share one execution between concurrent calls with equal params
+		    (singleflight). With 'global' the calls of all windows are shared, and a
+		    method taking 'ctx' sees the context of the call that runs it; with
+		    'window' only calls of the same window are shared. Params are compared
+		    after binding, so `[1, 2]` and `{"a": 1, "b": 2}` are the same call. Not
+		    valid for streaming methods. Hits and misses are reported by
+		    `coalesce_stats`. With several `workers`, only calls handled by the
+		    same worker process are shared. If None, every call runs the method.
+		    Default is None.
+		cache : bool, optional
+		    Memoize results by params. A cached call skips the method and the
+		    concurrency limits, and reuses the serialized result of the call that
+		    filled the cache. Errors are not cached, and results must not be mutated
+		    after they are returned. Not valid for streaming methods. Default is False.
+		cache_size : int, optional
+		    The maximum number of cached results; the least recently used one is
+		    evicted beyond it. Default is 128.
+		cache_ttl : Optional[float], optional
+		    Seconds a cached result stays valid. If None, results stay until they are
+		    evicted or invalidated. Default is None.
+		cache_scope : str, optional
+		    'global' to share cached results between windows, or 'window' to keep
+		    them per window, for methods whose result depends on `ctx`. Default is
+		    'global'.
+		cache_tags : Optional[Union[Sequence[str], Callable[..., Iterable[str]]]], optional
+		    Tags of the cached results, for `invalidate_tags`. Either fixed tags, or
+		    a function that returns them, called with the call arguments its
+		    parameters name. Default is None.
+		upload : Optional[str], optional
+		    Name of a parameter that receives an uploaded file as an `RPCUpload`.
+		    Such a method is called by POSTing the file to `upload_url`, either as
+		    `multipart/form-data` with a 'request' part holding the JSON-RPC request
+		    followed by the file part, or as the raw body with the JSON-RPC request
+		    in the `request` query parameter (and optionally `filename`). Other
+		    params are bound by name as usual. Cannot be combined with streaming,
+		    `coalesce` or `cache`. Default is None.
+		upload_mode : Optional[str], optional
+		    'stream' to let the method read the upload from the request while it
+		    runs, or 'file' to write it to a temporary file first and call the
+		    method with `RPCUpload.path` set. Synchronous methods need 'file'. If
+		    None, async methods use 'stream' and synchronous ones 'file'. Default is
+		    None.
+		idempotent : bool, optional
+		    Mark the method as read-only so it can also be called with HTTP GET at
+		    `get_url` + '/<name>', with the params as JSON in the `params` query
+		    parameter and the window in `window_id`. GET responses carry a weak
+		    ETag, are answered with 304 when `If-None-Match` matches, and can be
+		    stored by the browser HTTP cache. Cannot be combined with streaming or
+		    `upload`. Default is False.
+		cache_control : Optional[str], optional
+		    The `Cache-Control` header of successful GET responses, e.g.
+		    'private, max-age=60'. If None, 'private, no-cache' is sent, so the
+		    browser revalidates with the ETag on every call. Requires `idempotent`.
+		    Default is None.
+		etag : Optional[Callable[..., Any]], optional
+		    A function returning the current version of the result, called with the
+		    call arguments its parameters name. The ETag is derived from it, so a
+		    matching `If-None-Match` is answered with 304 without running the
+		    method. If None, the ETag is a hash of the response body. Requires
+		    `idempotent`. Default is None.
+		patch : bool, optional
+		    Answer with RFC 6902 JSON Patches against the result last sent to the
+		    window, for large results that change little between polls. The
+		    result becomes `{"version": v, "document": ...}`, or
+		    `{"version": v, "patch": [...]}` when the request object carries the
+		    version the client has as `base_version` (the `base_version` query
+		    parameter for GET) and it is the version last sent for the same window
+		    and params. Not valid for streaming or upload methods. Default is False.
+		patch_size : int, optional
+		    The maximum number of documents remembered for `patch`, one per window
+		    and params; clients of forgotten ones get the full document again.
+		    Default is 256.
+		encoder : Optional[Union[str, ResultEncoder]], optional
+		    Send results in a binary format that JavaScript views with typed
+		    arrays instead of parsing JSON: 'ndarray' for NumPy arrays (raw
+		    little-endian bytes with a dtype/shape header), 'columns' for tables
+		    (one typed-array buffer per column) or 'arrow' for tables in the Arrow
+		    IPC stream format (needs `pyarrow`), see `pyloid.columnar`. Tables are
+		    lists of dicts, dicts of columns or DataFrames. HTTP POST and GET
+		    clients get the binary body, with the encoder's media type as
+		    `Content-Type`, when their `Accept` header lists that media type;
+		    errors stay JSON-RPC responses. Other clients, batches and the
+		    WebSocket and QWebChannel transports get the result as JSON (arrays
+		    as nested lists, tables as records or columns of lists). Not valid
+		    for streaming methods or with `patch`. Default is None.
+
+		Returns
+		-------
+		Callable
+		    The decorator function.
+
+		Raises
+		------
+		TypeError
+		    If the decorated function is a synchronous generator function.
+		ValueError
+		    If an RPC function with the specified name is already registered, the
+		    executor does not fit the function, or the `coalesce`, cache, GET or
+		    encoder options are invalid.
+		ImportError
+		    If the library the encoder needs is not installed.
+
+		Examples
+		--------
+		```python
+		from pyloid.rpc import (
+		    PyloidRPC,
+		    RPCContext,
+		)
+
+		rpc = PyloidRPC()
+
+
+		@rpc.method()
+		async def add(
+		    ctx: RPCContext,
+		    a: int,
+		    b: int,
+		) -> int:
+		    # Access the application and window through ctx.pyloid and ctx.window
+		    if ctx.window:
+		        print(f'Window title: {ctx.window.title}')
+		    return a + b
+
+
+		@rpc.method()
+		async def tail_logs(
+		    limit: int,
+		):
+		    for line in read_log_lines(limit):
+		        yield line
+
+
+		@rpc.method(coalesce='global')
+		async def load_dashboard(
+		    range: str,
+		) -> dict:
+		    return await query_dashboard(range)
+
+
+		@rpc.method(
+		    cache=True,
+		    cache_ttl=60,
+		    cache_tags=lambda user_id: [f'user:{user_id}'],
+		)
+		async def get_profile(
+		    user_id: int,
+		) -> dict:
+		    return await load_profile(user_id)
+
+
+		@rpc.method(
+		    idempotent=True,
+		    cache_control='private, max-age=30',
+		    etag=lambda: settings_version(),
+		)
+		async def get_settings() -> dict:
+		    return await load_settings()
+
+
+		@rpc.method(patch=True)
+		async def get_board_state() -> dict:
+		    return board.to_dict()
+
+
+		@rpc.method(encoder='columns')
+		async def list_trades() -> list:
+		    return [{'symbol': t.symbol, 'price': t.price} for t in trades]
+
+
+		@rpc.method(upload='file')
+		async def import_csv(
+		    file: RPCUpload,
+		    delimiter: str = ',',
+		) -> int:
+		    rows = 0
+		    async for chunk in file:
+		        rows += chunk.count(b'\\n')
+		    return rows
+
+
+		@rpc.method(executor='process')
+		def checksum(
+		    path: str,
+		) -> str:
+		    return hashlib.sha256(open(path, 'rb').read()).hexdigest()
+		```
+		"""
+
+		def decorator(
+			func: Callable[
+				...,
+				Any,
+			],
+		):
+			rpc_name = name or func.__name__
+			if inspect.isgeneratorfunction(func):
+				raise TypeError(
+					f"RPC function '{rpc_name}' must be an async generator function to stream results."
+				)
+			self._check_name(rpc_name)
+
+			is_async = asyncio.iscoroutinefunction(func) or inspect.isasyncgenfunction(func)
+			method_executor = executor
+			if is_async:
+				if method_executor is not None:
+					raise ValueError(
+						f"RPC function '{rpc_name}' is async and runs on the event loop; "
+						'executor is only valid for synchronous functions.'
+					)
+			elif method_executor is None:
+				method_executor = 'thread'
+			elif isinstance(
+				method_executor,
+				str,
+			) and method_executor not in (
+				'thread',
+				'process',
+			):
+				raise ValueError(
+					f"Unknown executor '{method_executor}'. Use 'thread' or 'process'."
+				)
+
+			# Analyze the function signature once and keep the dispatch plan
+			plan = _MethodPlan(
+				rpc_name,
+				func,
+				method_executor,
+				upload,
+			)
+			if upload is not None:
+				if (
+					upload not in inspect.signature(func).parameters
+					or upload == 'ctx'
+					or plan.is_stream
+					or coalesce is not None
+					or cache
+				):
+					raise ValueError(
+						f"RPC function '{rpc_name}' cannot take the upload '{upload}': it must "
+						'name a parameter, and the method must not stream, coalesce or cache.'
+					)
+				plan.upload_mode = upload_mode or ('stream' if is_async else 'file')
+				if plan.upload_mode not in (
+					'stream',
+					'file',
+				) or (plan.upload_mode == 'stream' and not is_async):
+					raise ValueError(
+						f"Invalid upload_mode '{plan.upload_mode}'. Use 'stream' (async "
+						"functions only) or 'file'."
+					)
+			if method_executor == 'process' and plan.has_ctx:
+				raise ValueError(
+					f"RPC function '{rpc_name}' runs in a process pool and cannot take a 'ctx' parameter."
+				)
+			plan.timeout = timeout
+			if coalesce is not None:
+				if coalesce not in (
+					'global',
+					'window',
+				):
+					raise ValueError(
+						f"Unknown coalesce scope '{coalesce}'. Use 'global' or 'window'."
+					)
+				if plan.is_stream:
+					raise ValueError(
+						f"RPC function '{rpc_name}' streams its result and cannot be coalesced."
+					)
+				plan.coalesce = coalesce
+			if cache:
+				if cache_scope not in (
+					'global',
+					'window',
+				):
+					raise ValueError(
+						f"Unknown cache scope '{cache_scope}'. Use 'global' or 'window'."
+					)
+				if plan.is_stream:
+					raise ValueError(
+						f"RPC function '{rpc_name}' streams its result and cannot be cached."
+					)
+				plan.cache = ResultCache(
+					cache_size,
+					cache_ttl,
+				)
+				plan.cache_scope = cache_scope
+				if callable(cache_tags):
+					plan.cache_tags = _named_arg_caller(cache_tags)
+				elif cache_tags is not None:
+					fixed_tags = tuple(cache_tags)
+					plan.cache_tags = lambda named: fixed_tags
+			if idempotent:
+				if plan.is_stream or upload is not None:
+					raise ValueError(
+						f"RPC function '{rpc_name}' streams its result or takes an upload and "
+						'cannot be called with GET.'
+					)
+				plan.idempotent = True
+				plan.cache_control = cache_control
+				if etag is not None:
+					plan.etag_version = _named_arg_caller(etag)
+			elif cache_control is not None or etag is not None:
+				raise ValueError(
+					f"RPC function '{rpc_name}' must be idempotent to use cache_control or etag."
+				)
+			if patch:
+				if plan.is_stream or upload is not None:
+					raise ValueError(
+						f"RPC function '{rpc_name}' streams its result or takes an upload and "
+						'cannot be answered with patches.'
+					)
+				plan.patch = PatchTracker(
+					self._codec,
+					patch_size,
+				)
+			if encoder is not None:
+				if plan.is_stream or patch:
+					raise ValueError(
+						f"RPC function '{rpc_name}' streams its result or is answered with "
+						'patches and cannot use a binary encoder.'
+					)
+				plan.encoder = get_result_encoder(encoder)
+			if max_concurrency is not None:
+				plan.limiter = _Limiter(
+					'method',
+					rpc_name,
+					max_concurrency,
+					max_queue,
+				)
+
+			# Store the original function, also in the servers this one is mounted on
+			self._add_plan(
+				rpc_name,
+				func,
+				plan,
+			)
+			# log.info(f"RPC function registered: {rpc_name}")
+
+			def _inject_ctx(
+				kwargs,
+				window_id,
+			):
+				if plan.has_ctx and 'ctx' not in kwargs:
+					ctx = RPCContext(
+						pyloid=self.pyloid,
+						window=self.pyloid.get_window_by_id(window_id),
+					)
+					kwargs['ctx'] = ctx
+
+			async def _inject_ctx_async(
+				kwargs,
+				window_id,
+			):
+				if plan.has_ctx and 'ctx' not in kwargs:
+					kwargs['ctx'] = RPCContext(
+						pyloid=self.pyloid,
+						window=await self._get_window(window_id),
+					)
+
+			if method_executor == 'process':
+				# Keep the module-level function picklable for the process pool
+				return func
+
+			if plan.executor is not None:
+
+				@wraps(func)
+				def sync_wrapper(
+					*args,
+					_pyloid_window_id=None,
+					**kwargs,
+				):
+					_inject_ctx(
+						kwargs,
+						_pyloid_window_id,
+					)
+					return func(
+						*args,
+						**kwargs,
+					)
+
+				return sync_wrapper
+
+			if plan.is_stream:
+
+				@wraps(func)
+				async def stream_wrapper(
+					*args,
+					_pyloid_window_id=None,
+					**kwargs,
+				):
+					await _inject_ctx_async(
+						kwargs,
+						_pyloid_window_id,
+					)
+					async for item in func(
+						*args,
+						**kwargs,
+					):
+						yield item
+
+				return stream_wrapper
+
+			@wraps(func)
+			async def wrapper(
+				*args,
+				_pyloid_window_id=None,
+				**kwargs,
+			):
+				await _inject_ctx_async(
+					kwargs,
+					_pyloid_window_id,
+				)
+				return await func(
+					*args,
+					**kwargs,
+				)
+
+			return wrapper
+
+		return decorator
+
+	@property
+	def pyloid(
+		self,
+	) -> Optional['Pyloid']:
+		"""The Pyloid application, shared with the routers mounted with `include`."""
+		return self._pyloid
+
+	@pyloid.setter
+	def pyloid(
+		self,
+		pyloid: Optional['Pyloid'],
+	):
+		self._pyloid = pyloid
+		for router in self._routers:
+			router.pyloid = pyloid
+
+	def include(
+		self,
+		router: 'PyloidRPC',
+		namespace: Optional[str] = None,
+	):
+		"""
+		Mount the methods of another `PyloidRPC` instance on this server.
+
+		Lets methods be split into modules, each with its own `PyloidRPC` used
+		as a router, while a single server, port and event loop serves them all.
+		The router's methods are called as '<namespace>.<name>', including
+		methods registered on it after it is mounted, and routers can be nested.
+		Mounted routers must not be started themselves. Server-wide settings
+		such as codecs, compression, window limits, executors and metrics come
+		from the server that handles the request; per-method options stay with
+		the method.
+
+		Parameters
+		----------
+		router : PyloidRPC
+		    The instance whose methods are mounted.
+		namespace : Optional[str], optional
+		    The prefix of the mounted method names. If None, the names are
+		    mounted as they are. Default is None.
+
+		Raises
+		------
+		ValueError
+		    If the router is this server or already mounted on it, the namespace
+		    is empty, or a mounted name is already registered.
+
+		Examples
+		--------
+		```python
+		# files_api.py
+		router = PyloidRPC()
+
+
+		@router.method()
+		async def read(
+		    path: str,
+		) -> str: ...
+
+
+		# main.py
+		from files_api import (
+		    router as files_router,
+		)
+
+		rpc = PyloidRPC()
+		rpc.include(
+		    files_router,
+		    namespace='files',
+		)
+		app = Pyloid(
+		    'Pyloid-App',
+		    server=rpc,
+		)
+		```
+
+		```javascript
+		const text = await rpc.call('files.read', { path: 'notes.txt' });
+		```
+		"""
+		if router is self or router in self._routers:
+			raise ValueError('The router is already mounted on this server.')
+		if namespace is not None and (not namespace or namespace.startswith('$')):
+			raise ValueError(f"Invalid namespace '{namespace}'.")
+		names = [_qualified_name(namespace, name) for name in router._plans]
+		for name in names:
+			self._check_name(name)
+		if len(set(names)) != len(names):
+			raise ValueError('Mounted method names must be unique.')
+		for name, plan in list(router._plans.items()):
+			self._add_plan(
+				_qualified_name(namespace, name),
+				router._functions[name],
+				plan,
+			)
+		router._mounts.append(
+			(
+				self,
+				namespace,
+			)
+		)
+		self._routers.append(router)
+		router.pyloid = self._pyloid
+
+	def _check_name(
+		self,
+		name: str,
+	):
+		"""Raise ValueError if a name is taken here or in the servers this one is mounted on."""
+		if name in self._functions:
+			raise ValueError(f"RPC function name '{name}' is already registered.")
+		for parent, namespace in self._mounts:
+			parent._check_name(_qualified_name(namespace, name))
+
+	def _add_plan(
+		self,
+		name: str,
+		func: Callable[
+			...,
+			Any,
+		],
+		plan: _MethodPlan,
+	):
+		"""Register a method plan here and in the servers this one is mounted on."""
+		if plan.name != name:
+			# The copy shares the limiter, caches and trackers of the original
+			plan = copy.copy(plan)
+			plan.name = name
+		self._functions[name] = func
+		self._plans[name] = plan
+		for parent, namespace in self._mounts:
+			parent._add_plan(
+				_qualified_name(namespace, name),
+				func,
+				plan,
+			)
+
+	def _validate_jsonrpc_request(
+		self,
+		data: Any,
+	) -> Optional[
+		Dict[
+			str,
+			Any,
+		]
+	]:
+		"""
+		Validate the structure of a potential JSON-RPC request object.
+
+		Checks for required fields ('jsonrpc', 'method') and validates the
+		types of fields like 'params' and 'id' according to the JSON-RPC 2.0 spec.
+
+		Parameters
+		----------
+		data : Any
+		    The parsed JSON data from the request body.
+
+		Returns
+		-------
+		Optional[Dict[str, Any]]
+		    None if the request is valid according to the basic structure,
+		    otherwise a dictionary representing the JSON-RPC error object
+		    to be returned to the client.
+		"""
+		# Attempt to extract the ID if possible, even for invalid requests
+		request_id = (
+			data.get('id')
+			if isinstance(
+				data,
+				dict,
+			)
+			else None
+		)
+
+		if not isinstance(
+			data,
+			dict,
+		):
+			return {
+				'code': -32600,
+				'message': 'Invalid Request: Request must be a JSON object.',
+			}
+		if data.get('jsonrpc') != '2.0':
+			return {
+				'code': -32600,
+				'message': "Invalid Request: 'jsonrpc' version must be '2.0'.",
+			}
+		if 'method' not in data or not isinstance(
+			data['method'],
+			str,
+		):
+			return {
+				'code': -32600,
+				'message': "Invalid Request: 'method' must be a string.",
+			}
+		if 'params' in data and not isinstance(
+			data['params'],
+			(
+				list,
+				dict,
+			),
+		):
+			# JSON-RPC 2.0: "params" must be array or object if present
+			return {
+				'code': -32602,
+				'message': "Invalid params: 'params' must be an array or object.",
+			}
+		# JSON-RPC 2.0: "id" is optional, but if present, must be string, number, or null.
+		# This validation is simplified here. A more robust check could be added.
+		# if "id" in data and not isinstance(data.get("id"), (str, int, float, type(None))):
+		#     return {"code": -32600, "message": "Invalid Request: 'id', if present, must be a string, number, or null."}
+		return None  # Request structure is valid
+
+	async def _get_window(
+		self,
+		window_id: Any,
+	) -> Optional['BrowserWindow']:
+		"""
+		Look up a window of the application.
+
+		In worker processes `pyloid` is a proxy whose lookups are awaitable, so
+		that asking the application process does not block the event loop.
+		"""
+		window = self.pyloid.get_window_by_id(window_id)
+		if inspect.isawaitable(window):
+			window = await window
+		return window
+
+	@staticmethod
+	def _error_response(
+		code: int,
+		message: str,
+		request_id: Any = None,
+		data: Any = None,
+	) -> Dict[
+		str,
+		Any,
+	]:
+		"""
+		Build a JSON-RPC 2.0 error response object.
+
+		Parameters
+		----------
+		code : int
+		    The JSON-RPC error code.
+		message : str
+		    A human-readable description of the error.
+		request_id : Any, optional
+		    The id of the request the error belongs to. Defaults to None.
+		data : Any, optional
+		    Additional information about the error. Omitted when None.
+
+		Returns
+		-------
+		Dict[str, Any]
+		    The JSON-RPC error response object.
+		"""
+		error_obj = {
+			'code': code,
+			'message': message,
+		}
+		if data is not None:
+			error_obj['data'] = data
+		return {
+			'jsonrpc': '2.0',
+			'error': error_obj,
+			'id': request_id,
+		}
+
+	def _respond(
+		self,
+		data: Any,
+		status: int = 200,
+		codec: Optional[Codec] = None,
+		accept: Optional[str] = None,
+	) -> web.Response:
+		"""
+		Encode a response object with a codec.
+
+		Parameters
+		----------
+		data : Any
+		    The JSON-RPC response object (or array of objects for batches).
+		status : int, optional
+		    The HTTP status code. Default is 200.
+		codec : Optional[Codec], optional
+		    The codec to encode with. Defaults to the JSON codec.
+		accept : Optional[str], optional
+		    The `Accept` header of the request. The result of a method with a
+		    binary encoder is sent as the body, in the encoder's format, if the
+		    header lists its media type. Default is None.
+
+		Returns
+		-------
+		web.Response
+		    The encoded aiohttp response.
+		"""
+		codec = codec or self._codec
+		result = (
+			data.get('result')
+			if isinstance(
+				data,
+				dict,
+			)
+			else None
+		)
+		if isinstance(
+			result,
+			EncodedResult,
+		) and accepts(
+			accept,
+			result.encoder.content_type,
+		):
+			try:
+				body = result.encode()
+			except Exception:
+				log.exception(f'Failed to encode an RPC result with {result.encoder!r}:')
+				return self._respond(
+					self._error_response(
+						-32603,
+						'Internal error: The result could not be encoded.',
+						data.get('id'),
+					),
+					status=500,
+					codec=codec,
+				)
+			return web.Response(
+				body=body,
+				status=status,
+				content_type=result.encoder.content_type,
+			)
+		try:
+			body = self._encode_response(
+				data,
+				codec,
+			)
+		except (
+			TypeError,
+			ValueError,
+			OverflowError,
+		) as e:
+			return self._respond(
+				self._encoding_error(
+					e,
+					data,
+					codec,
+				),
+				status=500,
+				codec=codec,
+			)
+		return web.Response(
+			body=body,
+			status=status,
+			content_type=codec.content_type,
+		)
+
+	def _encoding_error(
+		self,
+		error: Exception,
+		data: Any,
+		codec: Codec,
+	) -> Dict[
+		str,
+		Any,
+	]:
+		"""
+		Log a response that a codec cannot encode and build the error sent instead.
+
+		Parameters
+		----------
+		error : Exception
+		    The exception raised by the codec.
+		data : Any
+		    The response object (or array of objects for batches).
+		codec : Codec
+		    The codec that failed.
+
+		Returns
+		-------
+		Dict[str, Any]
+		    A JSON-RPC error response with code -32603 that names the reason.
+		"""
+		log.error(f'Failed to encode an RPC response with {codec!r}: {error}')
+		return self._error_response(
+			-32603,
+			f'Internal error: The result could not be encoded. {error}',
+			data.get('id')
+			if isinstance(
+				data,
+				dict,
+			)
+			else None,
+		)
+
+	@staticmethod
+	def _encode_response(
+		data: Any,
+		codec: Codec,
+	) -> bytes:
+		"""
+		Encode a response object, reusing the serialized bytes of a cached result.
+
+		Parameters
+		----------
+		data : Any
+		    The JSON-RPC response object (or array of objects for batches).
+		codec : Codec
+		    The codec to encode with.
+
+		Returns
+		-------
+		bytes
+		    The encoded body.
+		"""
+		if isinstance(
+			data,
+			dict,
+		):
+			result = data.get('result')
+			if isinstance(
+				result,
+				CacheEntry,
+			):
+				return codec.encode_success(
+					result.encode(codec),
+					data.get('id'),
+				)
+			if isinstance(
+				result,
+				EncodedResult,
+			):
+				data = {
+					**data,
+					'result': result.to_json(),
+				}
+		return codec.encode(data)
+
+	def _negotiate_codec(
+		self,
+		accept: Optional[str],
+		default: Codec,
+	) -> Codec:
+		"""
+		Pick the response codec from an `Accept` header.
+
+		Media types are tried in order of their quality value. If none of them is
+		supported, or the header is missing or a wildcard, the codec of the request
+		body is used.
+
+		Parameters
+		----------
+		accept : Optional[str]
+		    The value of the `Accept` header.
+		default : Codec
+		    The codec to fall back to.
+
+		Returns
+		-------
+		Codec
+		    The codec to encode the response with.
+		"""
+		if not accept:
+			return default
+		candidates = []
+		for index, item in enumerate(accept.split(',')):
+			media_type, _, options = item.partition(';')
+			quality = 1.0
+			for option in options.split(';'):
+				key, _, value = option.strip().partition('=')
+				if key == 'q':
+					try:
+						quality = float(value)
+					except ValueError:
+						quality = 0.0
+			if quality > 0:
+				candidates.append(
+					(
+						-quality,
+						index,
+						media_type.strip().lower(),
+					)
+				)
+		for _, _, media_type in sorted(candidates):
+			if media_type in (
+				'*/*',
+				'application/*',
+			):
+				return default
+			codec = self._codecs.get(media_type)
+			if codec is not None:
+				return codec
+		return default
+
+	async def _handle_rpc(
+		self,
+		request: web.Request,
+	) -> web.Response:
+		"""
+		Handles incoming JSON-RPC requests.
+
+		Parses the request body and hands it to `_dispatch` for a single
+		request object, or to `_dispatch_batch` for a batch array.
+
+		The window the call belongs to is taken from the `X-Pyloid-Window-Id`
+		header when present, otherwise from the request `id`.
+
+		Parameters
+		----------
+		request : web.Request
+		    The incoming aiohttp request object.
+
+		Returns
+		-------
+		web.Response
+		    An aiohttp response object containing the JSON-RPC response or error,
+		    encoded with the codec negotiated from `Accept`.
+		"""
+		request_id: Optional[
+			Union[
+				str,
+				int,
+				None,
+			]
+		] = None
+
+		# Content negotiation: the body codec follows Content-Type, the response
+		# codec follows Accept and defaults to the body codec
+		request_codec = self._codecs.get(request.content_type)
+		response_codec = self._negotiate_codec(
+			request.headers.get('Accept'),
+			request_codec or self._codec,
+		)
+
+		try:
+			# 1. Check Content-Type
+			if request_codec is None:
+				# Cannot determine ID if content type is wrong, respond with null ID
+				return self._respond(
+					self._error_response(
+						-32700,
+						f'Parse error: Content-Type must be one of {", ".join(self._codecs)}.',
+					),
+					status=415,
+					codec=response_codec,
+				)  # Unsupported Media Type
+
+			# 2. Parse Body
+			try:
+				raw_data = await request.read()
+				parse_start = time.perf_counter()
+				data = request_codec.decode(raw_data)
+				parse_time = time.perf_counter() - parse_start
+			except CodecError:
+				# Invalid body, ID might be unknown, respond with null ID
+				return self._respond(
+					self._error_response(
+						-32700,
+						f'Parse error: Invalid {request_codec.name} format.'
+						if request_codec.binary
+						else 'Parse error: Invalid JSON format.',
+					),
+					status=400,
+					codec=response_codec,
+				)  # Bad Request
+
+			window_id = request.headers.get('X-Pyloid-Window-Id')
+
+			# 3. Batch requests are dispatched concurrently
+			if isinstance(
+				data,
+				list,
+			):
+				(
+					status,
+					response_data,
+				) = await self._dispatch_batch(
+					data,
+					window_id,
+				)
+			else:
+				# Extract ID early for inclusion in potential error responses
+				if isinstance(
+					data,
+					dict,
+				):
+					request_id = data.get('id')
+
+				# 4. Single request
+				(
+					status,
+					response_data,
+				) = await self._dispatch(
+					data,
+					window_id,
+					allow_stream=True,
+				)
+				if response_data is not None and isinstance(
+					response_data.get('result'),
+					_RPCStream,
+				):
+					self._record_transport(
+						data,
+						parse_time,
+						len(raw_data),
+					)
+					return await self._stream_response(
+						request,
+						data['method'],
+						response_data['result'],
+						request_id,
+					)
+			if response_data is None:
+				# No response for notifications
+				self._record_transport(
+					data,
+					parse_time,
+					len(raw_data),
+				)
+				return web.Response(status=204)
+			serialize_start = time.perf_counter()
+			response = self._respond(
+				response_data,
+				status=status,
+				codec=response_codec,
+				accept=request.headers.get('Accept'),
+			)
+			serialize_time = time.perf_counter() - serialize_start
+			response_bytes = len(response.body)
+			if self._compressor is not None:
+				await self._compress_response(
+					request,
+					response,
+					data,
+				)
+			self._record_transport(
+				data,
+				parse_time,
+				len(raw_data),
+				serialize_time,
+				response_bytes,
+			)
+			return response
+
+		except Exception:
+			# Catch-all for fatal errors during request handling itself (before/after method call)
+			log.exception('Fatal error in RPC handler:')
+			# ID might be uncertain at this stage, include if available
+			return self._respond(
+				self._error_response(
+					-32603,
+					'Internal error',
+					request_id,
+				),
+				status=500,
+				codec=response_codec,
+			)
+
+	async def _handle_get(
+		self,
+		request: web.Request,
+	) -> web.Response:
+		"""
+		Handles GET calls of idempotent methods.
+
+		The method name is the last path segment, the params are JSON in the
+		`params` query parameter and the window comes from the
+		`X-Pyloid-Window-Id` header or the `window_id` query parameter, which
+		also serves as the request `id`. Successful responses carry a weak ETag
+		and the method's `Cache-Control`, and are answered with 304 when the
+		`If-None-Match` header matches. They vary on `Accept`, and on
+		`X-Pyloid-Window-Id` when the window is given in the header, so HTTP
+		caches do not hand one window's response to another.
+
+		Parameters
+		----------
+		request : web.Request
+		    The incoming aiohttp request object.
+
+		Returns
+		-------
+		web.Response
+		    An aiohttp response object containing the JSON-RPC response or error,
+		    or an empty 304 response.
+		"""
+		method_name = request.match_info['method']
+		window_id = request.headers.get('X-Pyloid-Window-Id') or request.query.get('window_id')
+		response_codec = self._negotiate_codec(
+			request.headers.get('Accept'),
+			self._codec,
+		)
+
+		plan = self._plans.get(method_name)
+		if plan is None:
+			return self._respond(
+				self._error_response(
+					-32601,
+					'Method not found.',
+					window_id,
+				),
+				status=404,
+				codec=response_codec,
+			)  # Not Found
+		if not plan.idempotent:
+			response = self._respond(
+				self._error_response(
+					-32600,
+					f"Invalid Request: '{method_name}' is not idempotent and must be called "
+					'with POST.',
+					window_id,
+				),
+				status=405,
+				codec=response_codec,
+			)  # Method Not Allowed
+			response.headers['Allow'] = 'POST'
+			return response
+		if window_id is None:
+			return self._respond(
+				self._error_response(
+					-32600,
+					'Invalid window ID.',
+				),
+				status=400,
+				codec=response_codec,
+			)  # Bad Request
+
+		raw_params = request.query.get('params')
+		try:
+			parse_start = time.perf_counter()
+			params = self._codec.decode(raw_params.encode('utf-8')) if raw_params else []
+			parse_time = time.perf_counter() - parse_start
+		except CodecError:
+			return self._respond(
+				self._error_response(
+					-32700,
+					'Parse error: Invalid JSON format in params.',
+					window_id,
+				),
+				status=400,
+				codec=response_codec,
+			)  # Bad Request
+		data = {
+			'jsonrpc': '2.0',
+			'method': method_name,
+			'params': params,
+			'id': window_id,
+			'base_version': request.query.get('base_version'),
+		}
+
+		cache_headers = {
+			'Cache-Control': plan.cache_control or 'private, no-cache',
+			# The window is part of the response (its id and ctx), so a window given
+			# in the header must be part of the HTTP cache key, like the query string
+			'Vary': 'Accept, X-Pyloid-Window-Id'
+			if 'X-Pyloid-Window-Id' in request.headers
+			else 'Accept',
+		}
+		if_none_match = request.headers.get('If-None-Match')
+
+		# 1. A version ETag can be checked before the method runs
+		etag = None
+		if plan.etag_version is not None:
+			etag = self._version_etag(
+				plan,
+				params,
+				window_id,
+				response_codec,
+				request.headers.get('Accept'),
+			)
+			if etag is not None and _etag_matches(
+				if_none_match,
+				etag,
+			):
+				return web.Response(
+					status=304,
+					headers={
+						'ETag': etag,
+						**cache_headers,
+					},
+				)
+
+		# 2. Call the method
+		(
+			status,
+			response_data,
+		) = await self._dispatch(
+			data,
+			window_id,
+		)
+		serialize_start = time.perf_counter()
+		response = self._respond(
+			response_data,
+			status=status,
+			codec=response_codec,
+			accept=request.headers.get('Accept'),
+		)
+		serialize_time = time.perf_counter() - serialize_start
+		response_bytes = len(response.body)
+
+		# 3. Validate the result against If-None-Match
+		if status == 200:
+			if etag is None:
+				etag = 'W/"{}"'.format(
+					hashlib.blake2b(
+						response.body,
+						digest_size=16,
+					).hexdigest()
+				)
+			if _etag_matches(
+				if_none_match,
+				etag,
+			):
+				response = web.Response(status=304)
+			response.headers['ETag'] = etag
+			response.headers.update(cache_headers)
+		else:
+			response.headers['Cache-Control'] = 'no-store'
+
+		if self._compressor is not None and response.status == 200:
+			await self._compress_response(
+				request,
+				response,
+				data,
+			)
+		self._record_transport(
+			data,
+			parse_time,
+			len(raw_params or ''),
+			serialize_time,
+			response_bytes,
+		)
+		return response
+
+	def _version_etag(
+		self,
+		plan: _MethodPlan,
+		params: Any,
+		window_id: str,
+		codec: Codec,
+		accept: Optional[str] = None,
+	) -> Optional[str]:
+		"""
+		Compute the ETag of a GET call from the version the method reports.
+
+		Parameters
+		----------
+		plan : _MethodPlan
+		    The plan of an idempotent method with an `etag_version`.
+		params : Any
+		    The call params.
+		window_id : str
+		    The calling window.
+		codec : Codec
+		    The response codec, which changes the representation.
+		accept : Optional[str], optional
+		    The `Accept` header, which selects the binary representation of
+		    methods with an encoder. Default is None.
+
+		Returns
+		-------
+		Optional[str]
+		    The weak ETag, or None if the params do not bind or the version
+		    function failed, in which case the ETag is derived from the response.
+		"""
+		try:
+			(
+				args,
+				kwargs,
+			) = plan.bind(params)
+			version = plan.etag_version(
+				plan.named_args(
+					args,
+					kwargs,
+				)
+			)
+		except RPCError:
+			return None
+		except Exception:
+			log.exception(f"ETag version function of '{plan.name}' failed:")
+			return None
+		key = '\0'.join(
+			(
+				plan.name,
+				window_id,
+				plan.encoder.content_type
+				if plan.encoder is not None
+				and accepts(
+					accept,
+					plan.encoder.content_type,
+				)
+				else codec.name,
+				plan.call_key(
+					args,
+					kwargs,
+				),
+				repr(version),
+			)
+		)
+		return 'W/"{}"'.format(
+			hashlib.blake2b(
+				key.encode('utf-8'),
+				digest_size=16,
+			).hexdigest()
+		)
+
+	async def _handle_upload(
+		self,
+		request: web.Request,
+	) -> web.Response:
+		"""
+		Handles calls of upload methods, streaming the uploaded file.
+
+		The JSON-RPC request comes from the 'request' part of a
+		`multipart/form-data` body, followed by the file part, or from the
+		`request` query parameter with the file as the raw body. The file is
+		never read into memory as a whole: depending on the method's
+		`upload_mode` it is handed to the method as a stream or written to a
+		temporary file first, which is deleted after the call. The file is only
+		received once the method, window and params have been validated, and a
+		'request' part larger than `client_max_size` is answered with HTTP 413.
+
+		Parameters
+		----------
+		request : web.Request
+		    The incoming aiohttp request object.
+
+		Returns
+		-------
+		web.Response
+		    An aiohttp response object containing the JSON-RPC response or error.
+		"""
+		request_id = None
+		temp_path = None
+		try:
+			if request.content_type == 'multipart/form-data':
+				reader = await request.multipart()
+				part = await reader.next()
+				chunks = []
+				size = 0
+				if part is not None and part.name == 'request':
+					while True:
+						chunk = await part.read_chunk()
+						if not chunk:
+							break
+						size += len(chunk)
+						if size > self._client_max_size:
+							return self._respond(
+								self._error_response(
+									-32600,
+									f"Invalid Request: the 'request' part exceeds the limit of "
+									f'{self._client_max_size} bytes.',
+								),
+								status=413,
+							)  # Payload Too Large
+						chunks.append(chunk)
+				raw_data = b''.join(chunks)
+				file_part = await reader.next() if raw_data else None
+				if file_part is None:
+					return self._respond(
+						self._error_response(
+							-32600,
+							"Invalid Request: expected a 'request' part followed by a file part.",
+						),
+						status=400,
+					)  # Bad Request
+				filename = file_part.filename
+				content_type = file_part.headers.get('Content-Type')
+				read = file_part.read_chunk
+			else:
+				raw_data = request.query.get(
+					'request',
+					'',
+				).encode('utf-8')
+				filename = request.query.get('filename')
+				content_type = request.headers.get('Content-Type')
+				read = request.content.read
+
+			try:
+				data = self._codec.decode(raw_data)
+			except CodecError:
+				return self._respond(
+					self._error_response(
+						-32700,
+						'Parse error: Invalid JSON format.',
+					),
+					status=400,
+				)  # Bad Request
+			if isinstance(
+				data,
+				dict,
+			):
+				request_id = data.get('id')
+				plan = self._plans.get(data.get('method'))
+			else:
+				plan = None
+			if plan is None:
+				# Let _dispatch answer invalid requests and unknown methods
+				(
+					status,
+					response_data,
+				) = await self._dispatch(
+					data,
+					request.headers.get('X-Pyloid-Window-Id'),
+				)
+				if response_data is None:
+					return web.Response(status=204)
+				return self._respond(
+					response_data,
+					status=status,
+				)
+
+			if plan.upload is None:
+				# Rejected by _dispatch without reading the body
+				upload = RPCUpload(
+					filename,
+					content_type,
+					read=read,
+				)
+			elif plan.upload_mode == 'file':
+				# _process_request writes the upload to the temporary file in constant
+				# memory, after validating the window and params
+				(
+					fd,
+					temp_path,
+				) = tempfile.mkstemp(prefix='pyloid-upload-')
+				os.close(fd)
+				upload = RPCUpload(
+					filename,
+					content_type,
+					read=read,
+					max_size=self._max_upload_size,
+					spool_path=temp_path,
+				)
+			else:
+				upload = RPCUpload(
+					filename,
+					content_type,
+					read=read,
+					max_size=self._max_upload_size,
+				)
+
+			(
+				status,
+				response_data,
+			) = await self._dispatch(
+				data,
+				request.headers.get('X-Pyloid-Window-Id'),
+				upload=upload,
+			)
+			if response_data is None:
+				return web.Response(status=204)
+			return self._respond(
+				response_data,
+				status=status,
+			)
+
+		except _UploadTooLarge as e:
+			return self._respond(
+				{
+					'jsonrpc': '2.0',
+					'error': e.to_dict(),
+					'id': request_id,
+				},
+				status=413,
+			)  # Payload Too Large
+		except Exception:
+			log.exception('Fatal error in RPC upload handler:')
+			return self._respond(
+				self._error_response(
+					-32603,
+					'Internal error',
+					request_id,
+				),
+				status=500,
+			)
+		finally:
+			if temp_path is not None and os.path.exists(temp_path):
+				os.unlink(temp_path)
+
+	async def _compress_response(
+		self,
+		request: web.Request,
+		response: web.Response,
+		data: Any,
+	):
+		"""
+		Compress a response body in place if the client accepts a content coding.
+
+		Binary media types such as MessagePack, CBOR and the columnar result
+		formats are left as is, like in the static file handler.
+
+		Parameters
+		----------
+		request : web.Request
+		    The request, whose `Accept-Encoding` header is negotiated.
+		response : web.Response
+		    The encoded response, whose content type decides whether it is
+		    compressed.
+		data : Any
+		    The parsed request body, used to label the metrics.
+		"""
+		response.headers.add(
+			'Vary',
+			'Accept-Encoding',
+		)
+		original = response.body
+		compressed = await self._compressor.compress_body(
+			original,
+			request.headers.get('Accept-Encoding'),
+			response.content_type,
+		)
+		if compressed is None:
+			return
+		(
+			body,
+			encoding,
+			cpu_time,
+		) = compressed
+		response.body = body
+		response.headers['Content-Encoding'] = encoding
+		if self.metrics is not None:
+			self.metrics.record_compression(
+				self._transport_label(data),
+				len(original),
+				len(body),
+				cpu_time,
+			)
+
+	def _transport_label(
+		self,
+		data: Any,
+	) -> str:
+		"""Return the metrics label of a request body, '(batch)' for batches."""
+		if isinstance(
+			data,
+			list,
+		):
+			return '(batch)'
+		return self._metrics_label(data)
+
+	def _record_transport(
+		self,
+		data: Any,
+		parse_time: float,
+		request_bytes: int,
+		serialize_time: Optional[float] = None,
+		response_bytes: Optional[int] = None,
+	):
+		"""
+		Record the parse and serialize phases and the payload sizes of a request.
+
+		Batches are recorded under '(batch)' as a whole, since their entries
+		share one body.
+
+		Parameters
+		----------
+		data : Any
+		    The parsed request body.
+		parse_time : float
+		    Seconds spent decoding the body.
+		request_bytes : int
+		    Size of the request body.
+		serialize_time : Optional[float], optional
+		    Seconds spent encoding the response, if there is one.
+		response_bytes : Optional[int], optional
+		    Size of the response body, if there is one.
+		"""
+		if self.metrics is None:
+			return
+		label = self._transport_label(data)
+		self.metrics.observe(
+			label,
+			'parse',
+			parse_time,
+		)
+		if serialize_time is not None:
+			self.metrics.observe(
+				label,
+				'serialize',
+				serialize_time,
+			)
+		self.metrics.record_sizes(
+			label,
+			request_bytes,
+			response_bytes,
+		)
+
+	async def _handle_ws(
+		self,
+		request: web.Request,
+	) -> web.StreamResponse:
+		"""
+		Handles a persistent WebSocket connection carrying JSON-RPC frames.
+
+		The window is identified once, when the connection opens, from the
+		`window_id` query parameter or the `X-Pyloid-Window-Id` header. Every
+		frame holds a request object or a batch array and is dispatched as its
+		own task, so many calls can be in flight on one connection. Responses
+		carry the request `id`, which the client uses to match them to calls.
+
+		Parameters
+		----------
+		request : web.Request
+		    The incoming aiohttp upgrade request.
+
+		Returns
+		-------
+		web.StreamResponse
+		    The WebSocket response, or a JSON-RPC error if the window is unknown.
+		"""
+		window_id = request.query.get('window_id') or request.headers.get('X-Pyloid-Window-Id')
+		if not window_id or not await self._get_window(window_id):
+			return self._respond(
+				self._error_response(
+					-32600,
+					'Invalid window ID.',
+				),
+				status=403,
+			)  # Forbidden
+
+		ws = web.WebSocketResponse(
+			heartbeat=30.0,
+			max_msg_size=self._client_max_size,
+		)
+		await ws.prepare(request)
+		self._websockets.add(ws)
+		tasks: Set[asyncio.Task] = set()
+
+		async def _process_frame(
+			raw_data: Union[
+				str,
+				bytes,
+			],
+		):
+			body = await self._handle_message(
+				raw_data,
+				window_id,
+			)
+			if body is not None and not ws.closed:
+				await ws.send_str(body)
+
+		try:
+			async for msg in ws:
+				if msg.type in (
+					WSMsgType.TEXT,
+					WSMsgType.BINARY,
+				):
+					task = asyncio.ensure_future(_process_frame(msg.data))
+					tasks.add(task)
+					task.add_done_callback(tasks.discard)
+				elif msg.type == WSMsgType.ERROR:
+					log.warning(f'RPC WebSocket closed with exception: {ws.exception()}')
+		finally:
+			# Calls still running belong to a closed connection
+			for task in tasks:
+				task.cancel()
+			self._websockets.discard(ws)
+
+		return ws
+
+	async def _handle_message(
+		self,
+		raw_data: Union[
+			str,
+			bytes,
+		],
+		window_id: str,
+	) -> Optional[str]:
+		"""
+		Handles one message of a persistent transport (WebSocket or QWebChannel).
+
+		The message holds a request object or a batch array for an already
+		identified window. Errors are reported as JSON-RPC error responses.
+
+		Parameters
+		----------
+		raw_data : Union[str, bytes]
+		    The encoded message.
+		window_id : str
+		    The window the transport belongs to.
+
+		Returns
+		-------
+		Optional[str]
+		    The encoded response, or None if there is nothing to respond with.
+		"""
+		request_id = None
+		try:
+			parse_start = time.perf_counter()
+			try:
+				data = self._codec.decode(raw_data)
+			except CodecError:
+				parse_time = None
+				response_data = self._error_response(
+					-32700,
+					'Parse error: Invalid JSON format.',
+				)
+			else:
+				parse_time = time.perf_counter() - parse_start
+				if isinstance(
+					data,
+					list,
+				):
+					(
+						_,
+						response_data,
+					) = await self._dispatch_batch(
+						data,
+						window_id,
+					)
+				else:
+					if isinstance(
+						data,
+						dict,
+					):
+						request_id = data.get('id')
+					(
+						_,
+						response_data,
+					) = await self._dispatch(
+						data,
+						window_id,
+					)
+			serialize_time = None
+			body = None
+			if response_data is not None:
+				serialize_start = time.perf_counter()
+				try:
+					body = self._encode_response(
+						response_data,
+						self._codec,
+					).decode('utf-8')
+				except (
+					TypeError,
+					ValueError,
+					OverflowError,
+				) as e:
+					body = self._codec.encode(
+						self._encoding_error(
+							e,
+							response_data,
+							self._codec,
+						)
+					).decode('utf-8')
+				serialize_time = time.perf_counter() - serialize_start
+			if parse_time is not None:
+				self._record_transport(
+					data,
+					parse_time,
+					len(raw_data),
+					serialize_time,
+					len(body) if body is not None else None,
+				)
+			return body
+		except asyncio.CancelledError:
+			raise
+		except Exception:
+			log.exception('Fatal error in RPC message handler:')
+			return self._codec.encode(
+				self._error_response(
+					-32603,
+					'Internal error',
+					request_id,
+				)
+			).decode('utf-8')
+
+	def post_message(
+		self,
+		message: Union[
+			str,
+			bytes,
+		],
+		window_id: str,
+		reply: Callable[
+			[str],
+			None,
+		],
+	) -> bool:
+		"""
+		Handles a JSON-RPC message sent from another thread.
+
+		This is the entry point of the QWebChannel transport, called on the Qt
+		main thread. The message is handled on the server's event loop like a
+		WebSocket frame, and `reply` is called on that loop with the encoded
+		response, unless the message holds only notifications.
+
+		Parameters
+		----------
+		message : Union[str, bytes]
+		    A request object or a batch array.
+		window_id : str
+		    The window the message comes from.
+		reply : Callable[[str], None]
+		    Receives the encoded response.
+
+		Returns
+		-------
+		bool
+		    False if the server is not running in this process (not started yet,
+		    or running in `workers`); `reply` is then called at once with a
+		    -32603 error.
+		"""
+		loop = self._loop
+		if loop is None or loop.is_closed():
+			try:
+				data = self._codec.decode(message)
+			except CodecError:
+				data = None
+			reply(
+				self._codec.encode(
+					self._error_response(
+						-32603,
+						'RPC server is not running in this process.',
+						data.get('id')
+						if isinstance(
+							data,
+							dict,
+						)
+						else None,
+					)
+				).decode('utf-8')
+			)
+			return False
+
+		async def _handle():
+			body = await self._handle_message(
+				message,
+				window_id,
+			)
+			if body is not None:
+				reply(body)
+
+		asyncio.run_coroutine_threadsafe(
+			_handle(),
+			loop,
+		)
+		return True
+
+	async def _handle_metrics(
+		self,
+		request: web.Request,
+	) -> web.Response:
+		"""Serves `metrics` in the Prometheus text exposition format."""
+		return web.Response(
+			text=self.metrics.to_prometheus(),
+			content_type='text/plain',
+			headers={'X-Content-Type-Options': 'nosniff'},
+		)
+
+	async def _close_websockets(
+		self,
+		app: web.Application,
+	):
+		"""Closes open WebSocket connections when the server shuts down."""
+		for ws in list(self._websockets):
+			await ws.close(
+				code=WSCloseCode.GOING_AWAY,
+				message=b'Server shutdown',
+			)
+
+	async def _dispatch_batch(
+		self,
+		batch: List[Any],
+		window_id: Optional[str] = None,
+	) -> Tuple[
+		int,
+		Optional[Any],
+	]:
+		"""
+		Handles a JSON-RPC 2.0 batch request.
+
+		Every entry goes through `_dispatch`, and entries run concurrently on the
+		event loop, at most `batch_concurrency` at a time. The responses are
+		returned as one array in request order. Notifications contribute no
+		entry, and a batch made only of notifications has no response.
+
+		Parameters
+		----------
+		batch : List[Any]
+		    The parsed batch array.
+		window_id : Optional[str], optional
+		    The window ID sent with the request, if any.
+
+		Returns
+		-------
+		Tuple[int, Optional[Any]]
+		    The HTTP status and the array of response objects, a single error
+		    object if the batch itself is invalid, or None if there is nothing
+		    to respond with.
+		"""
+		if not batch:
+			return (
+				400,
+				self._error_response(
+					-32600,
+					'Invalid Request: Batch must not be empty.',
+				),
+			)
+		if len(batch) > self._max_batch_size:
+			return (
+				400,
+				self._error_response(
+					-32600,
+					f'Invalid Request: Batch exceeds the maximum size of {self._max_batch_size}.',
+				),
+			)
+
+		semaphore = asyncio.Semaphore(self._batch_concurrency)
+
+		async def _run_entry(
+			entry: Any,
+		) -> Optional[
+			Dict[
+				str,
+				Any,
+			]
+		]:
+			async with semaphore:
+				(
+					_,
+					response_data,
+				) = await self._dispatch(
+					entry,
+					window_id,
+				)
+				return response_data
+
+		results = await asyncio.gather(*(_run_entry(entry) for entry in batch))
+		responses = [response_data for response_data in results if response_data is not None]
+		for response_data in responses:
+			# Batches are encoded as a whole, so cached results are encoded again
+			# and binary results are sent as JSON
+			if isinstance(
+				response_data.get('result'),
+				CacheEntry,
+			):
+				response_data['result'] = response_data['result'].value
+			elif isinstance(
+				response_data.get('result'),
+				EncodedResult,
+			):
+				response_data['result'] = response_data['result'].to_json()
+		if not responses:
+			return (
+				204,
+				None,
+			)
+		return (
+			200,
+			responses,
+		)
+
+	async def _dispatch(
+		self,
+		data: Any,
+		window_id: Optional[str] = None,
+		allow_stream: bool = False,
+		upload: Optional[RPCUpload] = None,
+	) -> Tuple[
+		int,
+		Optional[
+			Dict[
+				str,
+				Any,
+			]
+		],
+	]:
+		"""
+		Validates and executes a single JSON-RPC request object.
+
+		This is the transport independent part of request handling, shared by
+		single and batch requests. See `_process_request` for the parameters.
+		The call and its error code, if any, are counted in `metrics`.
+		"""
+		if self.metrics is None:
+			return await self._process_request(
+				data,
+				window_id,
+				allow_stream,
+				upload,
+			)
+		(
+			status,
+			response_data,
+		) = await self._process_request(
+			data,
+			window_id,
+			allow_stream,
+			upload,
+		)
+		error = response_data.get('error') if response_data is not None else None
+		self.metrics.record_call(
+			self._metrics_label(data),
+			error['code'] if error else None,
+		)
+		return (
+			status,
+			response_data,
+		)
+
+	def _metrics_label(
+		self,
+		data: Any,
+	) -> str:
+		"""Return the method name to record metrics of a request under."""
+		method_name = (
+			data.get('method')
+			if isinstance(
+				data,
+				dict,
+			)
+			else None
+		)
+		if not isinstance(
+			method_name,
+			str,
+		):
+			return '(invalid)'
+		if method_name in self._plans or method_name == '$/cancelRequest':
+			return method_name
+		return '(unknown)'
+
+	async def _process_request(
+		self,
+		data: Any,
+		window_id: Optional[str] = None,
+		allow_stream: bool = False,
+		upload: Optional[RPCUpload] = None,
+	) -> Tuple[
+		int,
+		Optional[
+			Dict[
+				str,
+				Any,
+			]
+		],
+	]:
+		"""
+		Validates and executes a single JSON-RPC request object.
+
+		This is the transport independent part of request handling, shared by
+		single and batch requests.
+
+		Parameters
+		----------
+		data : Any
+		    The parsed request object.
+		window_id : Optional[str], optional
+		    The ID of the calling window. If None, the request `id` is used.
+		allow_stream : bool, optional
+		    Whether the transport can stream results of async generator methods.
+		    If True, the `result` of such a call is an unconsumed `_RPCStream`.
+		    Default is False.
+		upload : Optional[RPCUpload], optional
+		    The file sent to an upload method through `_handle_upload`. Upload
+		    methods cannot be called without one. Default is None.
+
+		Returns
+		-------
+		Tuple[int, Optional[Dict[str, Any]]]
+		    The HTTP status that fits the outcome and the JSON-RPC response
+		    object, or None when the request is a notification.
+		"""
+		dispatch_start = time.perf_counter()
+
+		# Attempt to extract the ID if possible, even for invalid requests
+		request_id = (
+			data.get('id')
+			if isinstance(
+				data,
+				dict,
+			)
+			else None
+		)
+
+		# Validate JSON-RPC Structure
+		validation_error = self._validate_jsonrpc_request(data)
+		if validation_error:
+			# Use extracted ID if available, otherwise it remains None
+			return (
+				400,
+				{
+					'jsonrpc': '2.0',
+					'error': validation_error,
+					'id': request_id,
+				},
+			)  # Bad Request
+
+		# Notifications (id=null or absent) don't get responses
+		is_notification = request_id is None
+
+		# Assuming validation passed, data is a dict with 'method'
+		method_name: str = data['method']
+		# Use empty list/dict if 'params' is omitted, as per spec flexibility
+		params: Union[
+			List,
+			Dict,
+		] = data.get(
+			'params',
+			[],
+		)
+
+		if method_name == '$/cancelRequest':
+			return self._handle_cancel_request(
+				params,
+				window_id,
+				request_id,
+			)
+
+		# Find and Call Method
+		plan = self._plans.get(method_name)
+		if plan is None:
+			if is_notification:
+				return (
+					204,
+					None,
+				)
+			return (
+				404,
+				self._error_response(
+					-32601,
+					'Method not found.',
+					request_id,
+				),
+			)  # Not Found
+
+		try:
+			log.debug(f'Executing RPC method: {method_name}(params={params})')
+
+			# Calls can only be cancelled by clients that name their window, since the
+			# window ID fallback below is shared by all calls of older clients
+			cancel_key = (
+				(
+					window_id,
+					request_id,
+				)
+				if window_id is not None and not is_notification
+				else None
+			)
+
+			# Validate window_id for all RPC requests (security enhancement)
+			if window_id is None:
+				window_id = request_id
+			window = await self._get_window(window_id)
+			if not window:
+				if is_notification:
+					return (
+						204,
+						None,
+					)
+				return (
+					400,
+					self._error_response(
+						-32600,
+						'Invalid window ID.',
+						request_id,
+					),
+				)  # Bad Request
+
+			if (plan.upload is None) != (upload is None):
+				if is_notification:
+					return (
+						204,
+						None,
+					)
+				return (
+					400,
+					self._error_response(
+						-32600,
+						f"Invalid Request: '{method_name}' takes an upload and must be called "
+						f'through {self._upload_path}.'
+						if upload is None
+						else f"Invalid Request: '{method_name}' does not take an upload.",
+						request_id,
+					),
+				)  # Bad Request
+
+			if plan.is_stream and not allow_stream and not is_notification:
+				return (
+					400,
+					self._error_response(
+						-32600,
+						f"Invalid Request: '{method_name}' streams its result and must be "
+						'called with a single HTTP request.',
+						request_id,
+					),
+				)  # Bad Request
+
+			# Bind params using the precompiled plan
+			try:
+				(
+					args,
+					kwargs,
+				) = plan.bind(
+					params,
+					RPCContext(
+						pyloid=self.pyloid,
+						window=window,
+					)
+					if plan.has_ctx
+					else None,
+				)
+			except RPCError as e:
+				if is_notification:
+					return (
+						204,
+						None,
+					)
+				return (
+					400,
+					{
+						'jsonrpc': '2.0',
+						'error': e.to_dict(),
+						'id': request_id,
+					},
+				)  # Bad Request
+			if upload is not None:
+				if upload._spool_path is not None and upload.path is None:
+					# 'file' mode: the upload is received only once the call is known to be valid
+					await upload._spool()
+				kwargs[plan.upload] = upload
+
+			if plan.is_stream:
+				# Wait for a slot under the method and window concurrency limits
+				release = await self._acquire_slots(
+					plan,
+					window_id,
+				)
+				if self.metrics is not None:
+					self.metrics.observe(
+						method_name,
+						'dispatch',
+						time.perf_counter() - dispatch_start,
+					)
+				try:
+					# The stream is consumed by the transport, see _stream_response,
+					# and gives its slots back when it ends
+					result = _RPCStream(
+						plan.func(
+							*args,
+							**kwargs,
+						),
+						release,
+					)
+					release = None
+					if is_notification:
+						try:
+							async for _ in result:
+								pass
+						finally:
+							await result.aclose()
+				finally:
+					if release is not None:
+						release()
+			else:
+				call = partial(
+					self._execute,
+					plan,
+					args,
+					kwargs,
+					window_id,
+					cancel_key,
+					dispatch_start,
+				)
+				call_key = (
+					plan.call_key(
+						args,
+						kwargs,
+					)
+					if plan.coalesce is not None or plan.cache is not None or plan.patch is not None
+					else None
+				)
+				if plan.cache is None:
+					result = await self._run_maybe_coalesced(
+						plan,
+						window_id,
+						call_key,
+						call,
+					)
+				else:
+					# A cached result is answered with its serialized bytes, see _encode_response
+					cache_key = (
+						window_id if plan.cache_scope == 'window' else None,
+						call_key,
+					)
+					result = plan.cache.get(cache_key)
+					if result is None:
+						generation = plan.cache.generation
+						value = await self._run_maybe_coalesced(
+							plan,
+							window_id,
+							call_key,
+							call,
+						)
+						result = plan.cache.put(
+							cache_key,
+							value,
+							plan.cache_tags(
+								plan.named_args(
+									args,
+									kwargs,
+								)
+							)
+							if plan.cache_tags is not None
+							else (),
+							generation,
+						)
+
+			# Format Success Response (only for non-notification requests)
+			if is_notification:
+				return (
+					204,
+					None,
+				)
+			if plan.patch is not None:
+				result = plan.patch.update(
+					(
+						window_id,
+						call_key,
+					),
+					result.value
+					if isinstance(
+						result,
+						CacheEntry,
+					)
+					else result,
+					data.get('base_version'),
+				)
+			elif plan.encoder is not None:
+				# Encoded once the response format is known, see _respond
+				result = EncodedResult(
+					plan.encoder,
+					result.value
+					if isinstance(
+						result,
+						CacheEntry,
+					)
+					else result,
+				)
+			return (
+				200,
+				{
+					'jsonrpc': '2.0',
+					'result': result,
+					'id': request_id,
+				},
+			)
+
+		except _ServerBusy as e:
+			log.debug(str(e))
+			if is_notification:
+				return (
+					204,
+					None,
+				)
+			return (
+				503,
+				{
+					'jsonrpc': '2.0',
+					'error': e.to_dict(),
+					'id': request_id,
+				},
+			)  # Service Unavailable
+
+		except Exception as e:
+			if is_notification:
+				self._execution_error(
+					e,
+					method_name,
+				)
+				return (
+					204,
+					None,
+				)  # No response for notification errors
+			# Sticking to 500 for server-side execution errors.
+			if isinstance(
+				e,
+				_RequestTimeout,
+			):
+				status = 504
+			elif isinstance(
+				e,
+				_UploadTooLarge,
+			):
+				status = 413
+			else:
+				status = 500
+			return (
+				status,
+				self._execution_error(
+					e,
+					method_name,
+					request_id,
+				),
+			)
+
+	async def _execute(
+		self,
+		plan: _MethodPlan,
+		args: tuple,
+		kwargs: Dict[
+			str,
+			Any,
+		],
+		window_id: Any,
+		key: Optional[
+			Tuple[
+				Any,
+				Any,
+			]
+		],
+		dispatch_start: float,
+	) -> Any:
+		"""
+		Run a non-streaming call under the concurrency limits.
+
+		Parameters
+		----------
+		plan : _MethodPlan
+		    The dispatch plan of the method.
+		args : tuple
+		    Positional arguments for the call.
+		kwargs : Dict[str, Any]
+		    Keyword arguments for the call.
+		window_id : Any
+		    The ID of the calling window.
+		key : Optional[Tuple[Any, Any]]
+		    The (window ID, request id) of the call, see `_run_call`.
+		dispatch_start : float
+		    The `time.perf_counter()` value at which dispatching started.
+
+		Returns
+		-------
+		Any
+		    The return value of the method.
+
+		Raises
+		------
+		_ServerBusy
+		    If a concurrency limit is reached and its wait queue is full.
+		"""
+		# Wait for a slot under the method and window concurrency limits
+		release = await self._acquire_slots(
+			plan,
+			window_id,
+		)
+		if self.metrics is not None:
+			self.metrics.observe(
+				plan.name,
+				'dispatch',
+				time.perf_counter() - dispatch_start,
+			)
+		try:
+			return await self._run_call(
+				plan,
+				args,
+				kwargs,
+				key,
+			)
+		finally:
+			if release is not None:
+				release()
+
+	async def _run_maybe_coalesced(
+		self,
+		plan: _MethodPlan,
+		window_id: Any,
+		call_key: Optional[str],
+		call: Callable[
+			[],
+			Coroutine[
+				Any,
+				Any,
+				Any,
+			],
+		],
+	) -> Any:
+		"""Run a call, sharing it with identical calls if the method coalesces."""
+		if plan.coalesce is None:
+			return await call()
+		return await self._run_coalesced(
+			plan,
+			(
+				plan.name,
+				window_id if plan.coalesce == 'window' else None,
+				call_key,
+			),
+			call,
+		)
+
+	async def _run_coalesced(
+		self,
+		plan: _MethodPlan,
+		flight_key: Tuple[
+			str,
+			Any,
+			str,
+		],
+		call: Callable[
+			[],
+			Coroutine[
+				Any,
+				Any,
+				Any,
+			],
+		],
+	) -> Any:
+		"""
+		Share one execution between concurrent identical calls.
+
+		The first call with a key runs `call`; calls with the same key that
+		arrive while it runs wait for its outcome instead of running the method
+		again, and do not take concurrency slots. If the running call is
+		cancelled by its own client, a waiting call takes over and runs the
+		method itself.
+
+		Parameters
+		----------
+		plan : _MethodPlan
+		    The dispatch plan of the method, which holds the hit/miss counters.
+		flight_key : Tuple[str, Any, str]
+		    The method name, the window ID (None when shared across windows) and
+		    the canonical params of the call.
+		call : Callable[[], Coroutine[Any, Any, Any]]
+		    Runs the method.
+
+		Returns
+		-------
+		Any
+		    The return value of the method.
+		"""
+		while True:
+			flight = self._flights.get(flight_key)
+			if flight is None:
+				break
+			try:
+				result = await asyncio.shield(flight)
+			except _FlightAborted:
+				continue
+			except Exception:
+				plan.coalesce_hits += 1
+				raise
+			plan.coalesce_hits += 1
+			return result
+
+		plan.coalesce_misses += 1
+		flight = asyncio.get_running_loop().create_future()
+		self._flights[flight_key] = flight
+		try:
+			result = await call()
+		except (
+			asyncio.CancelledError,
+			_RequestCancelled,
+		):
+			# Only this caller gave up; let a waiting call run the method
+			flight.set_exception(_FlightAborted())
+			flight.exception()
+			raise
+		except Exception as e:
+			flight.set_exception(e)
+			flight.exception()
+			raise
+		else:
+			flight.set_result(result)
+			return result
+		finally:
+			if self._flights.get(flight_key) is flight:
+				del self._flights[flight_key]
+
+	def coalesce_stats(
+		self,
+	) -> Dict[
+		str,
+		Dict[
+			str,
+			Any,
+		],
+	]:
+		"""
+		Report how often calls of coalescing methods shared an execution.
+
+		With `workers`, the counters are those of the current worker process.
+
+		Returns
+		-------
+		Dict[str, Dict[str, Any]]
+		    Per coalescing method: `scope`, `hits` (calls served by a running
+		    execution), `misses` (calls that ran the method), `hit_rate` and
+		    `in_flight` (executions currently shared).
+
+		Examples
+		--------
+		```python
+		stats = rpc.coalesce_stats()
+		print(stats['load_dashboard']['hit_rate'])
+		```
+		"""
+		in_flight: Dict[
+			str,
+			int,
+		] = {}
+		for method_name, _, _ in self._flights:
+			in_flight[method_name] = in_flight.get(method_name, 0) + 1
+		stats = {}
+		for name, plan in self._plans.items():
+			if plan.coalesce is None:
+				continue
+			total = plan.coalesce_hits + plan.coalesce_misses
+			stats[name] = {
+				'scope': plan.coalesce,
+				'hits': plan.coalesce_hits,
+				'misses': plan.coalesce_misses,
+				'hit_rate': plan.coalesce_hits / total if total else 0.0,
+				'in_flight': in_flight.get(name, 0),
+			}
+		return stats
+
+	def invalidate(
+		self,
+		method: str,
+		params: Optional[
+			Union[
+				List,
+				Dict,
+			]
+		] = None,
+		window_id: Optional[str] = None,
+	) -> int:
+		"""
+		Remove cached results of a method.
+
+		Must be called from the RPC event loop, for example from another RPC
+		method that changes the cached data.
+
+		Parameters
+		----------
+		method : str
+		    The name of a method registered with `cache=True`.
+		params : Optional[Union[List, Dict]], optional
+		    Only remove the result of the call with these params, given as in a
+		    request. If None, all results of the method are removed. Default is None.
+		window_id : Optional[str], optional
+		    For a method with `cache_scope='window'`, only remove results of this
+		    window. If None, the results of all windows are removed. Default is None.
+
+		Returns
+		-------
+		int
+		    The number of removed results.
+
+		Raises
+		------
+		ValueError
+		    If the method is not cached or the params do not match its signature.
+
+		Examples
+		--------
+		```python
+		@rpc.method()
+		async def rename_user(
+		    user_id: int,
+		    name: str,
+		):
+		    await save_name(user_id, name)
+		    rpc.invalidate('get_profile', {'user_id': user_id})
+		```
+		"""
+		plan = self._plans.get(method)
+		if plan is None or plan.cache is None:
+			raise ValueError(f"RPC function '{method}' is not cached.")
+		if params is None:
+			if window_id is None:
+				return plan.cache.invalidate()
+			return plan.cache.invalidate(lambda key: key[0] in (window_id, None))
+		try:
+			(
+				args,
+				kwargs,
+			) = plan.bind(params)
+		except RPCError as e:
+			raise ValueError(str(e)) from e
+		call_key = plan.call_key(
+			args,
+			kwargs,
+		)
+		return plan.cache.invalidate(
+			lambda key: key[1] == call_key and (window_id is None or key[0] in (window_id, None))
+		)
+
+	def invalidate_tags(
+		self,
+		*tags: str,
+	) -> int:
+		"""
+		Remove the cached results carrying any of the tags, in all methods.
+
+		Must be called from the RPC event loop.
+
+		Parameters
+		----------
+		*tags : str
+		    The tags to invalidate, see the `cache_tags` option of `method`.
+
+		Returns
+		-------
+		int
+		    The number of removed results.
+		"""
+		return sum(
+			plan.cache.invalidate_tags(tags)
+			for plan in self._plans.values()
+			if plan.cache is not None
+		)
+
+	def cache_stats(
+		self,
+	) -> Dict[
+		str,
+		Dict[
+			str,
+			Any,
+		],
+	]:
+		"""
+		Report the result caches of the cached methods.
+
+		Returns
+		-------
+		Dict[str, Dict[str, Any]]
+		    Per cached method: `scope`, `size`, `maxsize`, `ttl`, `hits`, `misses`,
+		    `hit_rate`, `evictions`, `expirations` and `invalidations`.
+
+		Examples
+		--------
+		```python
+		stats = rpc.cache_stats()
+		print(stats['get_profile']['hit_rate'])
+		```
+		"""
+		return {
+			name: {
+				'scope': plan.cache_scope,
+				**plan.cache.stats(),
+			}
+			for name, plan in self._plans.items()
+			if plan.cache is not None
+		}
+
+	def patch_stats(
+		self,
+	) -> Dict[
+		str,
+		Dict[
+			str,
+			Any,
+		],
+	]:
+		"""
+		Report the patch trackers of the methods registered with `patch=True`.
+
+		Returns
+		-------
+		Dict[str, Dict[str, Any]]
+		    Per method: `size`, `maxsize`, `patches` (responses sent as a patch),
+		    `documents` (responses sent in full) and `patch_rate`.
+		"""
+		return {
+			name: plan.patch.stats() for name, plan in self._plans.items() if plan.patch is not None
+		}
+
+	def forget_patches(
+		self,
+		window_id: Optional[str] = None,
+	) -> int:
+		"""
+		Forget the documents remembered for patch responses.
+
+		Call it when a window is closed, so its documents do not take memory
+		until they are evicted. Must be called from the RPC event loop.
+
+		Parameters
+		----------
+		window_id : Optional[str], optional
+		    Only forget the documents sent to this window. If None, all are
+		    forgotten, and every client gets the full document next time.
+
+		Returns
+		-------
+		int
+		    The number of forgotten documents.
+		"""
+		return sum(
+			plan.patch.forget(window_id) for plan in self._plans.values() if plan.patch is not None
+		)
+
+	def serve_static(
+		self,
+		directory: str,
+		compression: Optional[
+			Union[
+				bool,
+				Compressor,
+			]
+		] = None,
+	) -> str:
+		"""
+		Serve a frontend build from this server, next to the RPC endpoints.
+
+		Mounts a `ZeroCopyStaticHandler` for every GET path not taken by the
+		RPC routes, so one app, one event loop and one port serve both the
+		assets and the RPC, instead of a separate `pyloid_serve` server. Pages
+		loaded from it call the RPC on the same origin, which needs no CORS
+		preflight. Must be called before the server starts.
+
+		Parameters
+		----------
+		directory : str
+		    The directory to serve, e.g. the frontend build output.
+		compression : Optional[Union[bool, Compressor]], optional
+		    Compression of text assets, see `ZeroCopyStaticHandler`. If None, the
+		    `compression` setting of the server is used. Default is None.
+
+		Returns
+		-------
+		str
+		    The URL of the frontend (the server origin).
+
+		Raises
+		------
+		RuntimeError
+		    If the server has no TCP listener (`tcp=False`).
+
+		Examples
+		--------
+		```python
+		rpc = PyloidRPC()
+		url = rpc.serve_static('dist')
+
+		app = Pyloid(
+		    'Pyloid-App',
+		    server=rpc,
+		)
+		window = app.create_window('Pyloid-App')
+		window.load_url(url)
+		window.show_and_focus()
+		```
+
+		```javascript
+		// same origin: a relative URL is enough
+		const response = await fetch('/rpc', { method: 'POST', body: JSON.stringify(request) });
+		```
+		"""
+		if self._port is None:
+			raise RuntimeError('Serving static files needs the TCP listener (tcp=True).')
+		handler = ZeroCopyStaticHandler(
+			directory,
+			self._compressor if compression is None else compression,
+		)
+		# Registered last, so the RPC routes take precedence
+		self._app.router.add_get(
+			'/{path:.*}',
+			handler.handle_request,
+		)
+		self.static_url = f'http://{self._host}:{self._port}'
+		return self.static_url
+
+	def _set_port(
+		self,
+		port: Optional[int],
+	):
+		"""
+		Set the TCP port and rebuild the URLs derived from it.
+
+		Parameters
+		----------
+		port : Optional[int]
+		    The port to listen on, or None without the TCP listener.
+		"""
+		self._port = port
+		tcp = port is not None
+		self.url = f'http://{self._host}:{port}{self._rpc_path}' if tcp else None
+		self.ws_url = f'ws://{self._host}:{port}{self._ws_path}' if tcp else None
+		self.upload_url = f'http://{self._host}:{port}{self._upload_path}' if tcp else None
+		self.get_url = f'http://{self._host}:{port}{self._get_path}' if tcp else None
+		self._file_share.base_url = f'http://{self._host}:{port}{self._files_path}' if tcp else None
+		if self.static_url is not None:
+			self.static_url = f'http://{self._host}:{port}' if tcp else None
+
+	def share_file(
+		self,
+		path: str,
+		ttl: Optional[float] = None,
+		content_type: Optional[str] = None,
+	) -> str:
+		"""
+		Make a local file readable by the frontend through a short-lived URL.
+
+		The URL carries a random token that is the only credential needed, so it
+		can be used directly as the `src` of `<video>`/`<img>` elements or with
+		`fetch()`. The file is streamed with sendfile and supports Range and
+		conditional requests, so large files never pass through the RPC body.
+
+		Parameters
+		----------
+		path : str
+		    The local file to share.
+		ttl : Optional[float], optional
+		    Seconds the URL stays valid after its last request. Default is 300.
+		content_type : Optional[str], optional
+		    The media type to send. If None, it is guessed from the file name.
+
+		Returns
+		-------
+		str
+		    The URL of the file.
+
+		Raises
+		------
+		FileNotFoundError
+		    If the path is not an existing file.
+		RuntimeError
+		    If the server has no TCP listener (`tcp=False`), or runs in several
+		    worker processes: a URL is only served by the process that shared the
+		    file, and other workers would answer it with 404. With a single
+		    worker, share files from RPC methods, which run in the worker.
+
+		Examples
+		--------
+		```python
+		@rpc.method()
+		async def open_video(ctx: RPCContext):
+		    path = ctx.pyloid.open_file_dialog(filter='Videos (*.mp4 *.webm)')
+		    if path is None:
+		        return None
+		    return rpc.share_file(path)
+		```
+
+		```javascript
+		const url = await rpc.call('open_video');
+		document.querySelector('video').src = url;
+		```
+		"""
+		if self._file_share.base_url is None:
+			raise RuntimeError('Shared files need the TCP listener (tcp=True).')
+		if self.workers:
+			raise RuntimeError(
+				'The application process does not serve shared files when the RPC server '
+				'runs in worker processes; with a single worker, share files from RPC methods.'
+			)
+		if self._reuse_port:
+			raise RuntimeError(
+				'Shared files are not available with several RPC workers: only the worker '
+				'that shared a file could serve its URL.'
+			)
+		return self._file_share.url(
+			self._file_share.share(
+				path,
+				ttl,
+				content_type,
+			)
+		)
+
+	def revoke_file(
+		self,
+		url: str,
+	) -> bool:
+		"""
+		Invalidate a URL returned by `share_file` before it expires.
+
+		Parameters
+		----------
+		url : str
+		    The URL, or just its token.
+
+		Returns
+		-------
+		bool
+		    True if the URL was still valid.
+		"""
+		return self._file_share.revoke(url.rsplit('/', 1)[-1])
+
+	async def _run_call(
+		self,
+		plan: _MethodPlan,
+		args: tuple,
+		kwargs: Dict[
+			str,
+			Any,
+		],
+		key: Optional[
+			Tuple[
+				Any,
+				Any,
+			]
+		] = None,
+	) -> Any:
+		"""
+		Run a non-streaming call, as a cancellable task if needed.
+
+		With a `key`, the task is registered under it so that `cancel` can stop
+		it. With a method timeout, it is cancelled when the timeout expires.
+		Without either, the call is awaited directly and no task is created.
+
+		Parameters
+		----------
+		plan : _MethodPlan
+		    The dispatch plan of the method.
+		args : tuple
+		    Positional arguments for the call.
+		kwargs : Dict[str, Any]
+		    Keyword arguments for the call.
+		key : Optional[Tuple[Any, Any]], optional
+		    The (window ID, request id) of the call. None if the call cannot be
+		    cancelled: notifications, and calls without an explicit window ID.
+
+		Returns
+		-------
+		Any
+		    The return value of the method.
+
+		Raises
+		------
+		_RequestTimeout
+		    If the call exceeds the method timeout.
+		_RequestCancelled
+		    If the call is cancelled with `cancel`.
+		"""
+		if plan.executor is not None:
+			coro = self._run_in_executor(
+				plan,
+				args,
+				kwargs,
+			)
+		else:
+			coro = plan.func(
+				*args,
+				**kwargs,
+			)
+		if self.metrics is not None:
+			coro = self._timed(
+				plan.name,
+				coro,
+			)
+		if key is None and plan.timeout is None:
+			return await coro
+
+		call = asyncio.ensure_future(coro)
+		if key is not None:
+			self._running.setdefault(
+				key,
+				[],
+			).append(call)
+		try:
+			if plan.timeout is None:
+				return await call
+			return await asyncio.wait_for(
+				call,
+				plan.timeout,
+			)
+		except asyncio.TimeoutError:
+			if call.cancelled():
+				raise _RequestTimeout(
+					plan.name,
+					plan.timeout,
+				) from None
+			raise
+		except asyncio.CancelledError:
+			if key is not None and key in self._cancel_requested:
+				raise _RequestCancelled() from None
+			raise
+		finally:
+			if key is not None:
+				calls = self._running[key]
+				calls.remove(call)
+				if not calls:
+					del self._running[key]
+					self._cancel_requested.discard(key)
+
+	async def _timed(
+		self,
+		method_name: str,
+		coro: Coroutine[
+			Any,
+			Any,
+			Any,
+		],
+	) -> Any:
+		"""Await a call and record its duration as the 'execute' phase."""
+		start = time.perf_counter()
+		try:
+			return await coro
+		finally:
+			self.metrics.observe(
+				method_name,
+				'execute',
+				time.perf_counter() - start,
+			)
+
+	def cancel(
+		self,
+		window_id: str,
+		request_id: Any,
+	) -> bool:
+		"""
+		Cancel a running call.
+
+		Must be called from the RPC event loop. The cancelled call is answered
+		with JSON-RPC error -32800 (request cancelled). If the window has several
+		running calls with the same request id, the cancellation is ambiguous and
+		none of them is cancelled. With `workers`, only the calls running in the
+		current worker process can be found.
+
+		Parameters
+		----------
+		window_id : str
+		    The ID of the window that made the call.
+		request_id : Any
+		    The JSON-RPC id of the call.
+
+		Returns
+		-------
+		bool
+		    True if a running call was found and cancelled, False otherwise.
+		"""
+		key = (
+			window_id,
+			request_id,
+		)
+		calls = self._running.get(key)
+		if not calls:
+			return False
+		if len(calls) > 1:
+			log.warning(
+				f'Not cancelling request {request_id!r} of window {window_id!r}: '
+				f'{len(calls)} running calls use this id.'
+			)
+			return False
+		(call,) = calls
+		if call.done():
+			return False
+		self._cancel_requested.add(key)
+		call.cancel()
+		return True
+
+	def _handle_cancel_request(
+		self,
+		params: Union[
+			List,
+			Dict,
+		],
+		window_id: Any,
+		request_id: Any = None,
+	) -> Tuple[
+		int,
+		Optional[
+			Dict[
+				str,
+				Any,
+			]
+		],
+	]:
+		"""
+		Handle the built-in `$/cancelRequest` method.
+
+		Parameters
+		----------
+		params : Union[List, Dict]
+		    `{"id": <request id>}` or `[<request id>]`.
+		window_id : Any
+		    The ID of the calling window; only its own calls can be cancelled.
+		    None if the client did not name its window, which is rejected.
+		request_id : Any, optional
+		    The id of the cancel request itself. None for a notification.
+
+		Returns
+		-------
+		Tuple[int, Optional[Dict[str, Any]]]
+		    The HTTP status and the response object (whether a call was
+		    cancelled), or None for a notification.
+		"""
+		if window_id is None:
+			if request_id is None:
+				return (
+					204,
+					None,
+				)
+			return (
+				400,
+				self._error_response(
+					-32600,
+					'Invalid Request: $/cancelRequest needs the X-Pyloid-Window-Id header.',
+					request_id,
+				),
+			)
+		if isinstance(
+			params,
+			dict,
+		):
+			target_id = params.get('id')
+		else:
+			target_id = params[0] if params else None
+		cancelled = target_id is not None and self.cancel(
+			window_id,
+			target_id,
+		)
+		if request_id is None:
+			return (
+				204,
+				None,
+			)
+		return (
+			200,
+			{
+				'jsonrpc': '2.0',
+				'result': cancelled,
+				'id': request_id,
+			},
+		)
+
+	def _execution_error(
+		self,
+		error: Exception,
+		method_name: str,
+		request_id: Any = None,
+	) -> Dict[
+		str,
+		Any,
+	]:
+		"""
+		Log an exception raised by an RPC method and build its error response.
+
+		Parameters
+		----------
+		error : Exception
+		    The exception raised during method execution.
+		method_name : str
+		    The name of the RPC method.
+		request_id : Any, optional
+		    The id of the failed request.
+
+		Returns
+		-------
+		Dict[str, Any]
+		    The JSON-RPC error response object.
+		"""
+		if isinstance(
+			error,
+			RPCError,
+		):
+			# Application-specific error during method execution
+			log.warning(
+				f"RPC execution error in method '{method_name}': {error}",
+				exc_info=False,
+			)
+			return {
+				'jsonrpc': '2.0',
+				'error': error.to_dict(),
+				'id': request_id,
+			}
+		# Unexpected error during method execution
+		log.error(
+			f"Unexpected error during execution of RPC method '{method_name}':",
+			exc_info=error,
+		)  # Log full traceback
+		# Minimize internal details exposed to the client
+		return self._error_response(
+			-32000,
+			f'Server error: {type(error).__name__}',
+			request_id,
+		)
+
+	async def _stream_response(
+		self,
+		request: web.Request,
+		method_name: str,
+		stream: _RPCStream,
+		request_id: Any = None,
+	) -> web.StreamResponse:
+		"""
+		Stream the items yielded by an async generator method.
+
+		Items are sent as NDJSON lines (`application/x-ndjson`), or as Server-Sent
+		Events (`text/event-stream`) when the client accepts them. Every item is
+		wrapped in a JSON-RPC response object carrying the request id. An error
+		raised before the first item produces a regular error response; a later
+		error is sent as a final error object (an `error` event for SSE).
+
+		Writes wait for the connection to drain, so a slow client slows the
+		generator down, and the generator is closed when the client disconnects.
+
+		Parameters
+		----------
+		request : web.Request
+		    The incoming aiohttp request object.
+		method_name : str
+		    The name of the RPC method, used for logging.
+		stream : _RPCStream
+		    The stream wrapping the async generator returned by the method.
+		request_id : Any, optional
+		    The id of the request.
+
+		Returns
+		-------
+		web.StreamResponse
+		    The streamed response.
+		"""
+		sse = 'text/event-stream' in request.headers.get(
+			'Accept',
+			'',
+		)
+		stream_start = time.perf_counter()
+
+		def _frame(
+			message: Dict[
+				str,
+				Any,
+			],
+		) -> bytes:
+			body = self._codec.encode(message)
+			if not sse:
+				return body + b'\n'
+			if 'error' in message:
+				return b'event: error\ndata: ' + body + b'\n\n'
+			return b'data: ' + body + b'\n\n'
+
+		try:
+			try:
+				# Errors raised before the first item get a regular error response
+				first = await stream.__anext__()
+			except StopAsyncIteration:
+				first = stream
+			except Exception as e:
+				return self._respond(
+					self._execution_error(
+						e,
+						method_name,
+						request_id,
+					),
+					status=500,
+				)
+
+			response = web.StreamResponse(
+				status=200,
+				headers={
+					'Content-Type': 'text/event-stream' if sse else 'application/x-ndjson',
+					'Cache-Control': 'no-cache',
+				},
+			)
+			await response.prepare(request)
+
+			if first is stream:
+				await response.write_eof()
+				return response
+
+			try:
+				await response.write(
+					_frame(
+						{
+							'jsonrpc': '2.0',
+							'result': first,
+							'id': request_id,
+						}
+					)
+				)
+				async for item in stream:
+					await response.write(
+						_frame(
+							{
+								'jsonrpc': '2.0',
+								'result': item,
+								'id': request_id,
+							}
+						)
+					)
+			except ConnectionResetError:
+				log.debug(f"Client disconnected while streaming RPC method '{method_name}'.")
+				return response
+			except Exception as e:
+				await response.write(
+					_frame(
+						self._execution_error(
+							e,
+							method_name,
+							request_id,
+						)
+					)
+				)
+
+			await response.write_eof()
+			return response
+		finally:
+			await stream.aclose()
+			if self.metrics is not None:
+				self.metrics.observe(
+					method_name,
+					'execute',
+					time.perf_counter() - stream_start,
+				)
+
+	async def _acquire_slots(
+		self,
+		plan: _MethodPlan,
+		window_id: str,
+	) -> Optional[Callable[[], None]]:
+		"""
+		Wait for a slot under the window and method concurrency limits.
+
+		Parameters
+		----------
+		plan : _MethodPlan
+		    The dispatch plan of the called method.
+		window_id : str
+		    The ID of the calling window.
+
+		Returns
+		-------
+		Optional[Callable[[], None]]
+		    A callable that gives the slots back, or None if no limit applies.
+
+		Raises
+		------
+		_ServerBusy
+		    If a limit is reached and its wait queue is full.
+		"""
+		limiters = []
+		if self._window_concurrency is not None:
+			window_limiter = self._window_limiters.get(window_id)
+			if window_limiter is None:
+				window_limiter = self._window_limiters[window_id] = _Limiter(
+					'window',
+					window_id,
+					self._window_concurrency,
+					self._window_queue,
+				)
+			limiters.append(window_limiter)
+		if plan.limiter is not None:
+			limiters.append(plan.limiter)
+		if not limiters:
+			return None
+
+		acquired = []
+		try:
+			for limiter in limiters:
+				await limiter.acquire()
+				acquired.append(limiter)
+		except BaseException:
+			for limiter in acquired:
+				limiter.release()
+			raise
+
+		def _release():
+			for limiter in acquired:
+				limiter.release()
+
+		return _release
+
+	def limiter_stats(
+		self,
+	) -> Dict[
+		str,
+		Dict[
+			str,
+			Dict[
+				str,
+				Any,
+			],
+		],
+	]:
+		"""
+		Report the state of the concurrency limits, including queue-time metrics.
+
+		Returns
+		-------
+		Dict[str, Dict[str, Dict[str, Any]]]
+		    `{'methods': {name: stats}, 'windows': {window_id: stats}}` where each
+		    stats dict holds `limit`, `max_queue`, `active`, `queued`, `admitted`,
+		    `rejected`, `queue_time_avg_ms` and `queue_time_max_ms`.
 
-		return decorator
+		Examples
+		--------
+		```python
+		stats = rpc.limiter_stats()
+		print(stats['methods']['search']['queue_time_max_ms'])
+		```
+		"""
+		return {
+			'methods': {
+				name: plan.limiter.stats()
+				for name, plan in self._plans.items()
+				if plan.limiter is not None
+			},
+			'windows': {
+				window_id: limiter.stats() for window_id, limiter in self._window_limiters.items()
+			},
+		}
 
-	def _validate_jsonrpc_request(
+	def _get_executor(
 		self,
-		data: Any,
-	) -> Optional[
-		Dict[
+		spec: Union[
 			str,
-			Any,
-		]
+			Executor,
+		],
+	) -> Tuple[
+		str,
+		Executor,
 	]:
 		"""
-		Validate the structure of a potential JSON-RPC request object.
+		Resolve an executor spec to its name and instance.
 
-		Checks for required fields ('jsonrpc', 'method') and validates the
-		types of fields like 'params' and 'id' according to the JSON-RPC 2.0 spec.
+		The shared thread and process pools are created on first use.
 
 		Parameters
 		----------
-		data : Any
-		    The parsed JSON data from the request body.
+		spec : Union[str, Executor]
+		    'thread', 'process' or an executor instance.
 
 		Returns
 		-------
-		Optional[Dict[str, Any]]
-		    None if the request is valid according to the basic structure,
-		    otherwise a dictionary representing the JSON-RPC error object
-		    to be returned to the client.
+		Tuple[str, Executor]
+		    The name the executor is reported under and the executor itself.
 		"""
-		# Attempt to extract the ID if possible, even for invalid requests
-		request_id = (
-			data.get('id')
-			if isinstance(
-				data,
-				dict,
+		if isinstance(
+			spec,
+			Executor,
+		):
+			key = f'{type(spec).__name__}@{id(spec):x}'
+			self._executors.setdefault(
+				key,
+				spec,
 			)
-			else None
+			return (
+				key,
+				spec,
+			)
+		executor = self._executors.get(spec)
+		if executor is None:
+			if spec == 'process':
+				executor = ProcessPoolExecutor(max_workers=self._process_workers)
+			else:
+				executor = ThreadPoolExecutor(
+					max_workers=self._thread_workers,
+					thread_name_prefix='pyloid-rpc',
+				)
+			self._executors[spec] = executor
+		return (
+			spec,
+			executor,
 		)
 
-		if not isinstance(
-			data,
-			dict,
-		):
-			return {
-				'code': -32600,
-				'message': 'Invalid Request: Request must be a JSON object.',
-			}
-		if data.get('jsonrpc') != '2.0':
-			return {
-				'code': -32600,
-				'message': "Invalid Request: 'jsonrpc' version must be '2.0'.",
-			}
-		if 'method' not in data or not isinstance(
-			data['method'],
-			str,
-		):
-			return {
-				'code': -32600,
-				'message': "Invalid Request: 'method' must be a string.",
-			}
-		if 'params' in data and not isinstance(
-			data['params'],
-			(
-				list,
-				dict,
-			),
-		):
-			# JSON-RPC 2.0: "params" must be array or object if present
-			return {
-				'code': -32602,
-				'message': "Invalid params: 'params' must be an array or object.",
-			}
-		# JSON-RPC 2.0: "id" is optional, but if present, must be string, number, or null.
-		# This validation is simplified here. A more robust check could be added.
-		# if "id" in data and not isinstance(data.get("id"), (str, int, float, type(None))):
-		#     return {"code": -32600, "message": "Invalid Request: 'id', if present, must be a string, number, or null."}
-		return None  # Request structure is valid
-
-	async def _handle_rpc(
+	async def _run_in_executor(
 		self,
-		request: web.Request,
-	) -> web.Response:
+		plan: _MethodPlan,
+		args: tuple,
+		kwargs: Dict[
+			str,
+			Any,
+		],
+	) -> Any:
 		"""
-		Handles incoming JSON-RPC requests.
-
-		Parses the request, validates it, dispatches to the appropriate
-		registered RPC method, executes the method, and returns the
-		JSON-RPC response or error object.
+		Run a synchronous method on its executor and wait for the result.
 
 		Parameters
 		----------
-		request : web.Request
-		    The incoming aiohttp request object.
+		plan : _MethodPlan
+		    The dispatch plan of the method.
+		args : tuple
+		    Positional arguments for the call.
+		kwargs : Dict[str, Any]
+		    Keyword arguments for the call.
 
 		Returns
 		-------
-		web.Response
-		    An aiohttp JSON response object containing the JSON-RPC response or error.
+		Any
+		    The return value of the method.
 		"""
-		request_id: Optional[
-			Union[
-				str,
-				int,
-				None,
-			]
-		] = None
-		data: Any = None  # Define data outside try block for broader scope if needed
-
+		(
+			key,
+			executor,
+		) = self._get_executor(plan.executor)
+		load = self._executor_load.setdefault(
+			key,
+			{
+				'in_flight': 0,
+				'completed': 0,
+			},
+		)
+		load['in_flight'] += 1
 		try:
-			# 1. Check Content-Type
-			if request.content_type != 'application/json':
-				# Cannot determine ID if content type is wrong, respond with null ID
-				error_resp = {
-					'jsonrpc': '2.0',
-					'error': {
-						'code': -32700,
-						'message': 'Parse error: Content-Type must be application/json.',
-					},
-					'id': None,
-				}
-				return web.json_response(
-					error_resp,
-					status=415,
-				)  # Unsupported Media Type
-
-			# 2. Parse JSON Body
-			try:
-				raw_data = await request.read()
-				data = json.loads(raw_data)
-				# Extract ID early for inclusion in potential error responses
-				if isinstance(
-					data,
-					dict,
-				):
-					request_id = data.get('id')  # Can be str, int, null, or absent
-			except json.JSONDecodeError:
-				# Invalid JSON, ID might be unknown, respond with null ID
-				error_resp = {
-					'jsonrpc': '2.0',
-					'error': {
-						'code': -32700,
-						'message': 'Parse error: Invalid JSON format.',
-					},
-					'id': None,
-				}
-				return web.json_response(
-					error_resp,
-					status=400,
-				)  # Bad Request
-
-			# 3. Validate JSON-RPC Structure
-			validation_error = self._validate_jsonrpc_request(data)
-			if validation_error:
-				# Use extracted ID if available, otherwise it remains None
-				error_resp = {
-					'jsonrpc': '2.0',
-					'error': validation_error,
-					'id': request_id,
-				}
-				return web.json_response(
-					error_resp,
-					status=400,
-				)  # Bad Request
-
-			# Assuming validation passed, data is a dict with 'method'
-			method_name: str = data['method']
-			# Use empty list/dict if 'params' is omitted, as per spec flexibility
-			params: Union[
-				List,
-				Dict,
-			] = data.get(
-				'params',
-				[],
+			return await asyncio.get_running_loop().run_in_executor(
+				executor,
+				partial(
+					plan.func,
+					*args,
+					**kwargs,
+				),
 			)
+		finally:
+			load['in_flight'] -= 1
+			load['completed'] += 1
 
-			# 4. Find and Call Method
-			func = self._functions.get(method_name)
-			if func is None:
-				error_resp = {
-					'jsonrpc': '2.0',
-					'error': {
-						'code': -32601,
-						'message': 'Method not found.',
-					},
-					'id': request_id,
-				}
-				return web.json_response(
-					error_resp,
-					status=404,
-				)  # Not Found
-
-			try:
-				log.debug(f'Executing RPC method: {method_name}(params={params})')
-
-				# Validate window_id for all RPC requests (security enhancement)
-				window = self.pyloid.get_window_by_id(request_id)
-				if not window:
-					error_resp = {
-						'jsonrpc': '2.0',
-						'error': {
-							'code': -32600,
-							'message': 'Invalid window ID.',
-						},
-						'id': request_id,
-					}
-					return web.json_response(
-						error_resp,
-						status=400,
-					)  # Bad Request
-
-				# Analyze function signature to check for ctx parameter
-				sig = inspect.signature(func)
-				has_ctx_param = 'ctx' in sig.parameters
-
-				# Create context object if ctx parameter exists
-				if (
-					has_ctx_param
-					and isinstance(
-						params,
-						dict,
-					)
-					and 'ctx' not in params
-				):
-					ctx = RPCContext(
-						pyloid=self.pyloid,
-						window=window,
-					)
-					# Handle dictionary-like params when using keyword arguments
-					params = params.copy()  # 원본 params 복사
-					params['ctx'] = ctx
-
-				# Call the function with positional or keyword arguments
-				if isinstance(
-					params,
-					list,
-				):
-					# Handle list-like params when using positional arguments
-					if has_ctx_param:
-						ctx = RPCContext(
-							pyloid=self.pyloid,
-							window=window,
-						)
-						result = await func(
-							ctx,
-							*params,
-							request_id=request_id,
-						)
-					else:
-						result = await func(
-							*params,
-							request_id=request_id,
-						)
-				else:  # isinstance(params, dict)
-					internal_window_id = request_id
-					params = params.copy()
-					params['_pyloid_window_id'] = internal_window_id
-
-					# Filter parameters to only include allowed parameters
-					sig = inspect.signature(func)
-					allowed_params = set(sig.parameters.keys())
-					filtered_params = {k: v for k, v in params.items() if k in allowed_params}
-					result = await func(**filtered_params)
-
-				# 5. Format Success Response (only for non-notification requests)
-				if request_id is not None:  # Notifications (id=null or absent) don't get responses
-					response_data = {
-						'jsonrpc': '2.0',
-						'result': result,
-						'id': request_id,
-					}
-					return web.json_response(response_data)
-				else:
-					# No response for notifications, return 204 No Content might be appropriate
-					# or just an empty response. aiohttp handles this implicitly if nothing is returned.
-					# For clarity/standard compliance, maybe return 204?
-					return web.Response(status=204)
+	def executor_stats(
+		self,
+	) -> Dict[
+		str,
+		Dict[
+			str,
+			Any,
+		],
+	]:
+		"""
+		Report the load of the executors running synchronous methods.
 
-			except RPCError as e:
-				# Application-specific error during method execution
-				log.warning(
-					f"RPC execution error in method '{method_name}': {e}",
-					exc_info=False,
-				)
-				if request_id is not None:
-					error_resp = {
-						'jsonrpc': '2.0',
-						'error': e.to_dict(),
-						'id': request_id,
-					}
-					# Use 500 or a more specific 4xx/5xx if applicable based on error code?
-					# Sticking to 500 for server-side execution errors.
-					return web.json_response(
-						error_resp,
-						status=500,
-					)
-				else:
-					return web.Response(status=204)  # No response for notification errors
-			except Exception as e:
-				# Unexpected error during method execution
-				log.exception(
-					f"Unexpected error during execution of RPC method '{method_name}':"
-				)  # Log full traceback
-				if request_id is not None:
-					# Minimize internal details exposed to the client
-					error_resp = {
-						'jsonrpc': '2.0',
-						'error': {
-							'code': -32000,
-							'message': f'Server error: {type(e).__name__}',
-						},
-						'id': request_id,
-					}
-					return web.json_response(
-						error_resp,
-						status=500,
-					)  # Internal Server Error
-				else:
-					return web.Response(status=204)  # No response for notification errors
+		Returns
+		-------
+		Dict[str, Dict[str, Any]]
+		    For each executor in use ('thread', 'process' or a custom executor name):
+		    `max_workers`, `in_flight` (submitted calls not finished yet), `queued`
+		    (in-flight calls waiting for a free worker) and `completed`.
 
-		except Exception as e:
-			# Catch-all for fatal errors during request handling itself (before/after method call)
-			log.exception('Fatal error in RPC handler:')
-			# ID might be uncertain at this stage, include if available
-			error_resp = {
-				'jsonrpc': '2.0',
-				'error': {
-					'code': -32603,
-					'message': 'Internal error',
+		Examples
+		--------
+		```python
+		stats = rpc.executor_stats()
+		print(stats['thread']['queued'])
+		```
+		"""
+		stats = {}
+		for key, executor in self._executors.items():
+			load = self._executor_load.get(
+				key,
+				{
+					'in_flight': 0,
+					'completed': 0,
 				},
-				'id': request_id,
-			}
-			return web.json_response(
-				error_resp,
-				status=500,
 			)
+			max_workers = getattr(
+				executor,
+				'_max_workers',
+				None,
+			)
+			stats[key] = {
+				'max_workers': max_workers,
+				'in_flight': load['in_flight'],
+				'queued': max(
+					0,
+					load['in_flight'] - max_workers,
+				)
+				if max_workers
+				else 0,
+				'completed': load['completed'],
+			}
+		return stats
 
 	async def start_async(
 		self,
 		**kwargs,
 	):
-		"""Starts the server asynchronously without blocking."""
+		"""
+		Starts the server asynchronously without blocking.
+
+		Listens on TCP and/or the Unix domain socket given as `unix_socket`.
+		Request handlers are cancelled when their client disconnects, which also
+		closes streaming methods. Pass `handler_cancellation=False` to opt out.
+		"""
+		runner_kwargs = {
+			'access_log': None,
+			'handler_cancellation': True,
+		}
+		runner_kwargs.update(kwargs)
 		self._runner = web.AppRunner(
 			self._app,
-			access_log=None,
-			**kwargs,
+			**runner_kwargs,
 		)
 		await self._runner.setup()
-		self._site = web.TCPSite(
-			self._runner,
-			self._host,
-			self._port,
-		)
-		await self._site.start()
-		log.info(f'RPC server started asynchronously on {self.url}')
+		self.event_loop = event_loop_name()
+		log.info(f'RPC server event loop: {self.event_loop}')
+		if self._port is not None:
+			self._site = web.TCPSite(
+				self._runner,
+				self._host,
+				self._port,
+				reuse_port=self._reuse_port or None,
+			)
+			await self._site.start()
+			log.info(f'RPC server started asynchronously on {self.url}')
+		if self.unix_socket is not None:
+			self._unix_site = web.SockSite(
+				self._runner,
+				self._bind_unix_socket(),
+			)
+			await self._unix_site.start()
+			log.info(f'RPC server started asynchronously on unix:{self.unix_socket}')
+		# Set once listening, so post_message never queues work on a loop that failed to start
+		self._loop = asyncio.get_running_loop()
 		# 서버가 백그라운드에서 실행되도록 여기서 블로킹하지 않습니다.
 		# 이 코루틴은 서버 시작 후 즉시 반환됩니다.
 
+	def _bind_unix_socket(
+		self,
+	) -> socket.socket:
+		"""
+		Bind the Unix domain socket, accessible to the current user only.
+
+		A stale socket file left by a previous run is removed first.
+
+		Returns
+		-------
+		socket.socket
+		    The bound socket.
+		"""
+		if os.path.exists(self.unix_socket) and stat.S_ISSOCK(os.stat(self.unix_socket).st_mode):
+			os.unlink(self.unix_socket)
+		sock = socket.socket(
+			socket.AF_UNIX,
+			socket.SOCK_STREAM,
+		)
+		try:
+			sock.bind(self.unix_socket)
+			os.chmod(
+				self.unix_socket,
+				0o600,
+			)
+		except OSError:
+			sock.close()
+			raise
+		return sock
+
 	async def stop_async(
 		self,
 	):
@@ -684,8 +5313,23 @@ class PyloidRPC:
 		if self._runner:
 			await self._runner.cleanup()
 			log.info('RPC server stopped.')
+		if self._unix_site is not None and os.path.exists(self.unix_socket):
+			os.unlink(self.unix_socket)
 		self._site = None
+		self._unix_site = None
 		self._runner = None
+		self._loop = None
+		# Only the shared pools are owned by the server, custom executors are not
+		for key in (
+			'thread',
+			'process',
+		):
+			executor = self._executors.pop(
+				key,
+				None,
+			)
+			if executor is not None:
+				executor.shutdown(wait=False)
 
 	def start(
 		self,
@@ -709,18 +5353,24 @@ class PyloidRPC:
 		run_app_kwargs = {
 			'print': None,
 			'access_log': None,
+			'handler_cancellation': True,
 		}
 		run_app_kwargs.update(kwargs)
 		try:
 			web.run_app(
 				self._app,
-				host=self._host,
+				host=self._host if self._port is not None else None,
 				port=self._port,
+				sock=self._bind_unix_socket() if self.unix_socket is not None else None,
+				loop=new_event_loop(self.uvloop) if self.uvloop else None,
 				**run_app_kwargs,
 			)
 		except Exception as e:
 			log.exception(f'Failed to start or run the server: {e}')
 			raise
+		finally:
+			if self.unix_socket is not None and os.path.exists(self.unix_socket):
+				os.unlink(self.unix_socket)
 
 	def run(
 		self,
@@ -732,12 +5382,19 @@ class PyloidRPC:
 		without blocking the main thread. It creates a new thread, sets up a new asyncio event loop
 		in that thread, and starts the asynchronous server. The thread is marked as daemon so that
 		it will not prevent the program from exiting if only daemon threads remain.
+
+		With `workers`, the server runs in worker processes instead, and this
+		method returns once they all listen.
 		"""
 		import asyncio
 
+		if self.workers:
+			self._start_workers()
+			return
+
 		def _run_asyncio():
-			# Create a new event loop for this thread.
-			loop = asyncio.new_event_loop()
+			# Create a new event loop for this thread (uvloop if enabled and installed).
+			loop = new_event_loop(self.uvloop)
 			# Set the newly created event loop as the current event loop for this thread.
 			asyncio.set_event_loop(loop)
 			# Start the asynchronous server; this coroutine will set up the server.
@@ -753,3 +5410,125 @@ class PyloidRPC:
 		)
 		# Start the background server thread.
 		server_thread.start()
+
+	def _worker_target(
+		self,
+	) -> Tuple[
+		str,
+		str,
+	]:
+		"""
+		Find the module attribute this instance is stored in, for worker processes.
+
+		Returns
+		-------
+		Tuple[str, str]
+		    The module name and attribute name. Modules are preferred over the
+		    main script.
+
+		Raises
+		------
+		RuntimeError
+		    If the instance is not a module-level variable.
+		"""
+		found = None
+		for module_name, module in list(sys.modules.items()):
+			for attribute, value in list(getattr(module, '__dict__', {}).items()):
+				if value is self:
+					if module_name not in (
+						'__main__',
+						'__mp_main__',
+					):
+						return (
+							module_name,
+							attribute,
+						)
+					found = (
+						'__main__',
+						attribute,
+					)
+		if found is None:
+			raise RuntimeError(
+				'RPC workers need the PyloidRPC instance to be a module-level variable.'
+			)
+		return found
+
+	def _start_workers(
+		self,
+	):
+		"""Start the worker processes and wait until they listen."""
+		count = self.workers
+		if count > 1 and not sys.platform.startswith('linux'):
+			log.warning('SO_REUSEPORT load balancing needs Linux; starting a single RPC worker.')
+			count = 1
+		target = self._worker_target()
+		context = multiprocessing.get_context('spawn')
+		ready_events = []
+		for index in range(count):
+			(
+				parent_conn,
+				child_conn,
+			) = context.Pipe()
+			process = context.Process(
+				target=run_worker,
+				args=(
+					target,
+					self._port,
+					self.unix_socket if index == 0 else None,
+					count > 1,
+					child_conn,
+					self.uvloop,
+					os.getpid(),
+				),
+				name=f'pyloid-rpc-worker-{index}',
+				daemon=True,
+			)
+			process.start()
+			child_conn.close()
+			ready = threading.Event()
+			threading.Thread(
+				target=serve_remote_calls,
+				args=(
+					parent_conn,
+					lambda: self.pyloid,
+					ready,
+				),
+				name=f'pyloid-rpc-proxy-{index}',
+				daemon=True,
+			).start()
+			self._worker_processes.append(process)
+			ready_events.append(
+				(
+					process,
+					ready,
+				)
+			)
+		atexit.register(self.stop_workers)
+		for process, ready in ready_events:
+			while not ready.wait(0.1):
+				if not process.is_alive():
+					self.stop_workers()
+					raise RuntimeError(
+						f'RPC worker {process.name} exited with code {process.exitcode}.'
+					)
+		log.info(f'RPC server started in {count} worker process(es) on {self.url}')
+
+	def stop_workers(
+		self,
+		timeout: float = 5.0,
+	):
+		"""
+		Stop the worker processes started by `run` with `workers`.
+
+		Parameters
+		----------
+		timeout : float, optional
+		    Seconds to wait for each worker to exit. Default is 5.
+		"""
+		processes = self._worker_processes
+		self._worker_processes = []
+		for process in processes:
+			if process.is_alive():
+				process.terminate()
+		for process in processes:
+			process.join(timeout)
@@ -0,0 +1,701 @@
+import asyncio
+import importlib
+import itertools
+import os
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import (
+	Future,
+	ThreadPoolExecutor,
+)
+from typing import (
+	Any,
+	Awaitable,
+	Dict,
+	Optional,
+	Tuple,
+	Union,
+)
+
+from .utils import (
+	new_event_loop,
+)
+
+_READY = '__ready__'
+_EXISTS = '__exists__'
+_CALLABLE = '__callable__'
+_WINDOW = '__window__'
+
+
+def _encode_value(
+	value: Any,
+) -> Any:
+	"""Replace windows in a value returned to a worker with picklable references."""
+	if isinstance(
+		value,
+		(
+			list,
+			tuple,
+		),
+	):
+		return type(value)(_encode_value(item) for item in value)
+	if callable(getattr(value, 'get_id', None)) and hasattr(value, 'load_url'):
+		return (
+			_WINDOW,
+			value.get_id(),
+		)
+	return value
+
+
+def _run_remote_call(
+	pyloid,
+	target: Optional[str],
+	kind: str,
+	name: str,
+	args: tuple,
+	kwargs: Dict[
+		str,
+		Any,
+	],
+) -> Tuple[
+	bool,
+	Any,
+]:
+	"""Make a worker's call on the application or one of its windows."""
+	try:
+		obj = pyloid if target is None else pyloid.get_window_by_id(target)
+		if name == _EXISTS:
+			result = obj is not None
+		elif obj is None:
+			raise LookupError(f"Window '{target}' not found.")
+		else:
+			attribute = getattr(
+				obj,
+				name,
+			)
+			if kind == 'get':
+				result = _CALLABLE if callable(attribute) else attribute
+			else:
+				result = attribute(
+					*args,
+					**kwargs,
+				)
+		return (
+			True,
+			_encode_value(result),
+		)
+	except Exception as e:
+		return (
+			False,
+			e,
+		)
+
+
+def serve_remote_calls(
+	conn,
+	get_pyloid,
+	ready: threading.Event,
+):
+	"""
+	Answer the `Pyloid` and window calls of a worker process (main process side).
+
+	Runs on a daemon thread per worker until the worker's end of the pipe is
+	closed. Pyloid marshals its window operations to the Qt main thread, so the
+	calls can be made from here.
+
+	Window lookups, which validate every RPC request, are answered on this
+	thread. Other calls run one at a time, in the order the worker sent them,
+	on a second thread, so a call that waits for the user (a file dialog) does
+	not hold up the lookups. Replies carry the id of their call.
+
+	Parameters
+	----------
+	conn : multiprocessing.connection.Connection
+	    The main process end of the worker's pipe.
+	get_pyloid : Callable[[], Pyloid]
+	    Returns the current application.
+	ready : threading.Event
+	    Set when the worker reports that its server is listening.
+	"""
+	send_lock = threading.Lock()
+	calls = ThreadPoolExecutor(
+		max_workers=1,
+		thread_name_prefix='pyloid-rpc-proxy-call',
+	)
+
+	def _answer(
+		call_id: int,
+		target: Optional[str],
+		kind: str,
+		name: str,
+		args: tuple,
+		kwargs: Dict[
+			str,
+			Any,
+		],
+	):
+		(
+			ok,
+			value,
+		) = _run_remote_call(
+			get_pyloid(),
+			target,
+			kind,
+			name,
+			args,
+			kwargs,
+		)
+		with send_lock:
+			try:
+				conn.send(
+					(
+						call_id,
+						ok,
+						value,
+					)
+				)
+			except (
+				EOFError,
+				OSError,
+			):
+				# The worker is gone
+				pass
+			except Exception:
+				# The result or the exception cannot be pickled
+				conn.send(
+					(
+						call_id,
+						False,
+						RuntimeError(repr(value)),
+					)
+				)
+
+	try:
+		while True:
+			try:
+				message = conn.recv()
+			except (
+				EOFError,
+				OSError,
+			):
+				return
+			if message == _READY:
+				ready.set()
+			elif message[3] == _EXISTS:
+				_answer(*message)
+			else:
+				calls.submit(
+					_answer,
+					*message,
+				)
+	finally:
+		calls.shutdown(wait=False)
+
+
+def _on_event_loop() -> bool:
+	"""Tell whether the calling thread is running an asyncio event loop."""
+	try:
+		asyncio.get_running_loop()
+	except RuntimeError:
+		return False
+	return True
+
+
+class _RemoteChannel:
+	"""
+	Worker side of the pipe.
+
+	Each call is sent with an id and its reply is matched by a reader thread,
+	so any number of calls can be in flight and waiting for one never blocks
+	the worker's event loop.
+	"""
+
+	def __init__(
+		self,
+		conn,
+	):
+		self._conn = conn
+		self._send_lock = threading.Lock()
+		self._ids = itertools.count()
+		self._pending: Dict[
+			int,
+			Future,
+		] = {}
+		threading.Thread(
+			target=self._read_replies,
+			name='pyloid-rpc-proxy',
+			daemon=True,
+		).start()
+
+	def submit(
+		self,
+		target: Optional[str],
+		kind: str,
+		name: str,
+		args: tuple = (),
+		kwargs: Optional[Dict[str, Any]] = None,
+	) -> Future:
+		"""Send a call to the main process and return a future of its result."""
+		future = Future()
+		# The call is on its way once sent, so the future cannot be cancelled
+		future.set_running_or_notify_cancel()
+		call_id = next(self._ids)
+		self._pending[call_id] = future
+		try:
+			with self._send_lock:
+				self._conn.send(
+					(
+						call_id,
+						target,
+						kind,
+						name,
+						args,
+						kwargs or {},
+					)
+				)
+		except BaseException:
+			del self._pending[call_id]
+			raise
+		return future
+
+	def call(
+		self,
+		target: Optional[str],
+		kind: str,
+		name: str,
+		args: tuple = (),
+		kwargs: Optional[Dict[str, Any]] = None,
+	) -> Any:
+		"""Make a call and wait for its result, from a thread other than the event loop."""
+		return self.submit(
+			target,
+			kind,
+			name,
+			args,
+			kwargs,
+		).result()
+
+	def call_async(
+		self,
+		target: Optional[str],
+		kind: str,
+		name: str,
+		args: tuple = (),
+		kwargs: Optional[Dict[str, Any]] = None,
+	) -> asyncio.Future:
+		"""Make a call from the event loop; the returned future can be awaited."""
+		return asyncio.wrap_future(
+			self.submit(
+				target,
+				kind,
+				name,
+				args,
+				kwargs,
+			)
+		)
+
+	def _read_replies(
+		self,
+	):
+		while True:
+			try:
+				(
+					call_id,
+					ok,
+					value,
+				) = self._conn.recv()
+			except (
+				EOFError,
+				OSError,
+			):
+				break
+			future = self._pending.pop(
+				call_id,
+				None,
+			)
+			if future is None:
+				continue
+			if ok:
+				future.set_result(self._decode_value(value))
+			else:
+				future.set_exception(value)
+		error = ConnectionError('The application process closed the RPC worker pipe.')
+		for call_id in list(self._pending):
+			future = self._pending.pop(
+				call_id,
+				None,
+			)
+			if future is not None:
+				future.set_exception(error)
+
+	def _decode_value(
+		self,
+		value: Any,
+	) -> Any:
+		if isinstance(
+			value,
+			tuple,
+		):
+			if len(value) == 2 and value[0] == _WINDOW:
+				return WindowProxy(
+					self,
+					value[1],
+				)
+			return tuple(self._decode_value(item) for item in value)
+		if isinstance(
+			value,
+			list,
+		):
+			return [self._decode_value(item) for item in value]
+		return value
+
+	def send_ready(
+		self,
+	):
+		with self._send_lock:
+			self._conn.send(_READY)
+
+
+class _RemoteMember:
+	"""
+	A method or attribute of a remote object, looked up on the event loop.
+
+	Calling it sends the call at once and returns an `asyncio.Future` of the
+	result, so calls whose result is not needed still run. Awaiting it reads
+	the attribute.
+	"""
+
+	__slots__ = (
+		'_channel',
+		'_target',
+		'_name',
+	)
+
+	def __init__(
+		self,
+		channel: _RemoteChannel,
+		target: Optional[str],
+		name: str,
+	):
+		self._channel = channel
+		self._target = target
+		self._name = name
+
+	def __call__(
+		self,
+		*args,
+		**kwargs,
+	) -> asyncio.Future:
+		return self._channel.call_async(
+			self._target,
+			'call',
+			self._name,
+			args,
+			kwargs,
+		)
+
+	def __await__(
+		self,
+	):
+		return self._get().__await__()
+
+	async def _get(
+		self,
+	) -> Any:
+		value = await self._channel.call_async(
+			self._target,
+			'get',
+			self._name,
+		)
+		if value == _CALLABLE:
+			raise TypeError(f"'{self._name}' is a method; call it instead of awaiting it.")
+		return value
+
+
+class _RemoteObject:
+	"""
+	Forwards attribute access and method calls to an object in the main process.
+
+	On the worker's event loop, attributes are `_RemoteMember` objects whose
+	calls return awaitables. In other threads, such as the executor threads
+	of synchronous methods, calls and attribute reads block until the main
+	process answers.
+	"""
+
+	_target: Optional[str] = None
+
+	# Whether attributes are methods, learned once per name and class
+	_callables: Dict[str, bool] = {}
+
+	def __init__(
+		self,
+		channel: _RemoteChannel,
+	):
+		self._channel = channel
+
+	def __getattr__(
+		self,
+		name: str,
+	) -> Any:
+		if name.startswith('_'):
+			raise AttributeError(name)
+		if _on_event_loop():
+			return _RemoteMember(
+				self._channel,
+				self._target,
+				name,
+			)
+		is_callable = self._callables.get(name)
+		if is_callable is False:
+			return self._channel.call(
+				self._target,
+				'get',
+				name,
+			)
+		if is_callable is None:
+			value = self._channel.call(
+				self._target,
+				'get',
+				name,
+			)
+			self._callables[name] = value == _CALLABLE
+			if value != _CALLABLE:
+				return value
+
+		def remote_call(
+			*args,
+			**kwargs,
+		):
+			return self._channel.call(
+				self._target,
+				'call',
+				name,
+				args,
+				kwargs,
+			)
+
+		remote_call.__name__ = name
+		return remote_call
+
+
+class WindowProxy(_RemoteObject):
+	"""
+	Stand-in for a `BrowserWindow` in an RPC worker process.
+
+	Method calls and attribute reads are sent to the main process. In async
+	methods they return awaitables (`await ctx.window.get_title()`); in
+	synchronous methods they block until they return there. Arguments and
+	results must be picklable; windows in results are returned as proxies.
+
+	Attributes
+	----------
+	id : str
+	    The window ID.
+	"""
+
+	_callables: Dict[str, bool] = {}
+
+	def __init__(
+		self,
+		channel: _RemoteChannel,
+		window_id: str,
+	):
+		super().__init__(channel)
+		self.id = window_id
+		self._target = window_id
+
+	def get_id(
+		self,
+	) -> str:
+		return self.id
+
+	def __repr__(
+		self,
+	) -> str:
+		return f'<WindowProxy {self.id}>'
+
+
+class PyloidProxy(_RemoteObject):
+	"""
+	Stand-in for the `Pyloid` application in an RPC worker process.
+
+	Calls such as `open_file_dialog` run on the application in the main
+	process, like `WindowProxy` calls. Window lookups are cached briefly,
+	because every RPC request validates its window.
+	"""
+
+	window_cache_ttl = 5.0
+	_callables: Dict[str, bool] = {}
+
+	def __init__(
+		self,
+		channel: _RemoteChannel,
+	):
+		super().__init__(channel)
+		self._known_windows: Dict[str, float] = {}
+
+	def get_window_by_id(
+		self,
+		window_id: str,
+	) -> Union[
+		Optional[WindowProxy],
+		Awaitable[Optional[WindowProxy]],
+	]:
+		"""
+		Returns a proxy of a window, or None if there is no such window.
+
+		On the event loop, the result is an awaitable like other proxy calls,
+		so a lookup that has to ask the main process does not block the loop.
+		"""
+		if _on_event_loop():
+			return self._find_window(window_id)
+		if not self._is_known(window_id):
+			exists = isinstance(
+				window_id,
+				str,
+			) and self._channel.call(
+				window_id,
+				'get',
+				_EXISTS,
+			)
+			if not self._remember(
+				window_id,
+				exists,
+			):
+				return None
+		return WindowProxy(
+			self._channel,
+			window_id,
+		)
+
+	async def _find_window(
+		self,
+		window_id: str,
+	) -> Optional[WindowProxy]:
+		if not self._is_known(window_id):
+			exists = isinstance(
+				window_id,
+				str,
+			) and await self._channel.call_async(
+				window_id,
+				'get',
+				_EXISTS,
+			)
+			if not self._remember(
+				window_id,
+				exists,
+			):
+				return None
+		return WindowProxy(
+			self._channel,
+			window_id,
+		)
+
+	def _is_known(
+		self,
+		window_id: str,
+	) -> bool:
+		return self._known_windows.get(window_id, 0.0) > time.monotonic()
+
+	def _remember(
+		self,
+		window_id: str,
+		exists: bool,
+	) -> bool:
+		if exists:
+			self._known_windows[window_id] = time.monotonic() + self.window_cache_ttl
+		else:
+			self._known_windows.pop(
+				window_id,
+				None,
+			)
+		return exists
+
+
+def _load_server(
+	target: Tuple[
+		str,
+		str,
+	],
+):
+	(
+		module_name,
+		attribute,
+	) = target
+	module = (
+		sys.modules['__main__']
+		if module_name == '__main__'
+		else importlib.import_module(module_name)
+	)
+	return getattr(
+		module,
+		attribute,
+	)
+
+
+def run_worker(
+	target: Tuple[
+		str,
+		str,
+	],
+	port: Optional[int],
+	unix_socket: Optional[str],
+	reuse_port: bool,
+	conn,
+	use_uvloop: bool,
+	parent_pid: int,
+):
+	"""
+	Entry point of an RPC worker process.
+
+	Imports the `PyloidRPC` instance, points its `pyloid` at a proxy of the
+	main process application and serves it until the main process exits.
+
+	Parameters
+	----------
+	target : Tuple[str, str]
+	    The module and attribute of the `PyloidRPC` instance.
+	port : Optional[int]
+	    The TCP port shared by all workers, or None.
+	unix_socket : Optional[str]
+	    The Unix domain socket to listen on, for a single worker.
+	reuse_port : bool
+	    Whether the TCP port is bound with SO_REUSEPORT.
+	conn : multiprocessing.connection.Connection
+	    The worker end of the pipe to the main process.
+	use_uvloop : bool
+	    Whether to prefer uvloop.
+	parent_pid : int
+	    The main process, whose exit stops the worker.
+	"""
+	# Ctrl+C in the terminal is handled by the main process
+	signal.signal(
+		signal.SIGINT,
+		signal.SIG_IGN,
+	)
+	rpc = _load_server(target)
+	channel = _RemoteChannel(conn)
+	rpc.workers = 0
+	rpc._set_port(port)
+	rpc._reuse_port = reuse_port
+	rpc.unix_socket = unix_socket
+	rpc.pyloid = PyloidProxy(channel)
+
+	async def _watch_parent():
+		while os.getppid() == parent_pid:
+			await asyncio.sleep(1.0)
+		loop.stop()
+
+	loop = new_event_loop(use_uvloop)
+	asyncio.set_event_loop(loop)
+	try:
+		loop.run_until_complete(rpc.start_async())
+		channel.send_ready()
+		watcher = loop.create_task(_watch_parent())
+		loop.run_forever()
+		watcher.cancel()
+		loop.run_until_complete(rpc.stop_async())
+	finally:
+		loop.close()
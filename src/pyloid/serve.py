@@ -1,7 +1,13 @@
 import threading
 import asyncio
 import mimetypes
+import os
+import secrets
+import time
 import aiofiles
+from collections import (
+	OrderedDict,
+)
 from aiohttp import (
 	web,
 )
@@ -9,14 +15,23 @@ from aiohttp.web_fileresponse import (
 	FileResponse,
 )
 from typing import (
+	Dict,
 	Optional,
+	Tuple,
+	Union,
 )
 from pathlib import (
 	Path,
 )
+from .compression import (
+	Compressor,
+	is_compressible,
+)
 from .utils import (
+	event_loop_name,
 	get_free_port,
 	is_production,
+	new_event_loop,
 )
 import logging
 
@@ -46,15 +61,265 @@ class ZeroCopyFileResponse(FileResponse):
 		self._enable_sendfile = True  # sendfile() system call activation
 
 
+FILE_SHARE_PATH = '/_pyloid/files'
+"""Path prefix of `ZeroCopyFileShare` tokens on the static server."""
+
+
+class _SharedFile:
+	"""a file registered with ZeroCopyFileShare"""
+
+	__slots__ = (
+		'content_type',
+		'expires_at',
+		'path',
+		'ttl',
+	)
+
+	def __init__(
+		self,
+		path: str,
+		ttl: float,
+		content_type: Optional[str],
+	):
+		self.path = path
+		self.ttl = ttl
+		self.content_type = content_type
+		self.expires_at = time.monotonic() + ttl
+
+
+class ZeroCopyFileShare:
+	"""
+	Serves registered local files under unguessable, expiring tokens.
+
+	Each shared file gets a random token that is the only credential needed to
+	read it, so a page can hand the URL straight to `<video>`, `<img>` or
+	`fetch()`. Files are sent with sendfile, and Range, ETag and conditional
+	requests are supported, so browsers can seek and stream large files.
+
+	Attributes
+	----------
+	ttl : float
+	    Default lifetime of a token in seconds. Each request extends it, so a
+	    file being streamed does not expire mid-playback.
+	base_url : Optional[str]
+	    URL the tokens are served under, set when the share is mounted on a server.
+
+	Examples
+	--------
+	```python
+	from pyloid.serve import (
+	    ZeroCopyFileShare,
+	    pyloid_serve,
+	)
+
+	files = ZeroCopyFileShare()
+	url = pyloid_serve(
+	    'dist',
+	    file_share=files,
+	)
+
+	video_url = files.url(files.share('/home/user/movie.mp4'))
+	```
+	"""
+
+	def __init__(
+		self,
+		ttl: float = 300.0,
+	):
+		self.ttl = ttl
+		self.base_url: Optional[str] = None
+		self.chunk_size = 65536  # 64KB chunk
+		self._files: Dict[
+			str,
+			_SharedFile,
+		] = {}
+
+	def share(
+		self,
+		path: str,
+		ttl: Optional[float] = None,
+		content_type: Optional[str] = None,
+	) -> str:
+		"""
+		Register a file and return its token.
+
+		Parameters
+		----------
+		path : str
+		    The local file to share.
+		ttl : Optional[float], optional
+		    Seconds the token stays valid after the last request. Defaults to `ttl`.
+		content_type : Optional[str], optional
+		    The media type to send. If None, it is guessed from the file name.
+
+		Returns
+		-------
+		str
+		    The token.
+
+		Raises
+		------
+		FileNotFoundError
+		    If the path is not an existing file.
+		"""
+		path = os.path.realpath(path)
+		if not os.path.isfile(path):
+			raise FileNotFoundError(path)
+		self._purge()
+		token = secrets.token_urlsafe(24)
+		self._files[token] = _SharedFile(
+			path,
+			self.ttl if ttl is None else ttl,
+			content_type,
+		)
+		return token
+
+	def url(
+		self,
+		token: str,
+	) -> str:
+		"""
+		Return the URL of a token.
+
+		Raises
+		------
+		RuntimeError
+		    If the share is not mounted on a server yet.
+		"""
+		if self.base_url is None:
+			raise RuntimeError('The file share is not mounted on a server.')
+		return f'{self.base_url}/{token}'
+
+	def revoke(
+		self,
+		token: str,
+	) -> bool:
+		"""
+		Invalidate a token.
+
+		Returns
+		-------
+		bool
+		    True if the token was registered.
+		"""
+		return (
+			self._files.pop(
+				token,
+				None,
+			)
+			is not None
+		)
+
+	def _purge(
+		self,
+	):
+		"""drop expired tokens"""
+		now = time.monotonic()
+		for token in [
+			token for token, shared in list(self._files.items()) if shared.expires_at <= now
+		]:
+			self._files.pop(
+				token,
+				None,
+			)
+
+	async def handle_request(
+		self,
+		request,
+	):
+		"""HTTP request processing"""
+		token = request.match_info.get('token', '')
+		shared = self._files.get(token)
+		now = time.monotonic()
+		if shared is not None and shared.expires_at <= now:
+			self.revoke(token)
+			shared = None
+		if shared is None:
+			return web.Response(
+				status=404,
+				text='File not found',
+			)
+		if not os.path.isfile(shared.path):
+			return web.Response(
+				status=404,
+				text='File not found',
+			)
+		shared.expires_at = now + shared.ttl
+
+		headers = {
+			'Accept-Ranges': 'bytes',
+			'Cache-Control': 'private, no-cache',
+			'X-Content-Type-Options': 'nosniff',
+		}
+		if shared.content_type:
+			headers['Content-Type'] = shared.content_type
+
+		# zero-copy response; FileResponse handles Range, ETag and If-* headers
+		return ZeroCopyFileResponse(
+			path=shared.path,
+			chunk_size=self.chunk_size,
+			headers=headers,
+		)
+
+
 class ZeroCopyStaticHandler:
 	"""zero-copy optimized static file handler"""
 
 	def __init__(
 		self,
 		directory: str,
+		compression: Union[
+			bool,
+			Compressor,
+		] = False,
 	):
+		"""
+		Parameters
+		----------
+		directory : str
+		    The directory to serve.
+		compression : Union[bool, Compressor], optional
+		    Compress text assets (HTML, JS, CSS, JSON, SVG, ...) with the content
+		    coding negotiated from `Accept-Encoding`. True uses a `Compressor` with
+		    default settings. Compressed files are kept in memory until they change,
+		    so each version of a file is compressed once. Files larger than
+		    `max_compress_size` and Range requests are still sent with sendfile.
+		    Default is False.
+		"""
 		self.directory = Path(directory).resolve()
 		self.chunk_size = 65536  # 64KB chunk
+		self.compressor: Optional[Compressor] = (
+			compression
+			if isinstance(
+				compression,
+				Compressor,
+			)
+			else Compressor()
+			if compression
+			else None
+		)
+		self.max_compress_size = 8 * 1024 * 1024  # larger files keep zero-copy
+		self.compressed_cache_size = 32 * 1024 * 1024  # bytes of compressed files kept
+		self._compressed: OrderedDict[
+			Tuple[
+				str,
+				int,
+				int,
+				str,
+			],
+			bytes,
+		] = OrderedDict()
+		self._compressed_bytes = 0
+		# one compression per file version and coding, shared by concurrent requests
+		self._compressing: Dict[
+			Tuple[
+				str,
+				int,
+				int,
+				str,
+			],
+			asyncio.Task,
+		] = {}
 
 	async def handle_request(
 		self,
@@ -106,14 +371,27 @@ class ZeroCopyStaticHandler:
 			else:
 				cache_control = 'no-cache'
 
+			# Negotiate compression for text assets
+			encoding = None
+			if (
+				self.compressor is not None
+				and self.compressor.min_size <= file_size <= self.max_compress_size
+				and is_compressible(content_type)
+			):
+				encoding = self.compressor.negotiate(request.headers.get('Accept-Encoding'))
+
 			# zero-copy file response creation
 			headers = {
 				'Content-Type': content_type or 'application/octet-stream',
 				'Content-Length': str(file_size),
 				'Accept-Ranges': 'bytes',
 				'Cache-Control': cache_control,
-				'ETag': f'"{stat.st_mtime}-{file_size}"',
+				'ETag': f'"{stat.st_mtime}-{file_size}"'
+				if encoding is None
+				else f'"{stat.st_mtime}-{file_size}-{encoding}"',
 			}
+			if self.compressor is not None:
+				headers['Vary'] = 'Accept-Encoding'
 
 			# ETag based cache check
 			if_none_match = request.headers.get('If-None-Match')
@@ -123,6 +401,19 @@ class ZeroCopyStaticHandler:
 					headers=headers,
 				)
 
+			if encoding is not None:
+				body = await self._compressed_file(
+					file_path,
+					stat,
+					encoding,
+				)
+				headers['Content-Encoding'] = encoding
+				headers['Content-Length'] = str(len(body))
+				return web.Response(
+					body=body,
+					headers=headers,
+				)
+
 			# zero-copy response return (sendfile used)
 			return ZeroCopyFileResponse(
 				path=file_path,
@@ -136,6 +427,74 @@ class ZeroCopyStaticHandler:
 				text=f'Internal Server Error: {str(e)}',
 			)
 
+	async def _compressed_file(
+		self,
+		file_path,
+		stat,
+		encoding,
+	) -> bytes:
+		"""Compressed file contents, cached per file version and content coding"""
+		key = (
+			str(file_path),
+			stat.st_mtime_ns,
+			stat.st_size,
+			encoding,
+		)
+		body = self._compressed.get(key)
+		if body is not None:
+			self._compressed.move_to_end(key)
+			return body
+
+		task = self._compressing.get(key)
+		if task is None:
+			task = asyncio.ensure_future(
+				self._compress_file(
+					key,
+					file_path,
+					encoding,
+				)
+			)
+			self._compressing[key] = task
+			task.add_done_callback(
+				lambda _: self._compressing.pop(
+					key,
+					None,
+				)
+			)
+		# a request that goes away does not cancel the compression shared with others
+		return await asyncio.shield(task)
+
+	async def _compress_file(
+		self,
+		key,
+		file_path,
+		encoding,
+	) -> bytes:
+		"""Compress a file and add it to the cache of compressed files"""
+		async with aiofiles.open(
+			file_path,
+			'rb',
+		) as f:
+			data = await f.read()
+		(
+			body,
+			_,
+		) = await self.compressor.compress_async(
+			data,
+			encoding,
+		)
+
+		# keep the most recently used compressed files within the budget
+		self._compressed[key] = body
+		self._compressed_bytes += len(body)
+		while self._compressed_bytes > self.compressed_cache_size and len(self._compressed) > 1:
+			(
+				_,
+				evicted,
+			) = self._compressed.popitem(last=False)
+			self._compressed_bytes -= len(evicted)
+		return body
+
 	async def _handle_range_request(
 		self,
 		file_path,
@@ -209,12 +568,27 @@ class ZeroCopyStaticHandler:
 async def start_zero_copy_server(
 	directory: str,
 	port: int,
+	compression: Union[
+		bool,
+		Compressor,
+	] = False,
+	file_share: Optional[ZeroCopyFileShare] = None,
 ):
 	"""zero-copy optimized server starts"""
-	handler = ZeroCopyStaticHandler(directory)
+	handler = ZeroCopyStaticHandler(
+		directory,
+		compression,
+	)
 
 	# aiohttp app creation
 	app = web.Application()
+	if file_share is not None:
+		app.router.add_route(
+			'GET',
+			f'{FILE_SHARE_PATH}/{{token}}',
+			file_share.handle_request,
+		)
+		file_share.base_url = f'http://127.0.0.1:{port}{FILE_SHARE_PATH}'
 	app.router.add_route(
 		'GET',
 		'/{path:.*}',
@@ -250,6 +624,12 @@ async def start_zero_copy_server(
 def pyloid_serve(
 	directory: str,
 	port: Optional[int] = None,
+	compression: Union[
+		bool,
+		Compressor,
+	] = False,
+	file_share: Optional[ZeroCopyFileShare] = None,
+	uvloop: bool = False,
 ) -> str:
 	"""
 	zero-copy optimized static file server starts.
@@ -258,12 +638,23 @@ def pyloid_serve(
 	----
 	directory (str): Path to the static file directory to serve
 	port (int, optional): Server port (default: None - will use a random free port)
+	compression (bool | Compressor, optional): Compress text assets with the negotiated
+	    content coding, see `ZeroCopyStaticHandler` (default: False)
+	file_share (ZeroCopyFileShare, optional): Also serve the files registered with this
+	    share under `/_pyloid/files/` (default: None)
+	uvloop (bool, optional): On Linux, run the server loop with uvloop when the `uvloop`
+	    package is installed, falling back to asyncio otherwise (default: False)
 
 	Returns
 	-------
 	str
 	    URL of the started server
 
+	Notes
+	-----
+	To serve the frontend and a `PyloidRPC` server from a single server and
+	origin, use `PyloidRPC.serve_static` instead.
+
 	Examples
 	--------
 	```python
@@ -287,7 +678,7 @@ def pyloid_serve(
 
 	def run_zero_copy_server():
 		"""run async server in a separate thread"""
-		loop = asyncio.new_event_loop()
+		loop = new_event_loop(uvloop)
 		asyncio.set_event_loop(loop)
 
 		try:
@@ -298,12 +689,15 @@ def pyloid_serve(
 				start_zero_copy_server(
 					directory,
 					port,
+					compression,
+					file_share,
 				)
 			)
 
 			print(f'🚀 Zero-copy frontend server started on http://127.0.0.1:{port}')
 			print(f'📁 Serving directory: {directory}')
 			print(f'⚡ Features: sendfile, Range requests, ETag caching')
+			print(f'🔁 Event loop: {event_loop_name(loop)}')
 
 			# wait until the server starts
 			loop.run_forever()
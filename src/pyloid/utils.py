@@ -1,6 +1,7 @@
 import sys
 import os
 import platform
+import asyncio
 from typing import (
 	Optional,
 )
@@ -256,3 +257,64 @@ def set_qt_backend(
 	"""
 	print(f'Setting QT_QUICK_BACKEND to {backend}.')
 	os.environ['QT_QUICK_BACKEND'] = backend
+
+
+def new_event_loop(
+	use_uvloop: bool = False,
+) -> asyncio.AbstractEventLoop:
+	"""
+	Creates a new event loop for a server thread.
+
+	With `use_uvloop`, the loop is a uvloop loop on Linux when the `uvloop`
+	package is installed. On other platforms, or when uvloop cannot be
+	imported, a standard asyncio loop is returned.
+
+	Parameters
+	----------
+	use_uvloop : bool, optional
+	    Whether to prefer uvloop. Default is False.
+
+	Returns
+	-------
+	asyncio.AbstractEventLoop
+	    The new, not yet running, event loop.
+
+	Examples
+	--------
+	>>> from pyloid.utils import (
+	...     event_loop_name,
+	...     new_event_loop,
+	... )
+	>>> loop = new_event_loop(use_uvloop=True)
+	>>> print(event_loop_name(loop))
+	uvloop
+	"""
+	if use_uvloop and sys.platform.startswith('linux'):
+		try:
+			import uvloop
+		except ImportError:
+			pass
+		else:
+			return uvloop.new_event_loop()
+	return asyncio.new_event_loop()
+
+
+def event_loop_name(
+	loop: Optional[asyncio.AbstractEventLoop] = None,
+) -> str:
+	"""
+	Returns the name of an event loop implementation.
+
+	Parameters
+	----------
+	loop : asyncio.AbstractEventLoop, optional
+	    The loop to inspect. Defaults to the running loop.
+
+	Returns
+	-------
+	str
+	    'uvloop' for uvloop loops, otherwise 'asyncio'.
+	"""
+	if loop is None:
+		loop = asyncio.get_running_loop()
+	return 'uvloop' if type(loop).__module__.startswith('uvloop') else 'asyncio'